@@ -0,0 +1,183 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_CACHE_KEY = "auth:user-fields:{user_id}"
+
+# What authentication and permission checks read of a user, and all that is
+# cached of one: never the profile, and the password hash only when tokens
+# are checked against it (CHECK_REVOKE_TOKEN).
+USER_CACHE_FIELDS = ("id", "email", "is_active", "is_staff")
+
+
+class LocalUserCache:
+    """Thread-safe, size-bounded LRU of user fields, each kept ``timeout`` s."""
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, user):
+        with self._lock:
+            self._entries[user_id] = (user, time.monotonic() + self.timeout)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def delete(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_users = LocalUserCache(
+    settings.AUTH_USER_LOCAL_CACHE_SIZE, settings.AUTH_USER_LOCAL_CACHE_TIMEOUT
+)
+
+
+def _user_key(user_id):
+    return USER_CACHE_KEY.format(user_id=user_id)
+
+
+def forget_user(user_id):
+    """
+    Drop a user from both cache tiers, now and again once the transaction
+    commits, so a request racing the write cannot cache the old row for
+    long. Other processes drop their local copy when it times out.
+    """
+
+    def forget():
+        local_users.delete(str(user_id))
+        cache.delete(_user_key(user_id))
+
+    forget()
+    transaction.on_commit(forget)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` resolving the token's user through an in-process
+    LRU and then the shared cache before the database, both holding only
+    the user's ``USER_CACHE_FIELDS``. Entries are dropped by ``forget_user``
+    when the user is saved or deleted; other processes may serve their local
+    copy for up to ``AUTH_USER_LOCAL_CACHE_TIMEOUT`` seconds.
+    """
+
+    def user_fields(self):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            return (*USER_CACHE_FIELDS, "password")
+        return USER_CACHE_FIELDS
+
+    def load_user(self, user_id):
+        """
+        The user, built from its cached fields. Other fields are deferred:
+        they load from the database on first access, and ``save()`` only
+        writes the fields that were loaded.
+        """
+        key = str(user_id)
+        fields = local_users.get(key)
+        if fields is None:
+            fields = cache.get(_user_key(user_id))
+            if fields is None:
+                fields = (
+                    self.user_model.objects.filter(
+                        **{api_settings.USER_ID_FIELD: user_id}
+                    )
+                    .values(*self.user_fields())
+                    .get()
+                )
+                cache.set(_user_key(user_id), fields, settings.AUTH_USER_CACHE_TIMEOUT)
+            local_users.set(key, fields)
+        # A new instance per request, as requests may change their user.
+        # from_db takes the values in the order of the model's fields.
+        names = [
+            field.attname
+            for field in self.user_model._meta.concrete_fields
+            if field.attname in fields
+        ]
+        return self.user_model.from_db(
+            router.db_for_read(self.user_model),
+            names,
+            [fields[name] for name in names],
+        )
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        try:
+            user = self.load_user(user_id)
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+
+class TokenUserAuthentication(CachedJWTAuthentication):
+    """
+    Authenticates a ``TokenUser`` built from the access token's claims
+    (``user_id``, ``email``, ``is_staff``) without reading the accounts
+    table, for read-only actions on the user's own data. The claims are as
+    fresh as the token, so only tokens claiming a non-staff user are taken
+    at their word: a deactivation shows once the user gets a new token, and
+    staff rights are always checked against the database.
+    """
+
+    def get_user(self, validated_token):
+        # Tokens issued before the claim existed count as staff.
+        if validated_token.get("is_staff", True):
+            return super().get_user(validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return api_settings.TOKEN_USER_CLASS(validated_token)
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    target_class = "accounts.authentication.CachedJWTAuthentication"
+
+
+class TokenUserScheme(SimpleJWTScheme):
+    target_class = "accounts.authentication.TokenUserAuthentication"
+    # Same bearer token, but a distinct component: spectacular keys security
+    # schemes by authentication class.
+    name = "jwtClaimsAuth"
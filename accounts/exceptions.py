@@ -0,0 +1,11 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PasswordHashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Too many password checks in progress, try again shortly.")
+    default_code = "password_hashing_busy"
+    # Sent as Retry-After by DRF's exception handler.
+    wait = 1
@@ -0,0 +1,130 @@
+import contextvars
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class HashingPoolBusy(Exception):
+    """No hashing pool slot freed up within the queue timeout."""
+
+
+# Set while a view that answers a full pool with a 503 is running; every
+# other caller (admin login, management commands) hashes inline instead.
+_shed_load = contextvars.ContextVar("shed_hashing_load", default=False)
+
+
+@contextmanager
+def shedding_load():
+    """Let a full hashing pool raise ``HashingPoolBusy`` to the caller."""
+    token = _shed_load.set(True)
+    try:
+        yield
+    finally:
+        _shed_load.reset(token)
+
+
+def _pbkdf2_encode(password, salt, iterations):
+    return PBKDF2PasswordHasher().encode(password, salt, iterations)
+
+
+class HashingPool:
+    """
+    Runs password hashing in a process pool of ``workers``, so the key
+    derivation neither occupies the request worker's CPU nor contends for its
+    GIL. At most ``queue_size`` hashes wait for the pool per process; past
+    that, callers give up after ``queue_timeout`` seconds with
+    ``HashingPoolBusy`` rather than pile up behind the storm.
+    """
+
+    def __init__(self, workers, queue_size, queue_timeout):
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.lock = threading.Lock()
+        self.executor = None
+        self.pid = None
+
+    def get_executor(self):
+        with self.lock:
+            # A pool inherited through fork (e.g. gunicorn --preload) has no
+            # live workers in the child; start a fresh one there.
+            if self.executor is None or self.pid != os.getpid():
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self.pid = os.getpid()
+            return self.executor
+
+    def discard_executor(self, executor):
+        with self.lock:
+            if self.executor is executor:
+                self.executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, function, *args):
+        if not self.slots.acquire(timeout=self.queue_timeout):
+            raise HashingPoolBusy()
+        try:
+            for attempt in range(2):
+                executor = self.get_executor()
+                try:
+                    return executor.submit(function, *args).result()
+                except BrokenProcessPool:
+                    # A worker died (e.g. OOM-killed), which breaks the whole
+                    # pool; start a new one and try once more.
+                    self.discard_executor(executor)
+                    if attempt:
+                        raise
+        finally:
+            self.slots.release()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool():
+    """The process's hashing pool, or None when hashing runs inline."""
+    global _pool
+    if not settings.PASSWORD_HASHING_WORKERS:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HashingPool(
+                    settings.PASSWORD_HASHING_WORKERS,
+                    settings.PASSWORD_HASHING_QUEUE_SIZE,
+                    settings.PASSWORD_HASHING_QUEUE_TIMEOUT,
+                )
+    return _pool
+
+
+class OffloadedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2 hasher, with the key derivation run in the hashing pool.
+    Same algorithm name and encoding, so existing hashes verify unchanged;
+    ``verify`` and ``harden_runtime`` go through ``encode`` and are offloaded
+    with it, which covers signup, password change and every login.
+
+    When the pool is full, the hash is computed inline, unless the caller
+    sheds load (see ``shedding_load``).
+    """
+
+    def encode(self, password, salt, iterations=None):
+        pool = get_hashing_pool()
+        if pool is not None:
+            try:
+                return pool.run(
+                    _pbkdf2_encode, password, salt, iterations or self.iterations
+                )
+            except HashingPoolBusy:
+                if _shed_load.get():
+                    raise
+        return super().encode(password, salt, iterations)
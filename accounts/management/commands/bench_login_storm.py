@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from accounts import hashers
+from accounts.throttles import TokenRateThrottle
+from accounts.views import EmailTokenObtainPairView
+from airport.models import Airport
+from airport.views import AirportViewSet
+from base.benchmark import BenchmarkCommand, percentile
+
+User = get_user_model()
+
+PASSWORD = "StormPass123!"
+
+
+class Command(BenchmarkCommand):
+    help = (
+        "Measure read latency on one simulated threaded web worker while a "
+        "login storm runs, hashing inline and in the password hashing pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=settings.WEB_THREADS,
+            help="Request threads per worker.",
+        )
+        parser.add_argument(
+            "--storm", type=int, default=16, help="Concurrent login clients."
+        )
+        parser.add_argument("--duration", type=float, default=5.0)
+        parser.add_argument("--read-interval", type=float, default=0.01)
+
+    def benchmark(self, threads, storm, duration, read_interval, **options):
+        factory = APIRequestFactory()
+        login_view = EmailTokenObtainPairView.as_view()
+        read_view = AirportViewSet.as_view({"get": "list"})
+        user = User.objects.create_user(email="storm@example.com", password=PASSWORD)
+        Airport.objects.bulk_create(
+            Airport(name=f"Storm {i}", closest_big_city="Storm") for i in range(20)
+        )
+
+        def login():
+            request = factory.post(
+                "/", {"email": user.email, "password": PASSWORD}, format="json"
+            )
+            try:
+                return login_view(request).status_code
+            finally:
+                connection.close()
+
+        def read():
+            try:
+                return read_view(factory.get("/")).render().status_code
+            finally:
+                connection.close()
+
+        phases = (
+            ("quiet", 0, 0),
+            ("storm, inline hashing", storm, 0),
+            ("storm, pooled hashing", storm, settings.PASSWORD_HASHING_WORKERS or 1),
+        )
+        run_phase = partial(
+            self.phase,
+            login=login,
+            read=read,
+            threads=threads,
+            duration=duration,
+            interval=read_interval,
+        )
+        unthrottled = {**TokenRateThrottle.THROTTLE_RATES, "token_obtain": None}
+        with mock.patch.object(TokenRateThrottle, "THROTTLE_RATES", unthrottled):
+            for label, clients, workers in phases:
+                with override_settings(PASSWORD_HASHING_WORKERS=workers):
+                    hashers._pool = None
+                    try:
+                        run_phase(label, clients)
+                    finally:
+                        if hashers._pool is not None and hashers._pool.executor:
+                            hashers._pool.executor.shutdown()
+                        hashers._pool = None
+
+    def phase(self, label, clients, login, read, threads, duration, interval):
+        stop = threading.Event()
+        logins = Counter()
+        latencies = []
+        lock = threading.Lock()
+
+        with ThreadPoolExecutor(max_workers=threads) as worker:
+
+            def storm_client():
+                while not stop.is_set():
+                    status_code = worker.submit(login).result()
+                    with lock:
+                        logins[status_code] += 1
+
+            clients = [threading.Thread(target=storm_client) for _ in range(clients)]
+            for client in clients:
+                client.start()
+            deadline = time.monotonic() + duration
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                worker.submit(read).result()
+                latencies.append(time.perf_counter() - started)
+                time.sleep(interval)
+            stop.set()
+            for client in clients:
+                client.join()
+
+        self.stdout.write(
+            f"{label:<28} reads p50 {percentile(latencies, 0.5) * 1000:7.1f}ms "
+            f"p99 {percentile(latencies, 0.99) * 1000:7.1f}ms  logins "
+            + (", ".join(f"{k}={v}" for k, v in sorted(logins.items())) or "-")
+        )
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.revocation import get_revoked_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Drop expired tokens from the revocation list in bulk, once or every "
+        "--interval seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Keep sweeping every INTERVAL seconds instead of running once.",
+        )
+
+    def handle(self, *args, interval, **options):
+        revoked_tokens = get_revoked_tokens()
+        while True:
+            swept = revoked_tokens.sweep()
+            self.stdout.write(f"Swept {swept} expired revoked tokens.")
+            if not interval:
+                break
+            time.sleep(interval)
@@ -0,0 +1,178 @@
+import threading
+import time
+
+from django.conf import settings
+
+from base.bloom import BloomFilter
+from base.redis import get_redis, redis_available
+
+# One key per revoked token, expiring with the token, plus an index of them
+# all scored by expiry for rebuilding Bloom filters and sweeping. The hash
+# tag keeps both in one cluster slot, as the revoke script touches both.
+REVOKED_TOKEN_KEY = "accounts:{{revoked-tokens}}:{jti}"
+REVOKED_TOKENS_INDEX_KEY = "accounts:{revoked-tokens}:index"
+
+# Revokes a token unless it already is: returns 1 for the first caller only.
+REVOKE_SCRIPT = """
+if redis.call("SET", KEYS[1], 1, "NX", "EXAT", ARGV[2]) then
+    redis.call("ZADD", KEYS[2], ARGV[2], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+# Lower bound on the number of ids a rebuilt Bloom filter is sized for.
+BLOOM_MIN_CAPACITY = 1024
+
+
+class RevocationStore:
+    """
+    Token ids (``jti``) revoked before their expiry, each kept until the
+    epoch second ``expires_at`` at which the token would have lapsed anyway.
+    """
+
+    def revoke(self, jti, expires_at):
+        """Revoke ``jti``; False if it already was, so only one caller wins."""
+        raise NotImplementedError
+
+    def is_revoked(self, jti):
+        raise NotImplementedError
+
+    def live_ids(self):
+        """Every revoked id whose token has not expired yet."""
+        raise NotImplementedError
+
+    def sweep(self):
+        """Drop ids of expired tokens in bulk; return how many went."""
+        raise NotImplementedError
+
+
+class RedisRevocationStore(RevocationStore):
+    """Keeps revoked ids in Redis keys that expire with their tokens."""
+
+    def __init__(self, client=None):
+        self.client = client or get_redis()
+        self.revoke_script = self.client.register_script(REVOKE_SCRIPT)
+
+    def revoke(self, jti, expires_at):
+        return bool(
+            self.revoke_script(
+                keys=[REVOKED_TOKEN_KEY.format(jti=jti), REVOKED_TOKENS_INDEX_KEY],
+                args=[jti, int(expires_at)],
+            )
+        )
+
+    def is_revoked(self, jti):
+        return bool(self.client.exists(REVOKED_TOKEN_KEY.format(jti=jti)))
+
+    def live_ids(self):
+        ids = self.client.zrangebyscore(REVOKED_TOKENS_INDEX_KEY, time.time(), "+inf")
+        return [jti.decode() for jti in ids]
+
+    def sweep(self):
+        return self.client.zremrangebyscore(
+            REVOKED_TOKENS_INDEX_KEY, "-inf", time.time()
+        )
+
+
+class LocalRevocationStore(RevocationStore):
+    """In-process stand-in for the Redis store, for tests and local runs."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.expiries = {}
+
+    def revoke(self, jti, expires_at):
+        with self.lock:
+            if self.expiries.get(jti, 0) > time.time():
+                return False
+            self.expiries[jti] = expires_at
+            return True
+
+    def is_revoked(self, jti):
+        return self.expiries.get(jti, 0) > time.time()
+
+    def live_ids(self):
+        now = time.time()
+        with self.lock:
+            return [jti for jti, expires in self.expiries.items() if expires > now]
+
+    def sweep(self):
+        now = time.time()
+        with self.lock:
+            expired = [jti for jti, expires in self.expiries.items() if expires <= now]
+            for jti in expired:
+                del self.expiries[jti]
+        return len(expired)
+
+
+class RevocationList:
+    """
+    A revocation store fronted by an in-process Bloom filter of its ids, so
+    the common case (a token that was never revoked) is answered without a
+    round trip.
+
+    The filter is rebuilt from the store every ``REVOKED_TOKEN_BLOOM_TIMEOUT``
+    seconds and only learns this process's own revocations in between, so
+    ``is_revoked`` may miss one made elsewhere for that long. ``revoke`` always
+    asks the store, which is what makes a rotated refresh token single-use.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.bloom_expires = 0
+
+    def _get_bloom(self):
+        with self.lock:
+            bloom = self.bloom
+            if bloom is None or self.bloom_expires <= time.monotonic():
+                ids = self.store.live_ids()
+                bloom = BloomFilter(max(2 * len(ids), BLOOM_MIN_CAPACITY))
+                for jti in ids:
+                    bloom.add(jti)
+                self.bloom = bloom
+                self.bloom_expires = (
+                    time.monotonic() + settings.REVOKED_TOKEN_BLOOM_TIMEOUT
+                )
+            return bloom
+
+    def revoke(self, jti, expires_at):
+        revoked = self.store.revoke(jti, expires_at)
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+                if len(self.bloom) > self.bloom.capacity:
+                    # Past its capacity the error rate climbs; resize it.
+                    self.bloom = None
+        return revoked
+
+    def is_revoked(self, jti):
+        if jti not in self._get_bloom():
+            return False
+        return self.store.is_revoked(jti)
+
+    def sweep(self):
+        swept = self.store.sweep()
+        with self.lock:
+            self.bloom = None
+        return swept
+
+
+_revoked_tokens = None
+_revoked_tokens_lock = threading.Lock()
+
+
+def get_revoked_tokens():
+    """Revocation list over Redis when the cache is django-redis, else local."""
+    global _revoked_tokens
+    if _revoked_tokens is None:
+        with _revoked_tokens_lock:
+            if _revoked_tokens is None:
+                if redis_available():
+                    store = RedisRevocationStore()
+                else:
+                    store = LocalRevocationStore()
+                _revoked_tokens = RevocationList(store)
+    return _revoked_tokens
@@ -1,9 +1,19 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+    TokenVerifySerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
 from drf_spectacular.utils import extend_schema_serializer, OpenApiExample
 
+from accounts.revocation import get_revoked_tokens
+
 User = get_user_model()
 
 
@@ -29,6 +39,8 @@ class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
     def get_token(cls, user):
         token = super().get_token(user)
         token["email"] = user.email
+        # Read by TokenUserAuthentication, which never loads the user row.
+        token["is_staff"] = user.is_staff
         return token
 
     def validate(self, attrs):
@@ -36,6 +48,56 @@ class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
         return super().validate(attrs)
 
 
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refreshes a token pair, turning down revoked refresh tokens and, when
+    rotation is on, revoking the one it was given so it works only once.
+
+    Rotates without ``RefreshToken.outstand()``, which needs the
+    ``token_blacklist`` app this project does without.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        jti = refresh[api_settings.JTI_CLAIM]
+        revoked_tokens = get_revoked_tokens()
+        if revoked_tokens.is_revoked(jti):
+            raise InvalidToken(_("Token is blacklisted"))
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        if user_id is not None:
+            user = User.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).first()
+            if not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(
+                    self.error_messages["no_active_account"], "no_active_account"
+                )
+
+        data = {"access": str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # Losing this race means a concurrent refresh used it first.
+            if api_settings.BLACKLIST_AFTER_ROTATION and not revoked_tokens.revoke(
+                jti, refresh["exp"]
+            ):
+                raise InvalidToken(_("Token is blacklisted"))
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+        return data
+
+
+class RevocableTokenVerifySerializer(TokenVerifySerializer):
+    """Verifies a token, counting revoked ones as invalid."""
+
+    def validate(self, attrs):
+        token = UntypedToken(attrs["token"])
+        if get_revoked_tokens().is_revoked(token.get(api_settings.JTI_CLAIM)):
+            raise InvalidToken(_("Token is blacklisted"))
+        return {}
+
+
 class PasswordConfirmationMixin(serializers.Serializer):
     """
     Mixin to enforce entering password twice for confirmation.
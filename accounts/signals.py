@@ -0,0 +1,17 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.authentication import forget_user
+from base.conditional import watch_tables
+
+User = get_user_model()
+
+watch_tables(User)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # Saves cover deactivation, set_admin and password changes.
+    forget_user(instance.pk)
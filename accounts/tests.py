@@ -1,8 +1,28 @@
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+from django.contrib.auth import authenticate
+from django.core.cache import cache
+from django.core.management import call_command
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from accounts import hashers
+from accounts.authentication import (
+    USER_CACHE_FIELDS,
+    USER_CACHE_KEY,
+    CachedJWTAuthentication,
+)
 from accounts.models import User
+from accounts.revocation import LocalRevocationStore, RevocationList
+from accounts.throttles import TokenRateThrottle
+from base import throttling
+from accounts.views import UserViewSet
+from base.testing import QUERY_BUDGET_PAGE_SIZES, assert_query_budget, count_queries
 
 
 @pytest.fixture
@@ -163,3 +183,226 @@ def test_permissions_for_non_admin(api_client, user):
     url = reverse("v1:accounts:accounts-set-admin", kwargs={"pk": user.pk})
     response = api_client.post(url, {"is_staff": True})
     assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_user_endpoint_query_budgets(api_client, admin_user):
+    api_client.force_authenticate(admin_user)
+    counts = {"list": {}, "retrieve": {}}
+    for size in QUERY_BUDGET_PAGE_SIZES:
+        User.objects.bulk_create(
+            User(email=f"user{i}@example.com")
+            for i in range(User.objects.count(), size)
+        )
+        counts["list"][size] = count_queries(
+            api_client, reverse("v1:accounts:accounts-list"), {"limit": size}
+        )
+        counts["retrieve"][size] = count_queries(
+            api_client, reverse("v1:accounts:accounts-detail", args=[admin_user.pk])
+        )
+    for action, action_counts in counts.items():
+        assert_query_budget(UserViewSet, action, action_counts)
+
+
+@pytest.mark.django_db
+def test_user_sparse_fieldsets(api_client, admin_user):
+    api_client.force_authenticate(admin_user)
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(
+            reverse("v1:accounts:accounts-list"), {"fields": "id,email"}
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert list(response.data["results"][0]) == ["id", "email"]
+    assert "phone_number" not in queries.captured_queries[-1]["sql"]
+
+    response = api_client.get(
+        reverse("v1:accounts:accounts-detail", args=[admin_user.pk]),
+        {"omit": "phone_number,date_of_birth"},
+    )
+    assert "phone_number" not in response.data
+    assert "email" in response.data
+
+
+@pytest.mark.django_db
+def test_jwt_user_resolution_is_cached_until_user_changes(api_client, user, admin_user):
+    response = api_client.post(
+        reverse("v1:accounts:token_obtain_pair"),
+        {"email": user.email, "password": "TestPass123!"},
+    )
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+    me_url = reverse("v1:accounts:accounts-me")
+    list_url = reverse("v1:accounts:accounts-list")
+    assert api_client.get(me_url).status_code == status.HTTP_200_OK
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(me_url)
+    assert response.status_code == status.HTTP_200_OK
+    # Only the profile itself: the token's user comes from the cache.
+    assert len(queries) == 1
+
+    # The caches hold what authentication reads, never the whole row.
+    cached = cache.get(USER_CACHE_KEY.format(user_id=user.pk))
+    assert set(cached) == set(USER_CACHE_FIELDS)
+    request_user = CachedJWTAuthentication().load_user(user.pk)
+    assert request_user.pk == user.pk and request_user.email == user.email
+    assert request_user.get_deferred_fields() >= {"password", "first_name"}
+
+    response = api_client.patch(me_url, {"first_name": "Changed"})
+    assert response.data["first_name"] == "Changed"
+    assert api_client.get(me_url).data["first_name"] == "Changed"
+
+    assert api_client.get(list_url).status_code == status.HTTP_403_FORBIDDEN
+    admin_client = APIClient()
+    admin_client.force_authenticate(admin_user)
+    response = admin_client.post(
+        reverse("v1:accounts:accounts-set-admin", args=[user.pk]), {"is_staff": True}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert api_client.get(list_url).status_code == status.HTTP_200_OK
+
+    deactivated = User.objects.get(pk=user.pk)
+    deactivated.is_active = False
+    deactivated.save()
+    assert api_client.get(me_url).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_rotated_refresh_token_is_revoked(api_client, user):
+    response = api_client.post(
+        reverse("v1:accounts:token_obtain_pair"),
+        {"email": user.email, "password": "TestPass123!"},
+    )
+    old_refresh = response.data["refresh"]
+    refresh_url = reverse("v1:accounts:token_refresh")
+    verify_url = reverse("v1:accounts:token_verify")
+
+    response = api_client.post(refresh_url, {"refresh": old_refresh})
+    assert response.status_code == status.HTTP_200_OK
+    new_refresh = response.data["refresh"]
+    response = api_client.post(refresh_url, {"refresh": old_refresh})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    response = api_client.post(verify_url, {"token": old_refresh})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    response = api_client.post(verify_url, {"token": new_refresh})
+    assert response.status_code == status.HTTP_200_OK
+    response = api_client.post(refresh_url, {"refresh": new_refresh})
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_revocation_list_sweeps_expired_tokens(settings):
+    revoked_tokens = RevocationList(LocalRevocationStore())
+    assert revoked_tokens.revoke("live", time.time() + 60)
+    assert not revoked_tokens.revoke("live", time.time() + 60)
+    assert revoked_tokens.revoke("lapsed", time.time() - 1)
+    assert revoked_tokens.is_revoked("live")
+    assert not revoked_tokens.is_revoked("lapsed")
+    assert not revoked_tokens.is_revoked("never")
+    assert revoked_tokens.sweep() == 1
+    assert revoked_tokens.store.live_ids() == ["live"]
+
+    call_command("sweep_revoked_tokens", stdout=(out := io.StringIO()))
+    assert out.getvalue().startswith("Swept ")
+
+
+@pytest.mark.django_db
+def test_password_hashing_runs_in_a_bounded_pool(
+    api_client, user, settings, monkeypatch
+):
+    settings.PASSWORD_HASHING_WORKERS = 1
+    settings.PASSWORD_HASHING_QUEUE_SIZE = 0
+    settings.PASSWORD_HASHING_QUEUE_TIMEOUT = 0.01
+    monkeypatch.setattr(hashers, "_pool", None)
+    pool = hashers.get_hashing_pool()
+    url = reverse("v1:accounts:token_obtain_pair")
+    data = {"email": user.email, "password": "TestPass123!"}
+    try:
+        # Hashes made inline still verify through the pool.
+        response = api_client.post(url, data)
+        assert response.status_code == status.HTTP_200_OK
+        assert pool.executor is not None
+
+        with pool.slots:
+            response = api_client.post(url, data)
+            assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            assert response["Retry-After"] == "1"
+            # Callers outside the API views (admin login, management
+            # commands) hash inline instead of failing.
+            assert authenticate(email=user.email, password="TestPass123!") == user
+    finally:
+        if pool.executor is not None:
+            pool.executor.shutdown()
+
+
+def test_sqlite_rate_limit_store_is_exact_under_concurrency(tmp_path):
+    store = throttling.SQLiteRateLimitStore(tmp_path / "rate_limit.sqlite3")
+    interval, tolerance = store.parameters(25, 60, burst=25)
+    # Each thread gets its own connection, as separate processes would.
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        waits = list(
+            executor.map(
+                lambda _: store.hit("client", interval, tolerance), range(80)
+            )
+        )
+    assert waits.count(0) == 25
+    assert all(0 < wait <= interval for wait in waits if wait)
+    assert store.hit("other-client", interval, tolerance) == 0
+
+
+@pytest.mark.parametrize("limit, period", [(5, 3600), (10, 60), (1, 60)])
+@pytest.mark.parametrize("burst", [1, None, 10])
+def test_rate_limit_caps_every_sliding_window(limit, period, burst):
+    interval, tolerance = throttling.RateLimitStore.parameters(
+        limit, period, burst or -(-limit // 2)
+    )
+    # A client retrying every 1/50th of a period for four periods.
+    tat, allowed = None, []
+    for step in range(200):
+        now = step * period / 50
+        new_tat, wait = throttling.RateLimitStore.gcra(tat, now, interval, tolerance)
+        if new_tat is not None:
+            tat = new_tat
+            allowed.append(now)
+    for start in allowed:
+        assert sum(start <= at < start + period for at in allowed) <= limit
+    # The cap is not stricter than asked: a full period lets ``limit`` through.
+    assert sum(at < period for at in allowed) == limit
+
+
+@pytest.mark.django_db
+def test_token_obtain_is_throttled_per_client(
+    api_client, user, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(
+        TokenRateThrottle, "THROTTLE_RATES", {"token_obtain": "4/minute"}
+    )
+    monkeypatch.setattr(
+        throttling,
+        "_store",
+        throttling.SQLiteRateLimitStore(tmp_path / "rate_limit.sqlite3"),
+    )
+    url = reverse("v1:accounts:token_obtain_pair")
+    data = {"email": user.email, "password": "TestPass123!"}
+    assert api_client.post(url, data).status_code == status.HTTP_200_OK
+    assert api_client.post(url, data).status_code == status.HTTP_200_OK
+    response = api_client.post(url, data)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    # Two at once; the other two are spread over the minute.
+    assert 0 < int(response["Retry-After"]) <= 20
+    response = api_client.post(url, data, REMOTE_ADDR="10.0.0.2")
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_hashing_pool_replaces_a_broken_executor():
+    pool = hashers.HashingPool(workers=1, queue_size=0, queue_timeout=1)
+    encoded = pool.run(hashers._pbkdf2_encode, "secret", "salt", 1000)
+    executor = pool.executor
+    try:
+        # A worker killed from outside (e.g. by the OOM killer) breaks the pool.
+        for process in list(executor._processes.values()):
+            process.kill()
+            process.join()
+        assert pool.run(hashers._pbkdf2_encode, "secret", "salt", 1000) == encoded
+        assert pool.executor is not executor
+    finally:
+        executor.shutdown()
+        if pool.executor is not None:
+            pool.executor.shutdown()
@@ -1,14 +1,14 @@
-from rest_framework.throttling import SimpleRateThrottle
+from base.throttling import SlidingWindowRateThrottle
 
 
-class SignupRateThrottle(SimpleRateThrottle):
+class SignupRateThrottle(SlidingWindowRateThrottle):
     scope = "signup"
 
     def get_cache_key(self, request, view):
         return self.get_ident(request)
 
 
-class TokenRateThrottle(SimpleRateThrottle):
+class TokenRateThrottle(SlidingWindowRateThrottle):
     scope = "token_obtain"
 
     def get_cache_key(self, request, view):
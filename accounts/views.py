@@ -7,6 +7,8 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework_simplejwt.views import TokenObtainPairView
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 
+from accounts import hashers
+from accounts.exceptions import PasswordHashingBusy
 from accounts.serializers import (
     EmailTokenObtainPairSerializer,
     UserCreateSerializer,
@@ -16,18 +18,34 @@ from accounts.serializers import (
     AdminRightsSerializer,
 )
 from accounts.throttles import TokenRateThrottle, SignupRateThrottle
-from base.mixins import BaseViewSetMixin
+from base.mixins import BaseViewSetMixin, ConditionalGetMixin
 
 User = get_user_model()
 
 
+class PasswordHashingViewMixin:
+    """
+    For views that hash passwords: when the hashing pool is full they answer
+    503 with Retry-After instead of hashing inline on the request thread.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with hashers.shedding_load():
+            return super().dispatch(request, *args, **kwargs)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, hashers.HashingPoolBusy):
+            exc = PasswordHashingBusy()
+        return super().handle_exception(exc)
+
+
 @extend_schema(
     summary="Obtain JWT token pair",
     description="Generate access and refresh JWT tokens by providing email and password.",
     request=EmailTokenObtainPairSerializer,
     responses={200: OpenApiResponse(description="Access and refresh tokens")},
 )
-class EmailTokenObtainPairView(TokenObtainPairView):
+class EmailTokenObtainPairView(PasswordHashingViewMixin, TokenObtainPairView):
     """
     Endpoint for user authentication and JWT token generation.
     """
@@ -37,7 +55,9 @@ class EmailTokenObtainPairView(TokenObtainPairView):
     throttle_classes = [TokenRateThrottle]
 
 
-class UserViewSet(BaseViewSetMixin, ModelViewSet):
+class UserViewSet(
+    PasswordHashingViewMixin, ConditionalGetMixin, BaseViewSetMixin, ModelViewSet
+):
     """
     A viewset for user account management, including signup, profile retrieval/update, and password change.
     """
@@ -69,6 +89,11 @@ class UserViewSet(BaseViewSetMixin, ModelViewSet):
         "password": [IsAuthenticated],
         "admin_rights": [IsAdminUser],
     }
+    query_budgets = {"list": 2, "retrieve": 1}
+
+    def get_own_user(self):
+        # request.user carries only the fields authentication reads.
+        return User.objects.get(pk=self.request.user.pk)
 
     @extend_schema(
         summary="Retrieve or update own profile",
@@ -78,12 +103,11 @@ class UserViewSet(BaseViewSetMixin, ModelViewSet):
     )
     @action(detail=False, methods=["get", "patch"], url_path="me")
     def me(self, request):
+        user = self.get_own_user()
         if request.method == "GET":
-            serializer = UserSerializer(request.user)
+            serializer = UserSerializer(user)
         else:
-            serializer = self.get_serializer(
-                request.user, data=request.data, partial=True
-            )
+            serializer = self.get_serializer(user, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
             serializer.save()
         return Response(serializer.data)
@@ -113,8 +137,9 @@ class UserViewSet(BaseViewSetMixin, ModelViewSet):
             data=request.data, context={"request": request}
         )
         serializer.is_valid(raise_exception=True)
-        request.user.set_password(serializer.validated_data["new_password"])
-        request.user.save()
+        user = self.get_own_user()
+        user.set_password(serializer.validated_data["new_password"])
+        user.save()
         return Response(
             {"detail": "Password updated successfully"},
             status=status.HTTP_200_OK
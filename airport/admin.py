@@ -9,6 +9,7 @@ from airport.models import (
     Order,
     SeatClass,
     Seat,
+    SeatHold,
     Ticket,
 )
 
@@ -82,3 +83,10 @@ class TicketAdmin(admin.ModelAdmin):
     list_display = ("id", "flight", "seat", "order")
     search_fields = ("flight__id", "order__user__email")
     list_filter = ("flight", "order")
+
+
+@admin.register(SeatHold)
+class SeatHoldAdmin(admin.ModelAdmin):
+    list_display = ("id", "flight", "seat", "user", "expires_at")
+    search_fields = ("flight__id", "user__email")
+    list_filter = ("expires_at",)
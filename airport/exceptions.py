@@ -0,0 +1,13 @@
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+
+
+class SeatConflict(ValidationError):
+    """
+    Validation error raised when seats are taken by a concurrent order
+    between validation and insert.
+    """
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "One or more seats are already booked."
+    default_code = "seat_conflict"
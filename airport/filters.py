@@ -0,0 +1,26 @@
+from django_filters import rest_framework as filters
+
+from airport.models import Flight, Order
+from base.filters import LocalDateFilter
+
+
+class FlightFilter(filters.FilterSet):
+    departure_time__date = LocalDateFilter(field_name="departure_time")
+    arrival_time__date = LocalDateFilter(field_name="arrival_time")
+
+    class Meta:
+        model = Flight
+        fields = {
+            "route": ["exact"],
+            "airplane": ["exact"],
+            "departure_time": ["gte", "lte"],
+            "arrival_time": ["gte", "lte"],
+        }
+
+
+class OrderFilter(filters.FilterSet):
+    created_at__date = LocalDateFilter(field_name="created_at")
+
+    class Meta:
+        model = Order
+        fields = {"created_at": ["gte", "lte"]}
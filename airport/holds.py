@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Least
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from airport.exceptions import SeatConflict
+from airport.models import SeatHold, Ticket
+from airport.seat_map import bump_flight_version
+from base.conditional import touch_tables
+
+
+def sweep_expired_holds(**filters):
+    """Delete expired holds (optionally narrowed by ``filters``) in bulk."""
+    deleted, _ = SeatHold.objects.expired().filter(**filters).delete()
+    return deleted
+
+
+def held_seat_ids(flight, exclude_user=None):
+    """Seat ids of ``flight`` under an active hold."""
+    holds = SeatHold.objects.active().filter(flight=flight)
+    if exclude_user is not None:
+        holds = holds.exclude(user=exclude_user)
+    return set(holds.values_list("seat_id", flat=True))
+
+
+def hold_seats(user, flight, seat_ids):
+    """
+    Hold ``seat_ids`` of ``flight`` for ``user``, extending holds the user
+    already has on them up to ``SEAT_HOLD_MAX_AGE`` after they were taken.
+    Raises SeatConflict when a seat is booked or held by someone else, and
+    ValidationError past ``SEAT_HOLD_MAX_SEATS`` held seats.
+    """
+    seat_ids = list(seat_ids)
+    expires_at = timezone.now() + timedelta(seconds=settings.SEAT_HOLD_TIMEOUT)
+    with transaction.atomic():
+        sweep_expired_holds(flight=flight, seat_id__in=seat_ids)
+        booked = list(
+            Ticket.objects.filter(flight=flight, seat_id__in=seat_ids).values_list(
+                "seat_id", flat=True
+            )
+        )
+        if booked:
+            raise SeatConflict({"seat_ids": f"Seats {booked} are already booked."})
+        held = dict(
+            SeatHold.objects.filter(flight=flight, seat_id__in=seat_ids).values_list(
+                "seat_id", "user_id"
+            )
+        )
+        taken = [seat_id for seat_id, owner in held.items() if owner != user.pk]
+        if taken:
+            raise SeatConflict(
+                {"seat_ids": f"Seats {taken} are held by another customer."}
+            )
+        others = (
+            SeatHold.objects.active()
+            .filter(flight=flight, user=user)
+            .exclude(seat_id__in=seat_ids)
+            .count()
+        )
+        if others + len(set(seat_ids)) > settings.SEAT_HOLD_MAX_SEATS:
+            raise ValidationError(
+                {
+                    "seat_ids": f"At most {settings.SEAT_HOLD_MAX_SEATS} seats of "
+                    "a flight can be held at once."
+                }
+            )
+        max_age = timedelta(seconds=settings.SEAT_HOLD_MAX_AGE)
+        SeatHold.objects.filter(
+            flight=flight, seat_id__in=list(held), user=user
+        ).update(
+            expires_at=Least(Value(expires_at), F("created_at") + max_age),
+            updated_at=timezone.now(),
+        )
+        try:
+            with transaction.atomic():
+                SeatHold.objects.bulk_create(
+                    SeatHold(
+                        flight=flight, seat_id=seat_id, user=user, expires_at=expires_at
+                    )
+                    for seat_id in seat_ids
+                    if seat_id not in held
+                )
+        except IntegrityError:
+            raise SeatConflict(
+                {"seat_ids": "One or more seats were just held by another customer."}
+            )
+        bump_flight_version(flight.pk)
+        touch_tables(SeatHold)
+    return SeatHold.objects.filter(flight=flight, user=user, seat_id__in=seat_ids)
+
+
+def release_seats(user, flight, seat_ids=None):
+    """Drop the user's holds on ``flight``; all of them when no seats given."""
+    holds = SeatHold.objects.filter(flight=flight, user=user)
+    if seat_ids is not None:
+        holds = holds.filter(seat_id__in=list(seat_ids))
+    deleted, _ = holds.delete()
+    if deleted:
+        bump_flight_version(flight.pk)
+        touch_tables(SeatHold)
+    return deleted
@@ -0,0 +1,257 @@
+import heapq
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+from itertools import count
+from operator import attrgetter
+
+from django.db import transaction
+from django.utils import timezone
+
+from airport.models import Airport, Flight
+from base.cache import bump_generation, get_generation
+
+GRAPH_GENERATION = "flight-graph"
+
+Leg = namedtuple(
+    "Leg", "flight_id source_id destination_id departure_time arrival_time"
+)
+
+_departure_time = attrgetter("departure_time")
+
+LEG_FIELDS = (
+    "id",
+    "route__source_id",
+    "route__destination_id",
+    "departure_time",
+    "arrival_time",
+)
+
+
+class FlightGraph:
+    """
+    Time-expanded graph of flights: for every airport, its departures sorted
+    by time. A connection is any departure from the arrival airport inside
+    the allowed connection window.
+
+    A graph handed out by ``get_flight_graph`` is never modified where a
+    search reads it: changes go to a ``copy()`` that then replaces it, so
+    searches running on other threads keep a consistent snapshot.
+    """
+
+    def __init__(self, legs=(), airports=None, generation=None):
+        self.generation = generation
+        self.airports = dict(airports or {})
+        # Flight id -> leg, only read by add() and remove().
+        self.legs = {}
+        # Legs departing per airport, and per (source, destination) pair for
+        # the last leg of an itinerary, both sorted by departure time.
+        self.departures = {}
+        # Keys whose lists this graph may change in place; None for all.
+        self.owned = None
+        for leg in legs:
+            self.add(leg)
+
+    def __len__(self):
+        return len(self.legs)
+
+    def copy(self):
+        """
+        A graph sharing this one's departure lists until it changes them,
+        so a change costs the lists it touches rather than the whole graph.
+        The ``legs`` index moves to the copy: only the newest graph of a
+        series may be changed.
+        """
+        graph = FlightGraph(airports=self.airports, generation=self.generation)
+        graph.legs = self.legs
+        graph.departures = dict(self.departures)
+        graph.owned = set()
+        return graph
+
+    def _keys(self, leg):
+        return leg.source_id, (leg.source_id, leg.destination_id)
+
+    def _writable(self, key):
+        departures = self.departures.get(key, [])
+        if self.owned is not None and key not in self.owned:
+            departures = list(departures)
+            self.owned.add(key)
+        self.departures[key] = departures
+        return departures
+
+    def add(self, leg):
+        self.remove(leg.flight_id)
+        self.legs[leg.flight_id] = leg
+        for key in self._keys(leg):
+            insort(self._writable(key), leg, key=_departure_time)
+
+    def remove(self, flight_id):
+        leg = self.legs.pop(flight_id, None)
+        if leg is not None:
+            for key in self._keys(leg):
+                departures = self._writable(key)
+                index = bisect_left(departures, leg.departure_time, key=_departure_time)
+                while departures[index].flight_id != flight_id:
+                    index += 1
+                del departures[index]
+
+    def departing(self, airport_id, earliest, latest, destination=None):
+        key = airport_id if destination is None else (airport_id, destination)
+        departures = self.departures.get(key, ())
+        start = bisect_left(departures, earliest, key=_departure_time)
+        end = bisect_right(departures, latest, key=_departure_time)
+        return departures[start:end]
+
+    def search(
+        self,
+        origin,
+        destination,
+        departure_from,
+        departure_to,
+        max_stops=1,
+        min_connection=timedelta(minutes=45),
+        max_connection=timedelta(hours=24),
+        limit=10,
+    ):
+        """
+        Itineraries (lists of legs) from ``origin`` to ``destination`` whose
+        first leg departs inside the window, earliest arrival first.
+
+        Best-first search on arrival time; every (airport, stops) pair keeps
+        at most ``limit`` labels, which bounds the work on dense hubs. The
+        last allowed leg only looks at flights into ``destination``.
+        """
+        tie = count()
+        queue = [
+            (leg.arrival_time, next(tie), (leg,))
+            for leg in self.departing(
+                origin,
+                departure_from,
+                departure_to,
+                destination if max_stops == 0 else None,
+            )
+        ]
+        heapq.heapify(queue)
+        labels = defaultdict(int)
+        itineraries = []
+        while queue and len(itineraries) < limit:
+            arrival_time, _, path = heapq.heappop(queue)
+            airport_id = path[-1].destination_id
+            if airport_id == destination:
+                itineraries.append(list(path))
+                continue
+            stops = len(path)
+            if labels[airport_id, stops] >= limit:
+                continue
+            labels[airport_id, stops] += 1
+            last_leg = stops == max_stops
+            visited = {origin, *(leg.destination_id for leg in path)}
+            for leg in self.departing(
+                airport_id,
+                arrival_time + min_connection,
+                arrival_time + max_connection,
+                destination if last_leg else None,
+            ):
+                next_airport = leg.destination_id
+                if next_airport in visited:
+                    continue
+                if (
+                    next_airport != destination
+                    and labels[next_airport, stops + 1] >= limit
+                ):
+                    # Everything popped there so far arrived earlier.
+                    continue
+                heapq.heappush(queue, (leg.arrival_time, next(tie), path + (leg,)))
+        return itineraries
+
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def _legs(queryset):
+    return (Leg(*values) for values in queryset.values_list(*LEG_FIELDS))
+
+
+def _airports(queryset):
+    return {
+        pk: (name, city)
+        for pk, name, city in queryset.values_list("id", "name", "closest_big_city")
+    }
+
+
+def _upcoming(flights):
+    return flights.filter(departure_time__gte=timezone.now())
+
+
+def build_flight_graph(generation=None):
+    flights = _upcoming(Flight.objects.all())
+    return FlightGraph(_legs(flights), _airports(Airport.objects.all()), generation)
+
+
+def get_flight_graph():
+    """
+    Process-wide flight graph. Changes made by this process are applied
+    incrementally; a generation bumped by another process means updates
+    were missed and triggers a full rebuild.
+    """
+    global _graph
+    generation = get_generation(GRAPH_GENERATION)
+    with _graph_lock:
+        if _graph is None or _graph.generation != generation:
+            _graph = build_flight_graph(generation)
+        return _graph
+
+
+def _apply_change(update):
+    global _graph
+    generation = bump_generation(GRAPH_GENERATION)
+    with _graph_lock:
+        if _graph is not None and _graph.generation == generation - 1:
+            # Readers may be searching the current graph; swap in a new one.
+            graph = _graph.copy()
+            update(graph)
+            graph.generation = generation
+            _graph = graph
+        else:
+            _graph = None
+
+
+def _refresh_flights(graph, flight_ids):
+    flights = _upcoming(Flight.objects.filter(pk__in=flight_ids))
+    legs = {leg.flight_id: leg for leg in _legs(flights)}
+    for flight_id in flight_ids:
+        if flight_id in legs:
+            graph.add(legs[flight_id])
+        else:
+            graph.remove(flight_id)
+
+
+def flight_changed(flight_id):
+    """Re-read (or drop) one flight of the graph once the transaction commits."""
+    transaction.on_commit(
+        lambda: _apply_change(lambda graph: _refresh_flights(graph, [flight_id]))
+    )
+
+
+def route_changed(route_id):
+    """Re-read the flights of a route once the transaction commits."""
+
+    def update(graph):
+        flight_ids = list(
+            Flight.objects.filter(route_id=route_id).values_list("id", flat=True)
+        )
+        _refresh_flights(graph, flight_ids)
+
+    transaction.on_commit(lambda: _apply_change(update))
+
+
+def airport_changed(airport_id):
+    """Re-read the name and city of an airport once the transaction commits."""
+
+    def update(graph):
+        graph.airports.pop(airport_id, None)
+        graph.airports.update(_airports(Airport.objects.filter(pk=airport_id)))
+
+    transaction.on_commit(lambda: _apply_change(update))
@@ -0,0 +1,88 @@
+import random
+import uuid
+from datetime import timedelta
+
+from django.utils import timezone
+
+from airport.itineraries import FlightGraph, Leg
+from base.benchmark import BenchmarkCommand, Timer, percentile
+
+
+class Command(BenchmarkCommand):
+    help = "Build the in-memory flight graph and time itinerary searches on it."
+
+    uses_database = False
+
+    def add_arguments(self, parser):
+        parser.add_argument("--flights", type=int, nargs="+", default=[10_000, 100_000])
+        parser.add_argument("--airports", type=int, default=300)
+        parser.add_argument("--days", type=int, default=14)
+        parser.add_argument("--searches", type=int, default=500)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def benchmark(self, flights, airports, days, searches, seed, **options):
+        rng = random.Random(seed)
+        airport_ids = [uuid.UUID(int=rng.getrandbits(128)) for _ in range(airports)]
+        # A few hubs take most of the traffic, like a real network.
+        weights = [1 / (rank + 1) for rank in range(airports)]
+        start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        for size in flights:
+            legs = []
+            for _ in range(size):
+                source, destination = rng.choices(airport_ids, weights, k=2)
+                while destination == source:
+                    destination = rng.choice(airport_ids)
+                departure = start + timedelta(minutes=rng.randrange(days * 24 * 60))
+                duration = timedelta(minutes=rng.randrange(45, 12 * 60))
+                legs.append(
+                    Leg(
+                        uuid.uuid4(),
+                        source,
+                        destination,
+                        departure,
+                        departure + duration,
+                    )
+                )
+            with Timer() as timer:
+                graph = FlightGraph(legs)
+            self.stdout.write(f"--- {size:,} flights, {airports} airports")
+            self.report("graph build", timer.elapsed, size, "flights")
+
+            for max_stops in (1, 2):
+                latencies = []
+                found = 0
+                for _ in range(searches):
+                    origin, destination = rng.sample(airport_ids, 2)
+                    day = start + timedelta(days=rng.randrange(days - 1))
+                    with Timer() as timer:
+                        found += bool(
+                            graph.search(
+                                origin,
+                                destination,
+                                day,
+                                day + timedelta(days=1),
+                                max_stops=max_stops,
+                            )
+                        )
+                    latencies.append(timer.elapsed)
+                self.report(
+                    f"search max_stops={max_stops}",
+                    sum(latencies),
+                    searches,
+                    "searches",
+                )
+                self.stdout.write(
+                    f"    p50={percentile(latencies, 0.5) * 1000:.2f}ms "
+                    f"p99={percentile(latencies, 0.99) * 1000:.2f}ms "
+                    f"with results: {found}/{searches}"
+                )
+
+            # Each change is applied to a copy that replaces the graph.
+            flight_id = legs[0].flight_id
+            with Timer() as timer:
+                for leg in legs[:1000]:
+                    graph = graph.copy()
+                    graph.remove(leg.flight_id)
+                    graph.add(leg)
+            self.report("incremental update", timer.elapsed, 1000, "flights")
+            assert flight_id in graph.legs
@@ -0,0 +1,71 @@
+import io
+import random
+import uuid
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from base.benchmark import BenchmarkCommand, Timer
+from base.parsers import FastJSONParser
+from base.renderers import FastJSONRenderer
+
+
+class Command(BenchmarkCommand):
+    help = (
+        "Time rendering and parsing of flight-list-shaped pages with the stock "
+        "and the fast JSON renderer and parser."
+    )
+
+    uses_database = False
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000])
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def page(self, rng, rows):
+        start = timezone.now()
+        results = []
+        for index in range(rows):
+            departure = start + timedelta(minutes=rng.randrange(14 * 24 * 60))
+            results.append(
+                {
+                    "id": uuid.UUID(int=rng.getrandbits(128)),
+                    "route": f"Airport {index} -> Airport {index + 1}",
+                    "airplane": uuid.UUID(int=rng.getrandbits(128)),
+                    "departure_time": departure,
+                    "arrival_time": departure + timedelta(hours=2),
+                    "capacity": 180,
+                    "seats_left": rng.randrange(181),
+                }
+            )
+        return {"count": rows, "next": None, "previous": None, "results": results}
+
+    def benchmark(self, rows, repeat, seed, **options):
+        rng = random.Random(seed)
+        for size in rows:
+            data = self.page(rng, size)
+            self.stdout.write(f"--- {size:,} rows per page")
+            body = None
+            for renderer in (JSONRenderer(), FastJSONRenderer()):
+                with Timer() as timer:
+                    for _ in range(repeat):
+                        body = renderer.render(data)
+                self.report(
+                    f"render {type(renderer).__name__}",
+                    timer.elapsed,
+                    size * repeat,
+                    "rows",
+                )
+            for parser in (JSONParser(), FastJSONParser()):
+                with Timer() as timer:
+                    for _ in range(repeat):
+                        parser.parse(io.BytesIO(body))
+                self.report(
+                    f"parse {type(parser).__name__}",
+                    timer.elapsed,
+                    size * repeat,
+                    "rows",
+                )
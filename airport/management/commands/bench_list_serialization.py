@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from airport.models import (
+    Airport,
+    Route,
+    AirplaneType,
+    Airplane,
+    Flight,
+    SeatClass,
+    Seat,
+)
+from airport.views import AirportViewSet, FlightViewSet, RouteViewSet, SeatViewSet
+from base.benchmark import BenchmarkCommand, Timer
+
+
+class Command(BenchmarkCommand):
+    help = (
+        "Compare rows per second of the values() list path with model "
+        "serialization on the airport, route, seat and flight lists."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def seed(self, rows):
+        hub = Airport.objects.create(name="Hub", closest_big_city="Hub")
+        airports = Airport.objects.bulk_create(
+            Airport(name=f"Airport {i}", closest_big_city=f"City {i}")
+            for i in range(rows)
+        )
+        routes = Route.objects.bulk_create(
+            Route(source=airport, destination=hub, distance=100 + i)
+            for i, airport in enumerate(airports)
+        )
+        airplane_type = AirplaneType.objects.create(
+            name="Bench", rows=rows, seats_in_row=1
+        )
+        airplane = Airplane.objects.create(name="Bench", airplane_type=airplane_type)
+        seat_class = SeatClass.objects.create(name="Economy")
+        Seat.objects.bulk_create(
+            Seat(
+                airplane_type=airplane_type, row=i + 1, seat="A", seat_class=seat_class
+            )
+            for i in range(rows)
+        )
+        start = timezone.now() + timedelta(days=1)
+        Flight.objects.bulk_create(
+            Flight(
+                route=route,
+                airplane=airplane,
+                departure_time=start + timedelta(minutes=i),
+                arrival_time=start + timedelta(minutes=i + 90),
+            )
+            for i, route in enumerate(routes)
+        )
+
+    def run_list(self, viewset, rows, use_values_list):
+        view = type(viewset.__name__, (viewset,), {"use_values_list": use_values_list})
+        request = APIRequestFactory().get("/", {"limit": rows})
+        response = view.as_view({"get": "list"})(request)
+        response.render()
+        return response.content
+
+    def benchmark(self, rows, repeat, **options):
+        self.seed(rows)
+        for viewset in (AirportViewSet, RouteViewSet, SeatViewSet, FlightViewSet):
+            contents = {}
+            for label, use_values_list in (("model", False), ("values", True)):
+                self.run_list(viewset, rows, use_values_list)  # warm up
+                with Timer() as timer:
+                    for _ in range(repeat):
+                        contents[label] = self.run_list(
+                            viewset, rows, use_values_list
+                        )
+                self.report(
+                    f"{viewset.__name__} {label}",
+                    timer.elapsed,
+                    rows * repeat,
+                    unit="rows",
+                )
+            if contents["model"] != contents["values"]:
+                self.stderr.write(f"{viewset.__name__}: outputs differ")
@@ -0,0 +1,137 @@
+import random
+import threading
+from collections import Counter
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from airport.models import (
+    Airport,
+    Route,
+    AirplaneType,
+    Airplane,
+    Flight,
+    Order,
+    SeatClass,
+    Seat,
+    Ticket,
+)
+from airport.serializers import OrderCreateSerializer
+from base.benchmark import BenchmarkCommand, Timer
+
+User = get_user_model()
+
+
+def book_select_then_insert(user, flight, seat_ids):
+    """The pre-claim booking path: SELECT booked seats, then INSERT."""
+    if Ticket.objects.filter(flight=flight, seat_id__in=seat_ids).exists():
+        return "rejected"
+    try:
+        with transaction.atomic():
+            order = Order.objects.create(user=user)
+            for seat_id in seat_ids:
+                Ticket.objects.create(order=order, flight=flight, seat_id=seat_id)
+    except IntegrityError:
+        return "integrity_error"
+    return "booked"
+
+
+def book_claim_then_insert(user, flight, seat_ids):
+    serializer = OrderCreateSerializer(
+        data={"flight_id": flight.pk, "seat_ids": seat_ids},
+        context={"request": SimpleNamespace(user=user)},
+    )
+    if not serializer.is_valid():
+        return "rejected"
+    try:
+        serializer.save()
+    except serializers.ValidationError:
+        return "rejected"
+    return "booked"
+
+
+class Command(BenchmarkCommand):
+    help = (
+        "Compare the claim-then-insert booking path with select-then-insert "
+        "under concurrent bookings of the same seats."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--attempts", type=int, default=25)
+        parser.add_argument("--group-size", type=int, default=3)
+        parser.add_argument("--hot-seats", type=int, default=12)
+
+    def benchmark(self, threads, attempts, group_size, hot_seats, **options):
+        flight, seat_ids = self.seed(hot_seats)
+        users = [
+            User.objects.create_user(email=f"bench{i}@example.com")
+            for i in range(threads)
+        ]
+        for label, book in (
+            ("select-then-insert", book_select_then_insert),
+            ("claim-then-insert", book_claim_then_insert),
+        ):
+            Order.objects.all().delete()
+            outcomes = Counter()
+            lock = threading.Lock()
+
+            def worker(user, seed):
+                rng = random.Random(seed)
+                try:
+                    for _ in range(attempts):
+                        group = rng.sample(seat_ids, group_size)
+                        try:
+                            outcome = book(user, flight, group)
+                        except OperationalError:
+                            outcome = "db_locked"
+                        with lock:
+                            outcomes[outcome] += 1
+                        if outcome == "booked":
+                            Ticket.objects.filter(
+                                flight=flight, seat_id__in=group
+                            ).delete()
+                finally:
+                    connection.close()
+
+            workers = [
+                threading.Thread(target=worker, args=(user, index))
+                for index, user in enumerate(users)
+            ]
+            with Timer() as timer:
+                for thread in workers:
+                    thread.start()
+                for thread in workers:
+                    thread.join()
+            self.report(label, timer.elapsed, threads * attempts, "bookings")
+            self.stdout.write(
+                "    " + ", ".join(f"{k}={v}" for k, v in sorted(outcomes.items()))
+            )
+
+    @staticmethod
+    def seed(hot_seats):
+        source = Airport.objects.create(name="Bench A", closest_big_city="A")
+        destination = Airport.objects.create(name="Bench B", closest_big_city="B")
+        route = Route.objects.create(
+            source=source, destination=destination, distance=100
+        )
+        airplane_type = AirplaneType.objects.create(
+            name="Bench type", rows=hot_seats, seats_in_row=1
+        )
+        airplane = Airplane.objects.create(name="Bench", airplane_type=airplane_type)
+        flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time=timezone.now() + timedelta(days=1),
+            arrival_time=timezone.now() + timedelta(days=1, hours=1),
+        )
+        seat_class = SeatClass.objects.create(name="Bench class")
+        seats = Seat.objects.bulk_create(
+            Seat(airplane_type=airplane_type, row=row, seat="A", seat_class=seat_class)
+            for row in range(1, hot_seats + 1)
+        )
+        return flight, [seat.pk for seat in seats]
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from airport.urls import router
+from base.cache import get_counters
+from base.mixins import CachedResponseMixin, response_cache_counter
+
+
+class Command(BaseCommand):
+    help = "Show response cache hits and misses of the cached airport endpoints."
+
+    def handle(self, *args, **options):
+        basenames = [
+            basename
+            for _, viewset, basename in router.registry
+            if issubclass(viewset, CachedResponseMixin)
+        ]
+        counters = get_counters(
+            response_cache_counter(basename, hit)
+            for basename in basenames
+            for hit in (True, False)
+        )
+        for basename in basenames:
+            hits = counters[response_cache_counter(basename, True)]
+            misses = counters[response_cache_counter(basename, False)]
+            total = hits + misses
+            ratio = f"{hits / total:.1%}" if total else "-"
+            self.stdout.write(
+                f"{basename:<16} {hits:>10} hits {misses:>10} misses {ratio:>7}"
+            )
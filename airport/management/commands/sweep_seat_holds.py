@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from airport.holds import sweep_expired_holds
+
+
+class Command(BaseCommand):
+    help = "Delete expired seat holds in bulk, once or every --interval seconds."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="Keep sweeping every INTERVAL seconds instead of running once.",
+        )
+
+    def handle(self, *args, interval, **options):
+        while True:
+            deleted = sweep_expired_holds()
+            self.stdout.write(f"Deleted {deleted} expired seat holds.")
+            if not interval:
+                break
+            time.sleep(interval)
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0002_seathold"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="airport",
+            index=models.Index(fields=["closest_big_city"], name="airport_city_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["route", "departure_time"], name="flight_route_departure_idx"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="flight",
+            name="route",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="flights",
+                to="airport.route",
+            ),
+        ),
+    ]
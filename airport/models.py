@@ -5,9 +5,20 @@ from django.conf import settings
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
-from django.db.models import Q, F, CheckConstraint, UniqueConstraint
+from django.db.models import (
+    Q,
+    F,
+    CheckConstraint,
+    UniqueConstraint,
+    Count,
+    OuterRef,
+    Subquery,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.text import slugify
 
+from base.filters import local_day_range
 from base.models import TimestampedUUIDBaseModel
 
 
@@ -15,6 +26,11 @@ class Airport(TimestampedUUIDBaseModel):
     name = models.CharField(max_length=255, unique=True)
     closest_big_city = models.CharField(max_length=255)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=("closest_big_city",), name="airport_city_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -75,8 +91,69 @@ class Crew(TimestampedUUIDBaseModel):
         return f"{self.first_name} {self.last_name}"
 
 
+def _count_subquery(queryset, group_by):
+    return Coalesce(
+        Subquery(
+            queryset.order_by()
+            .values(group_by)
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+def _airport_lookup(prefix, airport):
+    if isinstance(airport, uuid.UUID):
+        return Q(**{f"{prefix}_id": airport})
+    return Q(**{f"{prefix}__closest_big_city": airport})
+
+
+class FlightQuerySet(models.QuerySet):
+    def with_availability(self):
+        """
+        Annotate ``capacity`` (seats of the airplane type) and ``seats_left``
+        (capacity minus tickets and active holds) as correlated subqueries of
+        the same SELECT.
+        """
+        capacity = _count_subquery(
+            Seat.objects.filter(airplane_type=OuterRef("airplane__airplane_type")),
+            "airplane_type",
+        )
+        booked = _count_subquery(
+            Ticket.objects.filter(flight=OuterRef("pk")), "flight"
+        )
+        held = _count_subquery(
+            SeatHold.objects.active().filter(flight=OuterRef("pk")), "flight"
+        )
+        return self.annotate(
+            capacity=capacity, seats_left=F("capacity") - booked - held
+        )
+
+    def between(self, origin, destination):
+        """
+        Flights from ``origin`` to ``destination``, each an airport ID or a
+        city matched against ``closest_big_city``.
+        """
+        return self.filter(
+            _airport_lookup("route__source", origin),
+            _airport_lookup("route__destination", destination),
+        )
+
+    def departing_on(self, date):
+        """
+        Flights departing on a local calendar day, as a half-open range on
+        ``departure_time`` so the index on it can be used (unlike ``__date``).
+        """
+        start, end = local_day_range(date)
+        return self.filter(departure_time__gte=start, departure_time__lt=end)
+
+
 class Flight(TimestampedUUIDBaseModel):
-    route = models.ForeignKey(Route, on_delete=models.CASCADE, related_name="flights")
+    # Indexed by flight_route_departure_idx, which leads with route.
+    route = models.ForeignKey(
+        Route, on_delete=models.CASCADE, related_name="flights", db_index=False
+    )
     airplane = models.ForeignKey(
         Airplane, on_delete=models.PROTECT, related_name="flights"
     )
@@ -84,22 +161,41 @@ class Flight(TimestampedUUIDBaseModel):
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(Crew, related_name="flights")
 
+    objects = FlightQuerySet.as_manager()
+
     class Meta:
         constraints = [
             CheckConstraint(
                 check=Q(departure_time__lt=F("arrival_time")), name="flight_times_order"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=("route", "departure_time"), name="flight_route_departure_idx"
+            ),
+            models.Index(fields=("departure_time",), name="flight_departure_idx"),
+            models.Index(fields=("arrival_time",), name="flight_arrival_idx"),
+        ]
 
     def __str__(self):
         return f"Flight {self.id} on {self.route}"
 
 
 class Order(TimestampedUUIDBaseModel):
+    # Indexed by order_user_created_idx, which leads with user.
     user = models.ForeignKey(
-        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="orders"
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="orders",
+        db_index=False,
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=("user", "created_at"), name="order_user_created_idx"),
+            models.Index(fields=("created_at",), name="order_created_idx"),
+        ]
+
     def __str__(self):
         return f"Order {self.id} by {self.user}"
 
@@ -131,6 +227,9 @@ class Seat(TimestampedUUIDBaseModel):
 
     class Meta:
         unique_together = (("airplane_type", "row", "seat"),)
+        indexes = [
+            models.Index(fields=("row", "seat"), name="seat_row_seat_idx"),
+        ]
 
     def clean(self):
         super().clean()
@@ -163,3 +262,37 @@ class Ticket(TimestampedUUIDBaseModel):
     def __str__(self):
         return (f"Ticket {self.id}: {self.flight} Seat "
                 f"{self.seat.row}{self.seat.seat} ({self.seat.seat_class})")
+
+
+class SeatHoldQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(expires_at__gt=timezone.now())
+
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+
+class SeatHold(TimestampedUUIDBaseModel):
+    """
+    Keeps a seat of a flight for one user until ``expires_at``, while they
+    finish choosing seats and place the order.
+    """
+
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="seat_holds"
+    )
+    seat = models.ForeignKey(Seat, on_delete=models.CASCADE, related_name="holds")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="seat_holds"
+    )
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = SeatHoldQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=("flight", "seat"), name="unique_seat_hold"),
+        ]
+
+    def __str__(self):
+        return f"Hold of {self.seat} on {self.flight} until {self.expires_at}"
@@ -0,0 +1,132 @@
+import threading
+import time
+
+from django.conf import settings
+
+from base.redis import get_redis, redis_available
+
+SEAT_CLAIM_KEY = "airport:seat-claim:{{{flight_id}}}:{seat_id}"
+
+# Claims every key or none: returns the 1-based indexes of keys held by
+# another owner, and only writes when that list is empty.
+CLAIM_SCRIPT = """
+local conflicts = {}
+for i, key in ipairs(KEYS) do
+    local holder = redis.call("GET", key)
+    if holder and holder ~= ARGV[1] then
+        table.insert(conflicts, i)
+    end
+end
+if #conflicts == 0 then
+    for _, key in ipairs(KEYS) do
+        redis.call("SET", key, ARGV[1], "PX", ARGV[2])
+    end
+end
+return conflicts
+"""
+
+RELEASE_SCRIPT = """
+local released = 0
+for _, key in ipairs(KEYS) do
+    if redis.call("GET", key) == ARGV[1] then
+        released = released + redis.call("DEL", key)
+    end
+end
+return released
+"""
+
+
+class SeatReservationEngine:
+    """
+    Claims the seats of a flight for one owner, all or nothing.
+
+    A claim only guards the window between validating an order and inserting
+    its tickets; the ``Ticket(flight, seat)`` constraint stays the source of
+    truth once the tickets are committed.
+    """
+
+    def claim(self, flight_id, seat_ids, owner, timeout=None):
+        """Claim every seat or none; return the seat ids held by others."""
+        raise NotImplementedError
+
+    def release(self, flight_id, seat_ids, owner):
+        """Drop the claims ``owner`` holds on ``seat_ids``."""
+        raise NotImplementedError
+
+    @staticmethod
+    def get_timeout(timeout):
+        return settings.SEAT_CLAIM_TIMEOUT if timeout is None else timeout
+
+
+class RedisSeatReservationEngine(SeatReservationEngine):
+    """Claims seats with a single Lua script on the django-redis cache."""
+
+    def __init__(self, client=None):
+        self.client = client or get_redis()
+        self.claim_script = self.client.register_script(CLAIM_SCRIPT)
+        self.release_script = self.client.register_script(RELEASE_SCRIPT)
+
+    @staticmethod
+    def keys(flight_id, seat_ids):
+        return [
+            SEAT_CLAIM_KEY.format(flight_id=flight_id, seat_id=seat_id)
+            for seat_id in seat_ids
+        ]
+
+    def claim(self, flight_id, seat_ids, owner, timeout=None):
+        seat_ids = list(seat_ids)
+        conflicts = self.claim_script(
+            keys=self.keys(flight_id, seat_ids),
+            args=[owner, int(self.get_timeout(timeout) * 1000)],
+        )
+        return [seat_ids[index - 1] for index in conflicts]
+
+    def release(self, flight_id, seat_ids, owner):
+        self.release_script(keys=self.keys(flight_id, seat_ids), args=[owner])
+
+
+class LocalSeatReservationEngine(SeatReservationEngine):
+    """In-process stand-in for the Redis engine, for tests and local runs."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.claims = {}
+
+    def claim(self, flight_id, seat_ids, owner, timeout=None):
+        seat_ids = list(seat_ids)
+        now = time.monotonic()
+        expires_at = now + self.get_timeout(timeout)
+        with self.lock:
+            conflicts = []
+            for seat_id in seat_ids:
+                holder = self.claims.get((flight_id, seat_id))
+                if holder and holder[0] != owner and holder[1] > now:
+                    conflicts.append(seat_id)
+            if not conflicts:
+                for seat_id in seat_ids:
+                    self.claims[(flight_id, seat_id)] = (owner, expires_at)
+        return conflicts
+
+    def release(self, flight_id, seat_ids, owner):
+        with self.lock:
+            for seat_id in seat_ids:
+                holder = self.claims.get((flight_id, seat_id))
+                if holder and holder[0] == owner:
+                    del self.claims[(flight_id, seat_id)]
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_reservation_engine():
+    """Redis engine when the cache is django-redis, the local one otherwise."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                if redis_available():
+                    _engine = RedisSeatReservationEngine()
+                else:
+                    _engine = LocalSeatReservationEngine()
+    return _engine
@@ -0,0 +1,111 @@
+import heapq
+import threading
+from collections import defaultdict, deque
+
+from django.db import transaction
+
+from airport.models import Airport, Route
+from base.cache import bump_generation, get_generation
+
+GRAPH_GENERATION = "route-graph"
+
+
+class RouteGraph:
+    """
+    Routes as a weighted directed graph with precomputed all-pairs tables:
+    shortest distance and next hop (Dijkstra from every airport), and hop
+    counts (BFS from every airport).
+    """
+
+    def __init__(self, routes=(), airports=None, generation=None):
+        self.generation = generation
+        self.airports = dict(airports or {})
+        self.adjacency = defaultdict(dict)
+        for source, destination, distance in routes:
+            self.adjacency[source][destination] = distance
+        nodes = set(self.adjacency) | {
+            destination for edges in self.adjacency.values() for destination in edges
+        }
+        self.distances = {}
+        self.next_hops = {}
+        self.hops = {}
+        for node in nodes:
+            self.distances[node], self.next_hops[node] = self._dijkstra(node)
+            self.hops[node] = self._bfs(node)
+
+    def _dijkstra(self, source):
+        distances = {source: 0}
+        next_hops = {}
+        queue = [(0, source, None)]
+        while queue:
+            distance, node, first_hop = heapq.heappop(queue)
+            if distance > distances.get(node, distance):
+                continue
+            for neighbour, weight in self.adjacency.get(node, {}).items():
+                candidate = distance + weight
+                if candidate < distances.get(neighbour, candidate + 1):
+                    distances[neighbour] = candidate
+                    next_hops[neighbour] = first_hop or neighbour
+                    heapq.heappush(
+                        queue, (candidate, neighbour, first_hop or neighbour)
+                    )
+        return distances, next_hops
+
+    def _bfs(self, source):
+        hops = {source: 0}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for neighbour in self.adjacency.get(node, ()):
+                if neighbour not in hops:
+                    hops[neighbour] = hops[node] + 1
+                    queue.append(neighbour)
+        return hops
+
+    def shortest_path(self, source, destination):
+        """(distance, [airport ids]) of the shortest route, or None."""
+        distance = self.distances.get(source, {}).get(destination)
+        if distance is None:
+            return None
+        path = [source]
+        while path[-1] != destination:
+            path.append(self.next_hops[path[-1]][destination])
+        return distance, path
+
+    def reachable(self, source, max_hops):
+        """Airports reachable from ``source`` in 1..max_hops hops, with hops."""
+        return {
+            airport: hops
+            for airport, hops in self.hops.get(source, {}).items()
+            if 0 < hops <= max_hops
+        }
+
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def build_route_graph(generation=None):
+    routes = Route.objects.values_list("source_id", "destination_id", "distance")
+    airports = {
+        pk: (name, city)
+        for pk, name, city in Airport.objects.values_list(
+            "id", "name", "closest_big_city"
+        )
+    }
+    return RouteGraph(routes, airports, generation)
+
+
+def get_route_graph():
+    """Process-wide route graph, rebuilt when its generation moves on."""
+    global _graph
+    generation = get_generation(GRAPH_GENERATION)
+    with _graph_lock:
+        if _graph is None or _graph.generation != generation:
+            _graph = build_route_graph(generation)
+        return _graph
+
+
+def routes_changed():
+    """Invalidate the route graph of every process once the transaction commits."""
+    transaction.on_commit(lambda: bump_generation(GRAPH_GENERATION))
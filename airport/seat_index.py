@@ -0,0 +1,290 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from airport.models import Ticket
+from base.redis import get_redis, redis_available
+
+SEAT_INDEX_KEY = "airport:seat-index:{flight_id}"
+
+# Raw Redis keys of the Redis store: the bit string, and a hash with its
+# "rows:seats_in_row" layout and a counter of writes. The hash tag keeps
+# both in one cluster slot, as the scripts touch both.
+SEAT_INDEX_BITS_KEY = "airport:seat-index:{{{flight_id}}}:bits"
+SEAT_INDEX_META_KEY = "airport:seat-index:{{{flight_id}}}:meta"
+
+# ARGV: value (1 book, 0 release), timeout in ms, then row, column pairs; or
+# "delete" in place of the pairs. Always counts a write, so a rebuild racing
+# with it discards what it read; only patches a bitmap that exists.
+UPDATE_SCRIPT = """
+redis.call("HINCRBY", KEYS[2], "writes", 1)
+redis.call("PEXPIRE", KEYS[2], ARGV[2])
+if ARGV[3] == "delete" then
+    return redis.call("DEL", KEYS[1])
+end
+local layout = redis.call("HGET", KEYS[2], "layout")
+if not layout or redis.call("EXISTS", KEYS[1]) == 0 then
+    return 0
+end
+local rows, columns = string.match(layout, "(%d+):(%d+)")
+rows, columns = tonumber(rows), tonumber(columns)
+for i = 3, #ARGV, 2 do
+    local row, column = tonumber(ARGV[i]), tonumber(ARGV[i + 1])
+    if row >= 1 and row <= rows and column >= 0 and column < columns then
+        redis.call("SETBIT", KEYS[1], (row - 1) * columns + column, ARGV[1])
+    end
+end
+return 1
+"""
+
+# ARGV: write count seen before reading the tickets, bits, layout, timeout
+# in ms. Stores the rebuilt bitmap unless a write has been counted since.
+STORE_SCRIPT = """
+if (redis.call("HGET", KEYS[2], "writes") or "0") ~= ARGV[1] then
+    return 0
+end
+redis.call("SET", KEYS[1], ARGV[2], "PX", ARGV[4])
+redis.call("HSET", KEYS[2], "layout", ARGV[3])
+redis.call("PEXPIRE", KEYS[2], ARGV[4])
+return 1
+"""
+
+# Reverses the bit order of every byte: Redis numbers bits from the most
+# significant bit of the first byte, SeatBitmap from the least significant.
+_REVERSED_BITS = bytes(int(f"{byte:08b}"[::-1], 2) for byte in range(256))
+
+
+class SeatBitmap:
+    """
+    One bit per seat of a flight, laid out row-major from the airplane type
+    (rows × seats_in_row). A set bit means the seat is booked.
+    """
+
+    __slots__ = ("rows", "seats_in_row", "bits")
+
+    def __init__(self, rows, seats_in_row, bits=0):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        self.bits = bits
+
+    @classmethod
+    def for_airplane_type(cls, airplane_type, bits=0):
+        return cls(airplane_type.rows, airplane_type.seats_in_row, bits)
+
+    def position(self, row, seat):
+        column = ord(seat.upper()) - ord("A")
+        if not (1 <= row <= self.rows and 0 <= column < self.seats_in_row):
+            return None
+        return (row - 1) * self.seats_in_row + column
+
+    def book(self, row, seat):
+        position = self.position(row, seat)
+        if position is not None:
+            self.bits |= 1 << position
+
+    def release(self, row, seat):
+        position = self.position(row, seat)
+        if position is not None:
+            self.bits &= ~(1 << position)
+
+    def is_booked(self, row, seat):
+        position = self.position(row, seat)
+        return position is not None and bool(self.bits >> position & 1)
+
+    @property
+    def capacity(self):
+        return self.rows * self.seats_in_row
+
+    @property
+    def booked_count(self):
+        return self.bits.bit_count()
+
+    def matches(self, airplane_type):
+        return (self.rows, self.seats_in_row) == (
+            airplane_type.rows,
+            airplane_type.seats_in_row,
+        )
+
+    def to_cache(self):
+        return self.rows, self.seats_in_row, self.bits
+
+    @classmethod
+    def from_cache(cls, value):
+        return cls(*value)
+
+    def to_bytes(self):
+        """Bits as a Redis bit string (bit 0 is the top bit of byte 0)."""
+        size = (self.capacity + 7) // 8
+        return self.bits.to_bytes(size, "little").translate(_REVERSED_BITS)
+
+    @classmethod
+    def from_bytes(cls, rows, seats_in_row, data):
+        bits = int.from_bytes(data.translate(_REVERSED_BITS), "little")
+        return cls(rows, seats_in_row, bits)
+
+
+def _cache_key(flight_id):
+    return SEAT_INDEX_KEY.format(flight_id=flight_id)
+
+
+def build_seat_bitmap(flight_id, airplane_type):
+    """Rebuild the bitmap of a flight from its tickets."""
+    bitmap = SeatBitmap.for_airplane_type(airplane_type)
+    booked = Ticket.objects.filter(flight_id=flight_id).values_list(
+        "seat__row", "seat__seat"
+    )
+    for row, seat in booked:
+        bitmap.book(row, seat)
+    return bitmap
+
+
+class SeatIndexStore:
+    """Where flights' bitmaps are kept between requests."""
+
+    def get(self, flight_id, airplane_type):
+        """Bitmap of the flight, rebuilt when missing or laid out differently."""
+        raise NotImplementedError
+
+    def update(self, flight_id, seats, booked):
+        """Set (or clear) the bits of ``seats`` (row, letter) of a flight."""
+        raise NotImplementedError
+
+    def invalidate(self, flight_id):
+        raise NotImplementedError
+
+
+class RedisSeatIndexStore(SeatIndexStore):
+    """
+    Keeps each bitmap as a native Redis bit string next to a hash holding its
+    layout and a write counter, all updated by Lua scripts so concurrent
+    bookings of one flight never overwrite each other. A rebuild only stores
+    its bitmap if no write arrived while it read the tickets.
+    """
+
+    def __init__(self, client=None):
+        self.client = client or get_redis()
+        self.update_script = self.client.register_script(UPDATE_SCRIPT)
+        self.store_script = self.client.register_script(STORE_SCRIPT)
+
+    @staticmethod
+    def keys(flight_id):
+        return [
+            SEAT_INDEX_BITS_KEY.format(flight_id=flight_id),
+            SEAT_INDEX_META_KEY.format(flight_id=flight_id),
+        ]
+
+    @staticmethod
+    def timeout_ms():
+        return int(settings.SEAT_INDEX_TIMEOUT * 1000)
+
+    def get(self, flight_id, airplane_type):
+        bits_key, meta_key = self.keys(flight_id)
+        with self.client.pipeline(transaction=False) as pipe:
+            pipe.get(bits_key)
+            pipe.hmget(meta_key, "layout", "writes")
+            data, (layout, writes) = pipe.execute()
+        expected = f"{airplane_type.rows}:{airplane_type.seats_in_row}"
+        if data is not None and layout is not None and layout.decode() == expected:
+            return SeatBitmap.from_bytes(
+                airplane_type.rows, airplane_type.seats_in_row, data
+            )
+        bitmap = build_seat_bitmap(flight_id, airplane_type)
+        self.store_script(
+            keys=[bits_key, meta_key],
+            args=[
+                writes or 0,
+                bitmap.to_bytes(),
+                expected,
+                self.timeout_ms(),
+            ],
+        )
+        return bitmap
+
+    def update(self, flight_id, seats, booked):
+        args = [int(booked), self.timeout_ms()]
+        for row, seat in seats:
+            args += [row, ord(seat.upper()) - ord("A")]
+        self.update_script(keys=self.keys(flight_id), args=args)
+
+    def invalidate(self, flight_id):
+        # An update with no seats still bumps the write counter, which stops
+        # a rebuild in progress from storing what it read.
+        self.update_script(
+            keys=self.keys(flight_id), args=[0, self.timeout_ms(), "delete"]
+        )
+
+
+class LocalSeatIndexStore(SeatIndexStore):
+    """
+    Keeps bitmaps in the Django cache, for tests and local runs. That cache
+    is per process without Redis, so a write drops the bitmap instead of
+    patching it; other processes see bookings once theirs times out.
+    """
+
+    def get(self, flight_id, airplane_type):
+        cached = cache.get(_cache_key(flight_id))
+        if cached is not None:
+            bitmap = SeatBitmap.from_cache(cached)
+            if bitmap.matches(airplane_type):
+                return bitmap
+        bitmap = build_seat_bitmap(flight_id, airplane_type)
+        cache.set(
+            _cache_key(flight_id), bitmap.to_cache(), settings.SEAT_INDEX_TIMEOUT
+        )
+        return bitmap
+
+    def update(self, flight_id, seats, booked):
+        self.invalidate(flight_id)
+
+    def invalidate(self, flight_id):
+        cache.delete(_cache_key(flight_id))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_seat_index_store():
+    """Redis store when the cache is django-redis, the local one otherwise."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if redis_available():
+                    _store = RedisSeatIndexStore()
+                else:
+                    _store = LocalSeatIndexStore()
+    return _store
+
+
+def get_seat_bitmap(flight_id, airplane_type):
+    """
+    Return the booked-seat bitmap of a flight, rebuilding it from the
+    database when it is missing or was laid out for another airplane type.
+    """
+    return get_seat_index_store().get(flight_id, airplane_type)
+
+
+def mark_seats_booked(flight_id, seats):
+    """Set the bits of ``seats`` (row, letter) once the transaction commits."""
+    seats = list(seats)
+    transaction.on_commit(
+        lambda: get_seat_index_store().update(flight_id, seats, True)
+    )
+
+
+def mark_seats_released(flight_id, seats):
+    """Clear the bits of ``seats`` (row, letter) once the transaction commits."""
+    seats = list(seats)
+    transaction.on_commit(
+        lambda: get_seat_index_store().update(flight_id, seats, False)
+    )
+
+
+def invalidate_seat_bitmap(flight_id):
+    """Drop the bitmap of a flight now and again once the transaction commits."""
+    store = get_seat_index_store()
+    store.invalidate(flight_id)
+    transaction.on_commit(lambda: store.invalidate(flight_id))
@@ -0,0 +1,133 @@
+import string
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+from django.utils import timezone
+
+from airport.models import Seat, SeatHold, Ticket
+from base.cache import bump_generation, get_generation, get_generations
+
+SEAT_MAP_KEY = "airport:seat-map:{flight_id}:{version}"
+SEAT_LAYOUT_KEY = "airport:seat-layout:{airplane_type_id}:{version}"
+
+FREE, BOOKED, HELD, NO_SEAT = ".", "x", "h", "-"
+
+
+def _flight_generation(flight_id):
+    return f"flight:{flight_id}"
+
+
+def _airplane_type_generation(airplane_type_id):
+    return f"airplane-type:{airplane_type_id}"
+
+
+def get_seat_map_version(flight):
+    names = (
+        _flight_generation(flight.pk),
+        _airplane_type_generation(flight.airplane.airplane_type_id),
+    )
+    generations = get_generations(names)
+    return "-".join(str(generations[name]) for name in names)
+
+
+def bump_flight_version(flight_id):
+    """Invalidate the seat map of a flight once the transaction commits."""
+    transaction.on_commit(lambda: bump_generation(_flight_generation(flight_id)))
+
+
+def bump_airplane_type_version(airplane_type_id):
+    """Invalidate the seat maps of every flight flown by an airplane type."""
+    transaction.on_commit(
+        lambda: bump_generation(_airplane_type_generation(airplane_type_id))
+    )
+
+
+def get_seat_layout(airplane_type_id):
+    """
+    (id, row, seat, seat class name) of every seat of an airplane type, by
+    row and seat, cached per airplane type version.
+    """
+    version = get_generation(_airplane_type_generation(airplane_type_id))
+    key = SEAT_LAYOUT_KEY.format(airplane_type_id=airplane_type_id, version=version)
+    layout = cache.get(key)
+    if layout is None:
+        layout = list(
+            Seat.objects.filter(airplane_type_id=airplane_type_id)
+            .order_by("row", "seat")
+            .values_list("id", "row", "seat", "seat_class__name")
+        )
+        cache.set(key, layout, settings.SEAT_LAYOUT_TIMEOUT)
+    return layout
+
+
+def build_seat_map(flight):
+    """
+    Row-major seat map of a flight: seat-class runs plus an occupancy string
+    with one character per seat position, from a single query.
+    """
+    airplane_type = flight.airplane.airplane_type
+    rows, seats_in_row = airplane_type.rows, airplane_type.seats_in_row
+    now = timezone.now()
+    seats = (
+        Seat.objects.filter(airplane_type=airplane_type)
+        .annotate(
+            booked=Exists(Ticket.objects.filter(flight=flight, seat=OuterRef("pk"))),
+            held_until=Subquery(
+                SeatHold.objects.filter(
+                    flight=flight, seat=OuterRef("pk"), expires_at__gt=now
+                ).values("expires_at")[:1]
+            ),
+        )
+        .values_list("row", "seat", "seat_class__name", "booked", "held_until")
+    )
+    capacity = rows * seats_in_row
+    occupancy = [NO_SEAT] * capacity
+    classes = [None] * capacity
+    next_expiry = None
+    for row, letter, seat_class, booked, held_until in seats:
+        column = ord(letter.upper()) - ord("A")
+        if not (1 <= row <= rows and 0 <= column < seats_in_row):
+            continue
+        position = (row - 1) * seats_in_row + column
+        classes[position] = seat_class
+        if booked:
+            occupancy[position] = BOOKED
+        elif held_until:
+            occupancy[position] = HELD
+            next_expiry = min(next_expiry or held_until, held_until)
+        else:
+            occupancy[position] = FREE
+    runs = []
+    for seat_class in classes:
+        if runs and runs[-1][0] == seat_class:
+            runs[-1][1] += 1
+        else:
+            runs.append([seat_class, 1])
+    seat_map = {
+        "flight": flight.pk,
+        "rows": rows,
+        "seats_in_row": seats_in_row,
+        "columns": string.ascii_uppercase[:seats_in_row],
+        "classes": runs,
+        "occupancy": "".join(occupancy),
+    }
+    return seat_map, next_expiry
+
+
+def get_seat_map(flight):
+    """Seat map of a flight, cached per flight version."""
+    version = get_seat_map_version(flight)
+    key = SEAT_MAP_KEY.format(flight_id=flight.pk, version=version)
+    seat_map = cache.get(key)
+    if seat_map is None:
+        seat_map, next_expiry = build_seat_map(flight)
+        seat_map["version"] = version
+        timeout = settings.SEAT_MAP_TIMEOUT
+        if next_expiry is not None:
+            # Holds expire without a version bump: drop the map with them.
+            timeout = min(timeout, (next_expiry - timezone.now()).total_seconds())
+        if timeout > 0:
+            cache.set(key, seat_map, timeout)
+    return seat_map
@@ -1,6 +1,9 @@
+import uuid
+
 from rest_framework import serializers
+from django.core.exceptions import ImproperlyConfigured
 from django.utils import timezone
-from django.db import transaction
+from django.db import transaction, IntegrityError
 from airport.models import (
     Airport,
     Route,
@@ -11,8 +14,14 @@ from airport.models import (
     Order,
     SeatClass,
     Seat,
+    SeatHold,
     Ticket,
 )
+from airport.exceptions import SeatConflict
+from airport.reservations import get_reservation_engine
+from airport.seat_index import mark_seats_booked
+from airport.seat_map import bump_flight_version
+from base.conditional import touch_tables
 
 
 # Airport serializers
@@ -113,6 +122,33 @@ class RouteDetailSerializer(BaseRouteSerializer):
         )
 
 
+class ShortestRouteSearchSerializer(serializers.Serializer):
+    source = serializers.UUIDField(help_text="Departure airport ID.")
+    destination = serializers.UUIDField(help_text="Arrival airport ID.")
+
+
+class ReachableAirportsSearchSerializer(serializers.Serializer):
+    source = serializers.UUIDField(help_text="Departure airport ID.")
+    hops = serializers.IntegerField(
+        min_value=1, default=1, help_text="Maximum number of routes to chain."
+    )
+
+
+class RouteGraphAirportSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    name = serializers.CharField()
+    closest_big_city = serializers.CharField()
+
+
+class ShortestRouteSerializer(serializers.Serializer):
+    distance = serializers.IntegerField()
+    airports = RouteGraphAirportSerializer(many=True)
+
+
+class ReachableAirportSerializer(RouteGraphAirportSerializer):
+    hops = serializers.IntegerField()
+
+
 # AirplaneType serializers
 class BaseAirplaneTypeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -234,6 +270,7 @@ class CrewListSerializer(BaseCrewSerializer):
             "id",
             "full_name",
         )
+        method_sources = {"full_name": ("first_name", "last_name")}
 
     def get_full_name(self, crew_instance):
         return f"{crew_instance.first_name} {crew_instance.last_name}"
@@ -251,6 +288,27 @@ class CrewDetailSerializer(BaseCrewSerializer):
 
 
 # Flight serializers
+class AnnotationField(serializers.IntegerField):
+    """
+    Read-only integer from a queryset annotation. A plain read-only field
+    would silently drop itself from the output when the queryset lacks the
+    annotation; this one raises instead.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        try:
+            return getattr(instance, self.source)
+        except AttributeError:
+            raise ImproperlyConfigured(
+                f"{type(self.parent).__name__}.{self.field_name} reads the "
+                f"{self.source!r} annotation, which the queryset does not have."
+            )
+
+
 class BaseFlightSerializer(serializers.ModelSerializer):
     class Meta:
         model = Flight
@@ -279,6 +337,9 @@ class BaseFlightSerializer(serializers.ModelSerializer):
 class FlightListSerializer(BaseFlightSerializer):
     route = serializers.SerializerMethodField()
     airplane = serializers.SlugRelatedField(read_only=True, slug_field="name")
+    # Annotated by Flight.objects.with_availability().
+    capacity = AnnotationField()
+    seats_left = AnnotationField()
 
     class Meta(BaseFlightSerializer.Meta):
         fields = (
@@ -287,7 +348,17 @@ class FlightListSerializer(BaseFlightSerializer):
             "airplane",
             "departure_time",
             "arrival_time",
-        )
+            "capacity",
+            "seats_left",
+        )
+        method_sources = {
+            "route": (
+                "route.source.name",
+                "route.source.closest_big_city",
+                "route.destination.name",
+                "route.destination.closest_big_city",
+            )
+        }
 
     def get_route(self, flight_instance):
         source_airport = flight_instance.route.source
@@ -319,6 +390,84 @@ class FlightDetailSerializer(BaseFlightSerializer):
         )
 
 
+class AirportOrCityField(serializers.CharField):
+    """An airport ID (returned as UUID) or a city name (returned as str)."""
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        try:
+            return uuid.UUID(value)
+        except ValueError:
+            return value
+
+
+class FlightSearchSerializer(serializers.Serializer):
+    origin = AirportOrCityField(help_text="Departure airport ID or city.")
+    destination = AirportOrCityField(help_text="Arrival airport ID or city.")
+    date = serializers.DateField(help_text="Local departure date.")
+
+    def validate(self, attrs):
+        if attrs["origin"] == attrs["destination"]:
+            raise serializers.ValidationError("Origin and destination must differ.")
+        return attrs
+
+
+class ItinerarySearchSerializer(serializers.Serializer):
+    origin = serializers.UUIDField(help_text="Departure airport ID.")
+    destination = serializers.UUIDField(help_text="Arrival airport ID.")
+    date_from = serializers.DateField(help_text="Earliest departure date.")
+    date_to = serializers.DateField(
+        required=False, help_text="Latest departure date (defaults to date_from)."
+    )
+    max_stops = serializers.IntegerField(min_value=0, max_value=3, default=1)
+    min_connection = serializers.IntegerField(
+        min_value=0, default=45, help_text="Minimum connection time in minutes."
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+    def validate(self, attrs):
+        attrs.setdefault("date_to", attrs["date_from"])
+        if attrs["date_to"] < attrs["date_from"]:
+            raise serializers.ValidationError("date_to must not be before date_from.")
+        if attrs["origin"] == attrs["destination"]:
+            raise serializers.ValidationError("Origin and destination must differ.")
+        return attrs
+
+
+class ItineraryLegSerializer(serializers.Serializer):
+    flight = serializers.UUIDField(source="flight_id")
+    source = serializers.SerializerMethodField()
+    destination = serializers.SerializerMethodField()
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+
+    def _airport(self, airport_id):
+        name, city = self.context["airports"][airport_id]
+        return f"{name} ({city})"
+
+    def get_source(self, leg):
+        return self._airport(leg.source_id)
+
+    def get_destination(self, leg):
+        return self._airport(leg.destination_id)
+
+
+class ItinerarySerializer(serializers.Serializer):
+    departure_time = serializers.SerializerMethodField()
+    arrival_time = serializers.SerializerMethodField()
+    stops = serializers.SerializerMethodField()
+    legs = ItineraryLegSerializer(many=True, source="*")
+
+    def get_departure_time(self, legs) -> str:
+        return serializers.DateTimeField().to_representation(legs[0].departure_time)
+
+    def get_arrival_time(self, legs) -> str:
+        return serializers.DateTimeField().to_representation(legs[-1].arrival_time)
+
+    def get_stops(self, legs) -> int:
+        return len(legs) - 1
+
+
 # SeatClass serializers
 class BaseSeatClassSerializer(serializers.ModelSerializer):
     class Meta:
@@ -476,6 +625,15 @@ class TicketListSerializer(BaseTicketSerializer):
             "flight",
             "seat",
         )
+        method_sources = {
+            "flight": (
+                "flight.route.source.name",
+                "flight.route.source.closest_big_city",
+                "flight.route.destination.name",
+                "flight.route.destination.closest_big_city",
+            ),
+            "seat": ("seat.row", "seat.seat"),
+        }
 
     def get_flight(self, ticket):
         flight = ticket.flight
@@ -502,6 +660,15 @@ class TicketDetailSerializer(BaseTicketSerializer):
             "created_at",
             "updated_at",
         )
+        method_sources = {
+            "flight": (
+                "flight.route.source.name",
+                "flight.route.source.closest_big_city",
+                "flight.route.destination.name",
+                "flight.route.destination.closest_big_city",
+            ),
+            "seat": ("seat.row", "seat.seat"),
+        }
 
     def get_flight(self, ticket):
         flight = ticket.flight
@@ -549,12 +716,22 @@ class OrderDetailSerializer(BaseOrderSerializer):
 
     class Meta(BaseOrderSerializer.Meta):
         fields = ("id", "user", "flight", "seats", "created_at", "updated_at")
+        method_sources = {
+            "flight": (
+                "tickets.flight.route.source.name",
+                "tickets.flight.route.source.closest_big_city",
+                "tickets.flight.route.destination.name",
+                "tickets.flight.route.destination.closest_big_city",
+            ),
+            "seats": ("tickets.seat.row", "tickets.seat.seat"),
+        }
 
     def get_flight(self, order):
-        ticket = order.tickets.first()
-        if not ticket:
+        # Indexing all() reads prefetched tickets; first() would query again.
+        tickets = order.tickets.all()
+        if not tickets:
             return None
-        flight = ticket.flight
+        flight = tickets[0].flight
         src = flight.route.source
         dst = flight.route.destination
         return (
@@ -568,6 +745,65 @@ class OrderDetailSerializer(BaseOrderSerializer):
         ]
 
 
+# SeatHold serializers
+class SeatHoldSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SeatHold
+        fields = ("id", "seat", "expires_at")
+        read_only_fields = fields
+
+
+class SeatHoldCreateSerializer(serializers.Serializer):
+    seat_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        write_only=True
+    )
+
+    def validate_seat_ids(self, seat_ids):
+        flight = self.context["flight"]
+        if flight.departure_time <= timezone.now():
+            raise serializers.ValidationError(
+                "Cannot hold seats on a flight that has already departed."
+            )
+        valid_seat_ids = Seat.objects.filter(
+            airplane_type_id=flight.airplane.airplane_type_id, pk__in=seat_ids
+        ).values_list("id", flat=True)
+        if set(seat_ids) != set(valid_seat_ids):
+            raise serializers.ValidationError(
+                "One or more seats are invalid for this flight."
+            )
+        return list(dict.fromkeys(seat_ids))
+
+
+class SeatMapSerializer(serializers.Serializer):
+    flight = serializers.UUIDField()
+    version = serializers.CharField(
+        help_text="Changes whenever the seat map of the flight changes."
+    )
+    rows = serializers.IntegerField()
+    seats_in_row = serializers.IntegerField()
+    columns = serializers.CharField(help_text="Seat letters of a row, e.g. ABCDEF.")
+    classes = serializers.ListField(
+        child=serializers.ListField(),
+        help_text="Row-major runs of [seat class name, number of positions]; "
+        "the name is null where the airplane type has no seat.",
+    )
+    occupancy = serializers.CharField(
+        help_text="One character per position, row-major: '.' free, "
+        "'x' booked, 'h' held, '-' no seat."
+    )
+
+
+class SeatHoldReleaseSerializer(serializers.Serializer):
+    seat_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        write_only=True,
+        help_text="Seats to release; all of the user's holds when omitted.",
+    )
+
+
 # Booking serializers
 class OrderCreateSerializer(serializers.Serializer):
     flight_id = serializers.UUIDField()
@@ -586,10 +822,10 @@ class OrderCreateSerializer(serializers.Serializer):
                 "Cannot book ticket for a flight that has already departed."
             )
         seat_ids = data["seat_ids"]
-        valid_seat_ids = Seat.objects.filter(
+        seats = Seat.objects.filter(
             airplane_type=flight.airplane.airplane_type, pk__in=seat_ids
-        ).values_list("id", flat=True)
-        if set(seat_ids) != set(valid_seat_ids):
+        ).values_list("id", "row", "seat")
+        if set(seat_ids) != {seat_id for seat_id, _, _ in seats}:
             raise serializers.ValidationError(
                 "One or more seats are invalid for this flight."
             )
@@ -603,19 +839,46 @@ class OrderCreateSerializer(serializers.Serializer):
             raise serializers.ValidationError(
                 {"seat_ids": f"Seats {list(booked)} are already booked."}
             )
+        user = self.context["request"].user
+        holds = SeatHold.objects.active().filter(
+            flight=flight, seat_id__in=seat_ids
+        ).values_list("seat_id", "user_id")
+        held_by_others = [seat_id for seat_id, owner in holds if owner != user.pk]
+        if held_by_others:
+            raise serializers.ValidationError(
+                {"seat_ids": f"Seats {held_by_others} are held by another customer."}
+            )
         data["flight"] = flight
+        data["seats"] = [(row, letter) for _, row, letter in seats]
+        data["has_holds"] = bool(holds)
         return data
 
     def create(self, validated_data):
         user = self.context["request"].user
         flight = validated_data["flight"]
         seat_ids = validated_data["seat_ids"]
-        with transaction.atomic():
-            order = Order.objects.create(user=user)
-            for seat_id in seat_ids:
-                Ticket.objects.create(
-                    order=order,
-                    flight=flight,
-                    seat_id=seat_id
+        engine = get_reservation_engine()
+        owner = uuid.uuid4().hex
+        conflicts = engine.claim(flight.pk, seat_ids, owner)
+        if conflicts:
+            raise SeatConflict({"seat_ids": f"Seats {conflicts} are already booked."})
+        try:
+            with transaction.atomic():
+                order = Order.objects.create(user=user)
+                Ticket.objects.bulk_create(
+                    Ticket(order=order, flight=flight, seat_id=seat_id)
+                    for seat_id in seat_ids
                 )
+                if validated_data["has_holds"]:
+                    SeatHold.objects.filter(
+                        flight=flight, seat_id__in=seat_ids, user=user
+                    ).delete()
+                # bulk_create skips post_save, so update the seat index here.
+                mark_seats_booked(flight.pk, validated_data["seats"])
+                bump_flight_version(flight.pk)
+                touch_tables(Ticket, SeatHold)
+        except IntegrityError:
+            raise SeatConflict({"seat_ids": SeatConflict.default_detail})
+        finally:
+            engine.release(flight.pk, seat_ids, owner)
         return order
@@ -0,0 +1,108 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from airport import itineraries, route_graph, seat_index
+from airport.models import (
+    Airport,
+    AirplaneType,
+    Airplane,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Seat,
+    SeatClass,
+    Ticket,
+)
+from airport.seat_map import bump_airplane_type_version, bump_flight_version
+from base.conditional import watch_tables
+
+# SeatHold is left out: its writes are bulk and touch the table themselves,
+# and a post_delete receiver would stop expired holds being swept in bulk.
+watch_tables(
+    Airport, Route, AirplaneType, Airplane, Crew, Flight, Order, SeatClass, Seat, Ticket
+)
+
+
+def _loaded_seat(ticket):
+    # Only a seat already on hand: loading it would cost a query per ticket,
+    # e.g. for every ticket of an order being cascade-deleted.
+    if Ticket.seat.is_cached(ticket):
+        return ticket.seat
+    return None
+
+
+@receiver(post_save, sender=Ticket)
+def ticket_saved(sender, instance, created, **kwargs):
+    seat = _loaded_seat(instance)
+    if created and seat is not None:
+        seat_index.mark_seats_booked(instance.flight_id, [(seat.row, seat.seat)])
+    else:
+        seat_index.invalidate_seat_bitmap(instance.flight_id)
+    bump_flight_version(instance.flight_id)
+
+
+@receiver(post_delete, sender=Ticket)
+def ticket_deleted(sender, instance, **kwargs):
+    seat = _loaded_seat(instance)
+    if seat is not None:
+        seat_index.mark_seats_released(instance.flight_id, [(seat.row, seat.seat)])
+    else:
+        seat_index.invalidate_seat_bitmap(instance.flight_id)
+    bump_flight_version(instance.flight_id)
+
+
+@receiver(post_save, sender=Flight)
+def flight_saved(sender, instance, created, **kwargs):
+    if not created:
+        seat_index.invalidate_seat_bitmap(instance.pk)
+        bump_flight_version(instance.pk)
+    itineraries.flight_changed(instance.pk)
+
+
+@receiver(post_delete, sender=Flight)
+def flight_deleted(sender, instance, **kwargs):
+    itineraries.flight_changed(instance.pk)
+
+
+@receiver(post_save, sender=Route)
+def route_saved(sender, instance, created, **kwargs):
+    if not created:
+        itineraries.route_changed(instance.pk)
+    route_graph.routes_changed()
+
+
+@receiver(post_delete, sender=Route)
+def route_deleted(sender, instance, **kwargs):
+    route_graph.routes_changed()
+
+
+@receiver(post_save, sender=Airport)
+def airport_saved(sender, instance, **kwargs):
+    itineraries.airport_changed(instance.pk)
+    route_graph.routes_changed()
+
+
+@receiver(post_save, sender=AirplaneType)
+def airplane_type_saved(sender, instance, created, **kwargs):
+    if not created:
+        bump_airplane_type_version(instance.pk)
+
+
+@receiver(post_save, sender=Seat)
+@receiver(post_delete, sender=Seat)
+def seat_changed(sender, instance, **kwargs):
+    bump_airplane_type_version(instance.airplane_type_id)
+
+
+@receiver(post_save, sender=SeatClass)
+def seat_class_saved(sender, instance, created, **kwargs):
+    # Seat maps and layouts carry class names.
+    if not created:
+        airplane_type_ids = (
+            Seat.objects.filter(seat_class=instance)
+            .values_list("airplane_type_id", flat=True)
+            .distinct()
+        )
+        for airplane_type_id in airplane_type_ids:
+            bump_airplane_type_version(airplane_type_id)
@@ -1,8 +1,13 @@
 import pytest
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import ModelSerializer, SerializerMethodField
 from rest_framework.test import APIClient
 
+from accounts.authentication import forget_user
 from airport.models import (
     Airport,
     Route,
@@ -14,15 +19,60 @@ from airport.models import (
     Seat,
     Ticket,
     Order,
+    SeatHold,
 )
+from airport.exceptions import SeatConflict
+from airport.holds import sweep_expired_holds
+from airport.itineraries import FlightGraph, Leg, get_flight_graph
+from airport.reservations import LocalSeatReservationEngine, get_reservation_engine
+from airport.route_graph import RouteGraph, get_route_graph
+from airport.seat_index import get_seat_bitmap, invalidate_seat_bitmap
+from airport.serializers import (
+    FlightListSerializer,
+    OrderCreateSerializer,
+    OrderDetailSerializer,
+    TicketDetailSerializer,
+)
+from airport.urls import router as airport_router
+from airport.views import AirportViewSet, FlightViewSet, RouteViewSet, SeatViewSet
+from base.testing import (
+    QUERY_BUDGET_PAGE_SIZES,
+    assert_no_seq_scans,
+    assert_query_budget,
+    count_queries,
+    explain,
+    requires_postgres,
+)
+from base.mixins import CachedResponseMixin, ConditionalGetMixin, ExportMixin
+from base.pagination import KeysetPagination, NoCountPagination, SelectablePagination
+from base.parsers import FastJSONParser
+from base.renderers import FastJSONRenderer
+from base.values import values_serializer
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
-from datetime import timedelta
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from datetime import UTC, datetime, time, timedelta
 from django.utils import timezone
+import base64
+import io
+import json
+import re
 import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
 
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -246,3 +296,1277 @@ def test_available_seats(api_client, flight, seat):
     response = api_client.get(url)
     assert response.status_code == 200
     assert any(s["id"] == str(seat.id) for s in response.data)
+
+
+@pytest.mark.django_db
+def test_available_seats_excludes_booked(
+    api_client, flight, seat, order, django_capture_on_commit_callbacks
+):
+    other_seat = Seat.objects.create(
+        airplane_type=seat.airplane_type, row=1, seat="B", seat_class=seat.seat_class
+    )
+    url = reverse("v1:airport:flight-available-seats", kwargs={"pk": str(flight.id)})
+    # Build the index before booking so the ticket updates it incrementally.
+    api_client.get(url)
+    with django_capture_on_commit_callbacks(execute=True):
+        Ticket.objects.create(flight=flight, seat=seat, order=order)
+    response = api_client.get(url)
+    assert [s["id"] for s in response.data] == [str(other_seat.id)]
+
+
+@pytest.mark.django_db
+def test_seat_bitmap_rebuilt_when_missing(flight, ticket):
+    airplane_type = flight.airplane.airplane_type
+    invalidate_seat_bitmap(flight.id)
+    bitmap = get_seat_bitmap(flight.id, airplane_type)
+    assert bitmap.is_booked(ticket.seat.row, ticket.seat.seat)
+    assert bitmap.booked_count == 1
+    assert bitmap.capacity == airplane_type.rows * airplane_type.seats_in_row
+
+
+def test_local_reservation_engine_claims_all_or_nothing():
+    engine = LocalSeatReservationEngine()
+    flight_id = uuid.uuid4()
+    assert engine.claim(flight_id, ["1A", "1B"], owner="alice") == []
+    assert engine.claim(flight_id, ["1B", "1C"], owner="bob") == ["1B"]
+    # The failed claim must not have taken 1C.
+    assert engine.claim(flight_id, ["1C"], owner="carol") == []
+    engine.release(flight_id, ["1A", "1B"], owner="bob")
+    assert engine.claim(flight_id, ["1B"], owner="bob") == ["1B"]
+    engine.release(flight_id, ["1A", "1B"], owner="alice")
+    assert engine.claim(flight_id, ["1B"], owner="bob") == []
+
+
+def test_local_reservation_engine_claims_expire():
+    engine = LocalSeatReservationEngine()
+    flight_id = uuid.uuid4()
+    assert engine.claim(flight_id, ["1A"], owner="alice", timeout=0) == []
+    assert engine.claim(flight_id, ["1A"], owner="bob") == []
+
+
+@pytest.mark.django_db
+def test_order_booking_rejects_claimed_seat(api_client, user, flight, seat):
+    engine = get_reservation_engine()
+    engine.claim(flight.id, [seat.id], owner="concurrent-request")
+    api_client.force_authenticate(user=user)
+    url = reverse("v1:airport:order-list")
+    payload = {"flight_id": str(flight.id), "seat_ids": [str(seat.id)]}
+    try:
+        response = api_client.post(url, payload, format="json")
+    finally:
+        engine.release(flight.id, [seat.id], owner="concurrent-request")
+    assert response.status_code == 409
+    assert "seat_ids" in response.data
+    assert not Ticket.objects.filter(flight=flight).exists()
+
+
+@pytest.mark.django_db
+def test_order_booking_inserts_tickets_in_one_statement(user, flight, seat_class):
+    seats = Seat.objects.bulk_create(
+        Seat(
+            airplane_type=flight.airplane.airplane_type,
+            row=row,
+            seat=letter,
+            seat_class=seat_class,
+        )
+        for row in (1, 2)
+        for letter in "ABC"
+    )
+    serializer = OrderCreateSerializer(
+        data={"flight_id": flight.id, "seat_ids": [seat.id for seat in seats]},
+        context={"request": SimpleNamespace(user=user)},
+    )
+    assert serializer.is_valid()
+    with CaptureQueriesContext(connection) as queries:
+        order = serializer.save()
+    statements = [
+        query["sql"]
+        for query in queries.captured_queries
+        if not query["sql"].startswith(("SAVEPOINT", "RELEASE SAVEPOINT"))
+    ]
+    assert len(statements) == 2
+    assert order.tickets.count() == 6
+
+
+@pytest.mark.django_db
+def test_order_booking_integrity_error_is_conflict(user, flight, seat):
+    serializer = OrderCreateSerializer(
+        data={"flight_id": flight.id, "seat_ids": [seat.id]},
+        context={"request": SimpleNamespace(user=user)},
+    )
+    assert serializer.is_valid()
+    # Another order takes the seat after validation.
+    Ticket.objects.create(
+        flight=flight, seat=seat, order=Order.objects.create(user=user)
+    )
+    with pytest.raises(SeatConflict) as error:
+        serializer.save()
+    assert error.value.status_code == 409
+
+
+@pytest.fixture
+def other_user(db):
+    return User.objects.create_user(email="other@example.com", password="otherpass")
+
+
+@pytest.mark.django_db
+def test_seat_hold_blocks_other_customers(api_client, user, other_user, flight, seat):
+    holds_url = reverse("v1:airport:flight-holds", kwargs={"pk": str(flight.id)})
+    api_client.force_authenticate(user=user)
+    response = api_client.post(holds_url, {"seat_ids": [str(seat.id)]}, format="json")
+    assert response.status_code == 201
+    assert response.data[0]["seat"] == seat.id
+
+    seats_url = reverse(
+        "v1:airport:flight-available-seats", kwargs={"pk": str(flight.id)}
+    )
+    assert api_client.get(seats_url).data == {"detail": "No seats available"}
+
+    api_client.force_authenticate(user=other_user)
+    response = api_client.post(holds_url, {"seat_ids": [str(seat.id)]}, format="json")
+    assert response.status_code == 409
+    order_url = reverse("v1:airport:order-list")
+    payload = {"flight_id": str(flight.id), "seat_ids": [str(seat.id)]}
+    response = api_client.post(order_url, payload, format="json")
+    assert response.status_code == 400
+    assert "held" in str(response.data["seat_ids"])
+
+
+@pytest.mark.django_db
+def test_seat_hold_release(api_client, user, flight, seat):
+    holds_url = reverse("v1:airport:flight-holds", kwargs={"pk": str(flight.id)})
+    api_client.force_authenticate(user=user)
+    api_client.post(holds_url, {"seat_ids": [str(seat.id)]}, format="json")
+    response = api_client.delete(holds_url)
+    assert response.status_code == 204
+    assert not SeatHold.objects.exists()
+
+
+@pytest.mark.django_db
+def test_seat_holds_are_capped(settings, api_client, user, flight, seat, seat_class):
+    settings.SEAT_HOLD_MAX_SEATS = 1
+    other_seat = Seat.objects.create(
+        airplane_type=seat.airplane_type, row=2, seat="A", seat_class=seat_class
+    )
+    holds_url = reverse("v1:airport:flight-holds", kwargs={"pk": str(flight.id)})
+    api_client.force_authenticate(user=user)
+    response = api_client.post(
+        holds_url, {"seat_ids": [str(seat.id), str(other_seat.id)]}, format="json"
+    )
+    assert response.status_code == 400
+    assert api_client.post(
+        holds_url, {"seat_ids": [str(seat.id)]}, format="json"
+    ).status_code == 201
+    response = api_client.post(
+        holds_url, {"seat_ids": [str(other_seat.id)]}, format="json"
+    )
+    assert response.status_code == 400
+
+    # Re-holding extends the hold, but never past its maximum age.
+    created_at = timezone.now() - timedelta(seconds=settings.SEAT_HOLD_MAX_AGE - 60)
+    SeatHold.objects.update(created_at=created_at)
+    response = api_client.post(holds_url, {"seat_ids": [str(seat.id)]}, format="json")
+    assert response.status_code == 201
+    hold = SeatHold.objects.get()
+    assert hold.expires_at == created_at + timedelta(
+        seconds=settings.SEAT_HOLD_MAX_AGE
+    )
+
+
+@pytest.mark.django_db
+def test_order_from_seat_holds(api_client, user, flight, seat):
+    api_client.force_authenticate(user=user)
+    holds_url = reverse("v1:airport:flight-holds", kwargs={"pk": str(flight.id)})
+    api_client.post(holds_url, {"seat_ids": [str(seat.id)]}, format="json")
+    url = reverse("v1:airport:flight-order-holds", kwargs={"pk": str(flight.id)})
+    response = api_client.post(url)
+    assert response.status_code == 201
+    assert Ticket.objects.filter(flight=flight, seat=seat).exists()
+    assert not SeatHold.objects.exists()
+    # Nothing left to order.
+    assert api_client.post(url).status_code == 400
+
+
+@pytest.mark.django_db
+def test_expired_holds_swept_in_one_statement(
+    api_client, user, other_user, flight, seat, seat_class
+):
+    other_seat = Seat.objects.create(
+        airplane_type=seat.airplane_type, row=2, seat="A", seat_class=seat_class
+    )
+    expired = timezone.now() - timedelta(minutes=1)
+    SeatHold.objects.bulk_create(
+        [
+            SeatHold(flight=flight, seat=seat, user=user, expires_at=expired),
+            SeatHold(flight=flight, seat=other_seat, user=user, expires_at=expired),
+        ]
+    )
+    # Expired holds no longer block anyone.
+    api_client.force_authenticate(user=other_user)
+    order_url = reverse("v1:airport:order-list")
+    payload = {"flight_id": str(flight.id), "seat_ids": [str(seat.id)]}
+    assert api_client.post(order_url, payload, format="json").status_code == 201
+
+    with CaptureQueriesContext(connection) as queries:
+        assert sweep_expired_holds() == 2
+    assert len(queries) == 1
+
+
+@pytest.mark.django_db
+def test_flight_list_capacity_and_seats_left(api_client, user, flight, ticket, seat):
+    other_seat = Seat.objects.create(
+        airplane_type=seat.airplane_type, row=2, seat="A", seat_class=seat.seat_class
+    )
+    Seat.objects.create(
+        airplane_type=seat.airplane_type, row=3, seat="A", seat_class=seat.seat_class
+    )
+    SeatHold.objects.create(
+        flight=flight,
+        seat=other_seat,
+        user=user,
+        expires_at=timezone.now() + timedelta(minutes=5),
+    )
+    response = api_client.get(reverse("v1:airport:flight-list"))
+    assert response.status_code == 200
+    result = response.data["results"][0]
+    assert result["capacity"] == 3
+    assert result["seats_left"] == 1
+
+    # Without the annotation the fields fail rather than vanish.
+    with pytest.raises(ImproperlyConfigured):
+        FlightListSerializer(Flight.objects.get(pk=flight.pk)).data
+    annotated = Flight.objects.with_availability().get(pk=flight.pk)
+    assert FlightListSerializer(annotated).data["seats_left"] == 1
+
+
+@pytest.mark.django_db
+def test_seat_map(
+    api_client, order, flight, seat, django_capture_on_commit_callbacks
+):
+    Seat.objects.create(
+        airplane_type=seat.airplane_type, row=1, seat="C", seat_class=seat.seat_class
+    )
+    url = reverse("v1:airport:flight-seat-map", kwargs={"pk": str(flight.id)})
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url)
+    assert response.status_code == 200
+    assert len(queries) <= 2
+    assert response.data["columns"] == "ABCD"
+    assert response.data["classes"] == [
+        ["Economy", 1],
+        [None, 1],
+        ["Economy", 1],
+        [None, 17],
+    ]
+    assert response.data["occupancy"] == ".-.-" + "-" * 16
+
+    # Served from the cache while the flight does not change.
+    with CaptureQueriesContext(connection) as queries:
+        assert api_client.get(url).data == response.data
+    assert len(queries) == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Ticket.objects.create(flight=flight, seat=seat, order=order)
+    updated = api_client.get(url).data
+    assert updated["occupancy"].startswith("x-.-")
+    assert updated["version"] != response.data["version"]
+
+
+def test_flight_graph_search_connections():
+    kbp, waw, lhr, jfk = (uuid.uuid4() for _ in range(4))
+    start = timezone.now().replace(hour=6, minute=0) + timedelta(days=1)
+
+    def leg(source, destination, departure, hours):
+        departure_time = start + timedelta(hours=departure)
+        return Leg(
+            uuid.uuid4(),
+            source,
+            destination,
+            departure_time,
+            departure_time + timedelta(hours=hours),
+        )
+
+    direct = leg(kbp, lhr, 10, 3)
+    first = leg(kbp, waw, 0, 1)
+    tight = leg(waw, lhr, 1.5, 2)
+    second = leg(waw, lhr, 2, 2)
+    onward = leg(lhr, jfk, 6, 8)
+    graph = FlightGraph([direct, first, tight, second, onward])
+
+    itineraries = graph.search(
+        kbp, lhr, start, start + timedelta(days=1), min_connection=timedelta(hours=1)
+    )
+    assert itineraries == [[first, second], [direct]]
+    assert graph.search(kbp, lhr, start, start + timedelta(days=1), max_stops=0) == [
+        [direct]
+    ]
+    # The default 45-minute connection rules out the tight WAW transfer.
+    assert graph.search(kbp, jfk, start, start + timedelta(days=1), max_stops=2) == [
+        [first, second, onward],
+    ]
+
+    graph.remove(second.flight_id)
+    assert graph.search(
+        kbp, lhr, start, start + timedelta(days=1), min_connection=timedelta(hours=1)
+    ) == [[direct]]
+
+    # A copy changes only its own lists; the original still finds the leg.
+    copy = graph.copy()
+    copy.remove(direct.flight_id)
+    copy.add(second)
+    assert copy.search(kbp, lhr, start, start + timedelta(days=1), max_stops=0) == []
+    assert graph.search(kbp, lhr, start, start + timedelta(days=1), max_stops=0) == [
+        [direct]
+    ]
+    assert copy.departures[lhr] is graph.departures[lhr]
+
+
+@pytest.mark.django_db
+def test_itinerary_search(
+    api_client, flight, airport_a, airport_b, django_capture_on_commit_callbacks
+):
+    airport_c = Airport.objects.create(name="Warsaw Chopin", closest_big_city="Warsaw")
+    graph = get_flight_graph()
+    with django_capture_on_commit_callbacks(execute=True):
+        connection_flight = Flight.objects.create(
+            route=Route.objects.create(
+                source=airport_b, destination=airport_c, distance=400
+            ),
+            airplane=flight.airplane,
+            departure_time=flight.arrival_time + timedelta(hours=1),
+            arrival_time=flight.arrival_time + timedelta(hours=2),
+        )
+    # Applied incrementally to a copy of the graph built before the change,
+    # leaving the one a concurrent search may be walking untouched. The copy
+    # shares every departure list the change did not touch.
+    updated = get_flight_graph()
+    assert updated is not graph
+    assert updated.generation == graph.generation + 1
+    assert connection_flight.id in updated.legs
+    assert airport_b.id not in graph.departures
+    assert [leg.flight_id for leg in updated.departures[airport_b.id]] == [
+        connection_flight.id
+    ]
+    assert updated.departures[airport_a.id] is graph.departures[airport_a.id]
+
+    # Like a full build, incremental updates leave out departed flights.
+    with django_capture_on_commit_callbacks(execute=True):
+        departed = Flight.objects.create(
+            route=connection_flight.route,
+            airplane=flight.airplane,
+            departure_time=timezone.now() - timedelta(hours=1),
+            arrival_time=timezone.now(),
+        )
+    assert departed.id not in get_flight_graph().legs
+    assert len(get_flight_graph()) == len(updated)
+
+    url = reverse("v1:airport:flight-itineraries")
+    response = api_client.get(
+        url,
+        {
+            "origin": str(airport_a.id),
+            "destination": str(airport_c.id),
+            "date_from": timezone.localdate(flight.departure_time).isoformat(),
+        },
+    )
+    assert response.status_code == 200
+    assert len(response.data) == 1
+    itinerary = response.data[0]
+    assert itinerary["stops"] == 1
+    assert [leg["flight"] for leg in itinerary["legs"]] == [
+        str(flight.id),
+        str(connection_flight.id),
+    ]
+    assert itinerary["legs"][1]["destination"] == "Warsaw Chopin (Warsaw)"
+
+
+def test_route_graph_shortest_path_and_reachability():
+    kbp, waw, lhr, jfk, cdg = (uuid.uuid4() for _ in range(5))
+    graph = RouteGraph(
+        [
+            (kbp, lhr, 2100),
+            (kbp, waw, 700),
+            (waw, lhr, 1200),
+            (lhr, jfk, 5500),
+            (jfk, kbp, 7500),
+        ]
+    )
+
+    assert graph.shortest_path(kbp, lhr) == (1900, [kbp, waw, lhr])
+    assert graph.shortest_path(kbp, jfk) == (7400, [kbp, waw, lhr, jfk])
+    assert graph.shortest_path(kbp, kbp) == (0, [kbp])
+    assert graph.shortest_path(lhr, cdg) is None
+    assert graph.reachable(kbp, 1) == {waw: 1, lhr: 1}
+    assert graph.reachable(kbp, 2) == {waw: 1, lhr: 1, jfk: 2}
+
+
+@pytest.mark.django_db
+def test_route_graph_endpoints(
+    api_client, route, airport_a, airport_b, django_capture_on_commit_callbacks
+):
+    airport_c = Airport.objects.create(name="Warsaw Chopin", closest_big_city="Warsaw")
+    graph = get_route_graph()
+    url = reverse("v1:airport:route-shortest")
+    params = {"source": str(airport_a.id), "destination": str(airport_c.id)}
+    assert api_client.get(url, params).status_code == 404
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Route.objects.create(source=airport_b, destination=airport_c, distance=400)
+    assert get_route_graph() is not graph
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url, params)
+    assert response.status_code == 200
+    assert len(queries) == 0
+    assert response.data["distance"] == 900
+    assert [airport["id"] for airport in response.data["airports"]] == [
+        airport_a.id,
+        airport_b.id,
+        airport_c.id,
+    ]
+
+    response = api_client.get(
+        reverse("v1:airport:route-reachable"), {"source": str(airport_a.id), "hops": 2}
+    )
+    assert response.status_code == 200
+    assert [(airport["name"], airport["hops"]) for airport in response.data] == [
+        ("Lviv Danylo Halytskyi", 1),
+        ("Warsaw Chopin", 2),
+    ]
+
+
+@pytest.mark.django_db
+def test_flight_search_by_city_and_date(api_client, flight, airport_a, airport_b):
+    Flight.objects.create(
+        route=flight.route,
+        airplane=flight.airplane,
+        departure_time=flight.departure_time + timedelta(days=1),
+        arrival_time=flight.arrival_time + timedelta(days=1),
+    )
+    url = reverse("v1:airport:flight-search")
+    date = timezone.localdate(flight.departure_time).isoformat()
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(
+            url, {"origin": "Kyiv", "destination": "Lviv", "date": date}
+        )
+    assert response.status_code == 200
+    # COUNT for the page plus one SELECT resolving cities and flights.
+    assert len(queries) == 2
+    assert [result["id"] for result in response.data["results"]] == [str(flight.id)]
+    assert response.data["results"][0]["seats_left"] == 0
+
+    response = api_client.get(
+        url, {"origin": str(airport_a.id), "destination": "Lviv", "date": date}
+    )
+    assert response.data["count"] == 1
+    response = api_client.get(
+        url, {"origin": "Lviv", "destination": "Kyiv", "date": date}
+    )
+    assert response.data["count"] == 0
+
+
+@requires_postgres
+@pytest.mark.django_db
+def test_flight_search_uses_indexes(flight):
+    plan = explain(
+        Flight.objects.between("Kyiv", "Lviv").departing_on(
+            timezone.localdate(flight.departure_time)
+        )
+    )
+    assert "airport_city_idx" in plan
+    assert "flight_route_departure_idx" in plan
+
+
+@requires_postgres
+@pytest.mark.django_db
+def test_airport_city_lookup_uses_index(airport_a):
+    plan = explain(Airport.objects.filter(closest_big_city="Kyiv"))
+    assert "airport_city_idx" in plan
+
+
+@pytest.mark.django_db
+def test_flight_date_filter_uses_local_day(api_client, route, airplane):
+    local_midnight = timezone.make_aware(
+        datetime.combine(timezone.localdate() + timedelta(days=2), time.min)
+    )
+    early = Flight.objects.create(
+        route=route,
+        airplane=airplane,
+        departure_time=local_midnight + timedelta(minutes=30),
+        arrival_time=local_midnight + timedelta(hours=2),
+    )
+    Flight.objects.create(
+        route=route,
+        airplane=airplane,
+        departure_time=local_midnight - timedelta(minutes=30),
+        arrival_time=local_midnight + timedelta(hours=1),
+    )
+    response = api_client.get(
+        reverse("v1:airport:flight-list"),
+        {"departure_time__date": local_midnight.date().isoformat()},
+    )
+    assert [result["id"] for result in response.data["results"]] == [str(early.id)]
+
+
+@pytest.fixture
+def query_plan_data(settings, user, route, airplane, airplane_type, seat_class):
+    """Hot tables filled just above the sequential-scan size limit."""
+    rows = settings.QUERY_PLAN_SEQ_SCAN_MAX_ROWS + 1
+    airplane_type.rows = rows
+    airplane_type.save()
+    start = timezone.now() + timedelta(days=1)
+    flights = Flight.objects.bulk_create(
+        Flight(
+            route=route,
+            airplane=airplane,
+            departure_time=start + timedelta(hours=i),
+            arrival_time=start + timedelta(hours=i + 2),
+        )
+        for i in range(rows)
+    )
+    seats = Seat.objects.bulk_create(
+        Seat(airplane_type=airplane_type, row=i + 1, seat="A", seat_class=seat_class)
+        for i in range(rows)
+    )
+    orders = Order.objects.bulk_create(Order(user=user) for _ in range(rows))
+    Ticket.objects.bulk_create(
+        Ticket(flight=flights[0], seat=seat, order=order)
+        for seat, order in zip(seats, orders)
+    )
+    return SimpleNamespace(flight=flights[0], order=orders[0], start=start)
+
+
+HOT_ENDPOINTS = [
+    (
+        "flight-list",
+        lambda data: {
+            "departure_time__gte": data.start.isoformat(),
+            "ordering": "departure_time",
+        },
+    ),
+    (
+        "flight-list",
+        lambda data: {
+            "arrival_time__lte": data.start.isoformat(),
+            "ordering": "arrival_time",
+        },
+    ),
+    (
+        "flight-list",
+        lambda data: {"departure_time__date": timezone.localdate(data.start)},
+    ),
+    ("order-list", lambda data: {"ordering": "-created_at"}),
+    (
+        "ticket-list",
+        lambda data: {"order": data.order.id, "ordering": "flight__departure_time"},
+    ),
+    ("ticket-list", lambda data: {"flight": data.flight.id, "ordering": "seat__row"}),
+    ("seat-list", lambda data: {"row__gte": 10, "ordering": "row"}),
+]
+
+
+@requires_postgres
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name, params", HOT_ENDPOINTS)
+def test_hot_endpoints_avoid_seq_scans(
+    api_client, user, query_plan_data, url_name, params
+):
+    api_client.force_authenticate(user)
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(
+            reverse(f"v1:airport:{url_name}"), params(query_plan_data)
+        )
+    assert response.status_code == 200
+    assert_no_seq_scans(queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_flight_keyset_pagination(api_client, route, airplane):
+    departure = timezone.now() + timedelta(days=1)
+    flights = Flight.objects.bulk_create(
+        Flight(
+            route=route,
+            airplane=airplane,
+            # Pairs of flights share a departure time: the id breaks ties.
+            departure_time=departure + timedelta(hours=i // 2),
+            arrival_time=departure + timedelta(hours=i // 2 + 2),
+        )
+        for i in range(7)
+    )
+    expected = [
+        str(flight.id)
+        for flight in sorted(flights, key=lambda f: (f.departure_time, f.id))
+    ]
+    url = reverse("v1:airport:flight-list")
+
+    seen, pages = [], []
+    next_url = f"{url}?pagination=keyset&limit=3"
+    while next_url:
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(next_url)
+        assert response.status_code == 200
+        assert not any(
+            query["sql"].startswith("SELECT COUNT(*)") for query in queries
+        )
+        assert "OFFSET" not in queries[0]["sql"]
+        pages.append(response.data)
+        seen += [result["id"] for result in response.data["results"]]
+        next_url = response.data["next"]
+    assert seen == expected
+    assert [len(page["results"]) for page in pages] == [3, 3, 1]
+
+    previous = api_client.get(pages[-1]["previous"]).data
+    assert previous["results"] == pages[1]["results"]
+    assert previous["next"] and previous["previous"]
+
+    response = api_client.get(
+        url, {"pagination": "keyset", "ordering": "-departure_time", "limit": 4}
+    )
+    # Descending departure time, ties still broken by ascending id.
+    by_departure = sorted(flights, key=lambda f: f.id)
+    by_departure.sort(key=lambda f: f.departure_time, reverse=True)
+    assert [result["id"] for result in response.data["results"]] == [
+        str(flight.id) for flight in by_departure[:4]
+    ]
+
+
+@pytest.mark.django_db
+def test_keyset_pagination_rejects_foreign_cursor(api_client, user, order):
+    Order.objects.create(user=user)
+    api_client.force_authenticate(user)
+    url = reverse("v1:airport:order-list")
+    page = api_client.get(url, {"pagination": "keyset", "limit": 1}).data
+    assert len(page["results"]) == 1
+    # A cursor is only valid for the ordering it was issued with.
+    response = api_client.get(f"{page['next']}&ordering=created_at")
+    assert response.status_code == 404
+    response = api_client.get(url, {"pagination": "keyset", "cursor": "garbage"})
+    assert response.status_code == 404
+
+    # Well-formed, but with values that are not a datetime and a UUID.
+    cursor = parse_qs(urlparse(page["next"]).query)["cursor"][0]
+    payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    for values in (["yesterday", "not-a-uuid"], [None, None], [[1], {"a": 1}]):
+        payload["k"] = values
+        tampered = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        response = api_client.get(url, {"pagination": "keyset", "cursor": tampered})
+        assert response.status_code == 404
+        assert response.data["detail"] == "Invalid cursor."
+    response = api_client.get(reverse("v1:airport:order-list"), {"pagination": "x"})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_nocount_and_estimate_pagination(api_client, admin_user, route, airplane):
+    start = timezone.now() + timedelta(days=1)
+    Flight.objects.bulk_create(
+        Flight(
+            route=route,
+            airplane=airplane,
+            departure_time=start + timedelta(hours=i),
+            arrival_time=start + timedelta(hours=i + 1),
+        )
+        for i in range(3)
+    )
+    url = reverse("v1:airport:flight-list")
+
+    with CaptureQueriesContext(connection) as queries:
+        page = api_client.get(url, {"pagination": "nocount", "limit": 2}).data
+    assert not any(query["sql"].startswith("SELECT COUNT(*)") for query in queries)
+    assert page["has_next"] is True
+    assert "count" not in page
+    assert len(page["results"]) == 2
+    last_page = api_client.get(page["next"]).data
+    assert last_page["has_next"] is False
+    assert last_page["next"] is None
+    assert len(last_page["results"]) == 1
+
+    # Without PostgreSQL statistics the estimate falls back to an exact count.
+    page = api_client.get(url, {"pagination": "estimate", "limit": 2}).data
+    assert page["count"] == 3
+    assert page["count_is_estimate"] is False
+    assert page["next"]
+
+
+def test_selectable_pagination_schema_follows_view_modes():
+    results = {"type": "array", "items": {}}
+    paginator = SelectablePagination()
+    paginator.view = SimpleNamespace(
+        pagination_modes={"keyset": KeysetPagination, "nocount": NoCountPagination}
+    )
+    schema = paginator.get_paginated_response_schema(results)
+    assert list(schema["properties"]) == ["next", "previous", "results", "has_next"]
+    assert schema["required"] == ["results"]
+
+    paginator.view = SimpleNamespace(pagination_modes=FlightViewSet.pagination_modes)
+    schema = paginator.get_paginated_response_schema(results)
+    assert {"count", "has_next", "count_is_estimate"} <= set(schema["properties"])
+    assert schema["required"] == ["results"]
+
+
+@requires_postgres
+@pytest.mark.django_db
+def test_estimate_pagination_reads_planner_statistics(api_client, flight):
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {Flight._meta.db_table}")
+    page = api_client.get(
+        reverse("v1:airport:flight-list"), {"pagination": "estimate"}
+    ).data
+    assert page["count_is_estimate"] is True
+    assert page["count"] == 1
+
+
+def _method_fields_without_sources(serializer):
+    meta = getattr(serializer, "Meta", None)
+    method_sources = getattr(meta, "method_sources", {})
+    for name, field in serializer.fields.items():
+        if isinstance(field, SerializerMethodField):
+            if name not in method_sources:
+                yield f"{type(serializer).__name__}.{name}"
+            continue
+        field = getattr(field, "child", field)
+        if isinstance(field, ModelSerializer):
+            yield from _method_fields_without_sources(field)
+
+
+def test_planned_serializers_declare_method_sources():
+    missing = [
+        name
+        for _, viewset, _ in airport_router.registry
+        for serializer_class in getattr(viewset, "action_serializers", {}).values()
+        if issubclass(serializer_class, ModelSerializer)
+        for name in _method_fields_without_sources(serializer_class())
+    ]
+    assert missing == []
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url_name, detail",
+    [
+        ("flight-list", False),
+        ("flight-detail", True),
+        ("ticket-list", False),
+        ("order-list", False),
+        ("order-detail", True),
+    ],
+)
+def test_planned_queries_do_not_grow_with_rows(
+    api_client, admin_user, flight, seat, order, crew, url_name, detail
+):
+    api_client.force_authenticate(admin_user)
+    airplane_type = flight.airplane.airplane_type
+    seats = [seat] + Seat.objects.bulk_create(
+        Seat(
+            airplane_type=airplane_type,
+            row=2,
+            seat=letter,
+            seat_class=seat.seat_class,
+        )
+        for letter in "ABC"
+    )
+
+    def query_count():
+        args = [order.id if url_name.startswith("order") else flight.id]
+        url = reverse(f"v1:airport:{url_name}", args=args if detail else None)
+        with CaptureQueriesContext(connection) as queries:
+            assert api_client.get(url).status_code == 200
+        return len(queries)
+
+    Ticket.objects.create(flight=flight, seat=seats[0], order=order)
+    baseline = query_count()
+    for index, seat in enumerate(seats[1:]):
+        other_flight = Flight.objects.create(
+            route=Route.objects.create(
+                source=Airport.objects.create(name=f"A{index}", closest_big_city="A"),
+                destination=flight.route.destination,
+                distance=100,
+            ),
+            airplane=flight.airplane,
+            departure_time=flight.departure_time,
+            arrival_time=flight.arrival_time,
+        )
+        other_flight.crew.add(crew)
+        flight.crew.add(Crew.objects.create(first_name="Jane", last_name=str(index)))
+        Ticket.objects.create(flight=other_flight, seat=seat, order=order)
+    assert query_count() == baseline
+
+
+@pytest.fixture
+def budget_data(db, admin_user):
+    """
+    ``grow(n)`` adds rows to every airport table until each has at least
+    ``n``. The first order holds every ticket and the first flight has every
+    crew member, so detail pages grow too.
+    """
+    hub = Airport.objects.create(name="Hub", closest_big_city="Hub")
+    airplane_type = AirplaneType.objects.create(name="Wide", rows=100, seats_in_row=4)
+    airplane = Airplane.objects.create(name="Plane", airplane_type=airplane_type)
+    seat_class = SeatClass.objects.create(name="Economy")
+    start = timezone.now() + timedelta(days=1)
+    first = {model: None for model in (Flight, Order)}
+    grown = []
+
+    def grow(n):
+        indexes = range(len(grown), n)
+        grown.extend(indexes)
+        AirplaneType.objects.bulk_create(
+            AirplaneType(name=f"Type {i}", rows=1, seats_in_row=1) for i in indexes
+        )
+        Airplane.objects.bulk_create(
+            Airplane(name=f"Plane {i}", airplane_type=airplane_type) for i in indexes
+        )
+        SeatClass.objects.bulk_create(SeatClass(name=f"Class {i}") for i in indexes)
+        airports = Airport.objects.bulk_create(
+            Airport(name=f"Airport {i}", closest_big_city=f"City {i}")
+            for i in indexes
+        )
+        routes = Route.objects.bulk_create(
+            Route(source=airport, destination=hub, distance=100 + i)
+            for i, airport in zip(indexes, airports)
+        )
+        flights = Flight.objects.bulk_create(
+            Flight(
+                route=route,
+                airplane=airplane,
+                departure_time=start + timedelta(hours=i),
+                arrival_time=start + timedelta(hours=i + 2),
+            )
+            for i, route in zip(indexes, routes)
+        )
+        seats = Seat.objects.bulk_create(
+            Seat(
+                airplane_type=airplane_type, row=i + 1, seat="A", seat_class=seat_class
+            )
+            for i in indexes
+        )
+        orders = Order.objects.bulk_create(Order(user=admin_user) for _ in indexes)
+        first[Flight] = first[Flight] or flights[0]
+        first[Order] = first[Order] or orders[0]
+        first[Flight].crew.add(
+            *Crew.objects.bulk_create(
+                Crew(first_name="Crew", last_name=str(i)) for i in indexes
+            )
+        )
+        Ticket.objects.bulk_create(
+            Ticket(flight=flight, seat=seat, order=first[Order])
+            for flight, seat in zip(flights, seats)
+        )
+
+    def detail_object(model):
+        return first.get(model) or model.objects.order_by("created_at").first()
+
+    return SimpleNamespace(grow=grow, detail_object=detail_object)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "basename, viewset",
+    [(basename, viewset) for _, viewset, basename in airport_router.registry],
+)
+def test_endpoint_query_budgets(
+    api_client, admin_user, budget_data, basename, viewset
+):
+    api_client.force_authenticate(admin_user)
+    counts = {"list": {}, "retrieve": {}}
+    for size in QUERY_BUDGET_PAGE_SIZES:
+        budget_data.grow(size)
+        counts["list"][size] = count_queries(
+            api_client, reverse(f"v1:airport:{basename}-list"), {"limit": size}
+        )
+        detail = budget_data.detail_object(viewset.queryset.model)
+        counts["retrieve"][size] = count_queries(
+            api_client, reverse(f"v1:airport:{basename}-detail", args=[detail.pk])
+        )
+    for action, action_counts in counts.items():
+        assert_query_budget(viewset, action, action_counts)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "basename, viewset",
+    [
+        ("airport", AirportViewSet),
+        ("route", RouteViewSet),
+        ("seat", SeatViewSet),
+        ("flight", FlightViewSet),
+    ],
+)
+def test_values_list_matches_serializer_output(
+    api_client, budget_data, monkeypatch, basename, viewset
+):
+    budget_data.grow(10)
+    url = reverse(f"v1:airport:{basename}-list")
+    list_serializer = viewset.action_serializers["list"]()
+    queryset = viewset.queryset
+    if viewset is FlightViewSet:
+        queryset = queryset.with_availability()
+    assert values_serializer(list_serializer, queryset) is not None
+
+    for mode in viewset.pagination_modes:
+        params = {"pagination": mode, "limit": 5 if mode == "keyset" else 100}
+        fast = api_client.get(url, params)
+        monkeypatch.setattr(viewset, "use_values_list", False)
+        slow = api_client.get(url, params)
+        monkeypatch.undo()
+        assert fast.status_code == slow.status_code == 200
+        assert fast.content == slow.content
+
+
+@pytest.mark.django_db
+def test_fast_json_renderer_and_parser(api_client, budget_data):
+    budget_data.grow(10)
+    response = api_client.get(reverse("v1:airport:flight-list"))
+    assert isinstance(response.accepted_renderer, FastJSONRenderer)
+    assert response.content == JSONRenderer().render(response.data)
+
+    flight_id = uuid.uuid4()
+    departure = datetime(2025, 1, 2, 3, 4, 5, tzinfo=UTC)
+    rendered = FastJSONRenderer().render(
+        {"id": flight_id, "at": departure, "price": Decimal("9.5"), 1: "\u2028"}
+    )
+    assert json.loads(rendered) == {
+        "id": str(flight_id),
+        "at": "2025-01-02T03:04:05Z",
+        "price": 9.5,
+        "1": "\u2028",
+    }
+    assert b"\\u2028" in rendered
+
+    parsed = FastJSONParser().parse(io.BytesIO(rendered))
+    assert parsed == JSONParser().parse(io.BytesIO(rendered))
+    with pytest.raises(ParseError):
+        FastJSONParser().parse(io.BytesIO(b"{not json"))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "basename, model, serializer_class",
+    [
+        ("flight", Flight, FlightListSerializer),
+        ("order", Order, OrderDetailSerializer),
+        ("ticket", Ticket, TicketDetailSerializer),
+    ],
+)
+def test_streaming_exports(
+    api_client, admin_user, budget_data, monkeypatch, basename, model, serializer_class
+):
+    budget_data.grow(12)
+    url = reverse(f"v1:airport:{basename}-export")
+    monkeypatch.setattr(ExportMixin, "export_chunk_size", 5)
+    api_client.force_authenticate(admin_user)
+
+    response = api_client.get(url, HTTP_ACCEPT="text/csv")
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Type"] == "application/x-ndjson"
+    lines = b"".join(response.streaming_content).splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert sorted(row["id"] for row in rows) == sorted(
+        str(pk) for pk in model.objects.values_list("pk", flat=True)
+    )
+    fields = list(serializer_class().fields)
+    assert all(list(row) == fields for row in rows)
+
+    response = api_client.get(url, {"output": "csv"})
+    assert response["Content-Type"] == "text/csv"
+    assert 'filename="' + basename + '.csv"' in response["Content-Disposition"]
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert lines[0] == ",".join(fields)
+    assert len(lines) == model.objects.count() + 1
+
+    assert api_client.get(url, {"output": "xml"}).status_code == 400
+    api_client.force_authenticate(User.objects.create_user("u@example.com", "pass"))
+    assert api_client.get(url).status_code == 403
+
+
+@pytest.mark.django_db
+def test_export_applies_list_filters(api_client, admin_user, budget_data):
+    budget_data.grow(3)
+    flight = Flight.objects.order_by("departure_time").first()
+    api_client.force_authenticate(admin_user)
+    response = api_client.get(
+        reverse("v1:airport:ticket-export"), {"flight": str(flight.pk)}
+    )
+    rows = b"".join(response.streaming_content).splitlines()
+    assert [json.loads(row)["id"] for row in rows] == [
+        str(flight.tickets.get().pk)
+    ]
+
+
+@pytest.mark.django_db
+def test_sparse_fieldsets_prune_payload_and_select(
+    api_client, budget_data, monkeypatch
+):
+    budget_data.grow(3)
+    url = reverse("v1:airport:flight-list")
+    params = {"fields": "id,departure_time,route"}
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url, params)
+    assert response.status_code == 200
+    assert all(
+        list(row) == ["id", "route", "departure_time"]
+        for row in response.data["results"]
+    )
+    select = queries.captured_queries[-1]["sql"]
+    assert "arrival_time" not in select
+    assert "created_at" not in select
+    assert '"airport_airplane"' not in select
+
+    monkeypatch.setattr(FlightViewSet, "use_values_list", False)
+    assert api_client.get(url, params).content == response.content
+    monkeypatch.undo()
+
+    response = api_client.get(url, {"omit": "capacity,seats_left"})
+    assert "capacity" not in response.data["results"][0]
+    assert "route" in response.data["results"][0]
+
+    flight = budget_data.detail_object(Flight)
+    response = api_client.get(
+        reverse("v1:airport:flight-detail", args=[flight.pk]), {"fields": "id,crew"}
+    )
+    assert list(response.data) == ["id", "crew"]
+
+    response = api_client.get(url, {"fields": "id,nope"})
+    assert response.status_code == 400
+    assert "nope" in response.data["fields"][0]
+
+
+@pytest.mark.django_db
+def test_conditional_get_on_lists_and_details(
+    api_client, flight, crew, django_capture_on_commit_callbacks
+):
+    list_url = reverse("v1:airport:flight-list")
+    detail_url = reverse("v1:airport:flight-detail", args=[flight.pk])
+    for url in (list_url, detail_url):
+        response = api_client.get(url)
+        etag = response["ETag"]
+        assert response.status_code == 200 and response["Last-Modified"]
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+        # Nothing was paginated or serialized: at most the object lookup.
+        assert len(queries) <= 2
+        assert not any("COUNT" in q["sql"] for q in queries.captured_queries)
+        response = api_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        assert response.status_code == 304
+        assert api_client.get(url, {"fields": "id"})["ETag"] != etag
+
+    list_etag = api_client.get(list_url)["ETag"]
+    detail_etag = api_client.get(detail_url)["ETag"]
+    with django_capture_on_commit_callbacks(execute=True):
+        crew.first_name = "Jane"
+        crew.save()
+    # The list does not show crew; the detail does.
+    assert api_client.get(list_url, HTTP_IF_NONE_MATCH=list_etag).status_code == 304
+    response = api_client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+    assert response.status_code == 200
+    assert response.data["crew"][0]["full_name"] == "Jane Doe"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Route.objects.get(pk=flight.route_id).save()
+    assert api_client.get(list_url, HTTP_IF_NONE_MATCH=list_etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_conditional_get_follows_seat_holds(
+    api_client, user, flight, seat, django_capture_on_commit_callbacks
+):
+    list_url = reverse("v1:airport:flight-list")
+    map_url = reverse("v1:airport:flight-seat-map", args=[flight.pk])
+    list_etag = api_client.get(list_url)["ETag"]
+    map_etag = api_client.get(map_url)["ETag"]
+    assert api_client.get(map_url, HTTP_IF_NONE_MATCH=map_etag).status_code == 304
+
+    api_client.force_authenticate(user)
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(
+            reverse("v1:airport:flight-holds", args=[flight.pk]),
+            {"seat_ids": [str(seat.pk)]},
+            format="json",
+        )
+    assert response.status_code == 201
+    api_client.force_authenticate(None)
+    response = api_client.get(list_url, HTTP_IF_NONE_MATCH=list_etag)
+    assert response.status_code == 200
+    list_etag = response["ETag"]
+    response = api_client.get(map_url, HTTP_IF_NONE_MATCH=map_etag)
+    assert response.status_code == 200
+    assert "h" in response.data["occupancy"]
+
+    # A lapsing hold frees its seat without any write.
+    SeatHold.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+    response = api_client.get(list_url, HTTP_IF_NONE_MATCH=list_etag)
+    assert response.status_code == 200
+    assert response.data["results"][0]["seats_left"] == 1
+
+
+@pytest.mark.django_db
+def test_response_cache_hits_until_a_read_table_changes(
+    api_client, route, monkeypatch, django_capture_on_commit_callbacks
+):
+    monkeypatch.setattr(CachedResponseMixin, "response_cache_timeout", 60)
+    list_url = reverse("v1:airport:route-list")
+    detail_url = reverse("v1:airport:route-detail", args=[route.pk])
+    for url in (list_url, detail_url):
+        first = api_client.get(url)
+        assert first["X-Cache"] == "MISS"
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url)
+        assert response["X-Cache"] == "HIT"
+        assert len(queries) == 0
+        assert response.content == first.content
+        assert response["ETag"] == first["ETag"]
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        assert response.status_code == 304 and response["X-Cache"] == "HIT"
+        # Parameter order does not matter; their values do.
+        assert api_client.get(url, {"a": 1, "b": 2})["X-Cache"] == "MISS"
+        assert api_client.get(url, {"b": 2, "a": 1})["X-Cache"] == "HIT"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        route.source.name = "Renamed"
+        route.source.save()
+    response = api_client.get(detail_url)
+    assert response["X-Cache"] == "MISS"
+    assert response.data["source"]["name"] == "Renamed"
+    assert api_client.get(list_url)["X-Cache"] == "MISS"
+
+    call_command("response_cache_stats", stdout=(out := io.StringIO()))
+    assert re.search(r"^route\s+6 hits\s+6 misses\s+50.0%", out.getvalue(), re.M)
+
+
+@pytest.mark.django_db
+def test_order_and_ticket_reads_authenticate_from_token_claims(
+    api_client, user, admin_user, ticket
+):
+    def bearer(email, password):
+        response = APIClient().post(
+            reverse("v1:accounts:token_obtain_pair"),
+            {"email": email, "password": password},
+        )
+        return {"HTTP_AUTHORIZATION": f"Bearer {response.data['access']}"}
+
+    other_order = Order.objects.create(user=admin_user)
+    headers = bearer(user.email, "userpass")
+    urls = (
+        reverse("v1:airport:order-list"),
+        reverse("v1:airport:order-detail", args=[ticket.order_id]),
+        reverse("v1:airport:ticket-list"),
+        reverse("v1:airport:ticket-detail", args=[ticket.pk]),
+    )
+    for url in urls:
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url, **headers)
+        assert response.status_code == 200
+        assert not any(
+            'FROM "accounts_user"' in query["sql"] for query in queries
+        )
+    response = api_client.get(reverse("v1:airport:order-list"), **headers)
+    assert [order["id"] for order in response.data["results"]] == [str(ticket.order_id)]
+    response = api_client.get(
+        reverse("v1:airport:order-detail", args=[other_order.pk]), **headers
+    )
+    assert response.status_code == 404
+
+    admin_headers = bearer(admin_user.email, "adminpass")
+    response = api_client.get(reverse("v1:airport:order-list"), **admin_headers)
+    assert len(response.data["results"]) == 2
+
+    # Staff rights are read from the database, not the token's claim.
+    User.objects.filter(pk=admin_user.pk).update(is_staff=False)
+    forget_user(admin_user.pk)
+    response = api_client.get(reverse("v1:airport:order-list"), **admin_headers)
+    assert [order["id"] for order in response.data["results"]] == [str(other_order.pk)]
+    response = api_client.get(reverse("v1:airport:order-export"), **admin_headers)
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_available_seats_reads_only_holds_live(
+    api_client, flight, seat, ticket, django_capture_on_commit_callbacks
+):
+    other_seat = Seat.objects.create(
+        airplane_type=seat.airplane_type, row=1, seat="B", seat_class=seat.seat_class
+    )
+    url = reverse("v1:airport:flight-available-seats", kwargs={"pk": str(flight.id)})
+    api_client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url)
+    assert response.data == [
+        {
+            "id": str(other_seat.id),
+            "airplane_type": seat.airplane_type.name,
+            "row": 1,
+            "seat": "B",
+            "seat_class": seat.seat_class.name,
+        }
+    ]
+    # The flight and its active holds; the seat layout comes from the cache.
+    tables = [re.search(r'FROM "(\w+)"', query["sql"])[1] for query in queries]
+    assert tables == ["airport_flight", "airport_seathold"]
+
+    # Seat class and seat changes drop the cached layout.
+    with django_capture_on_commit_callbacks(execute=True):
+        seat.seat_class.name = "Premium"
+        seat.seat_class.save()
+    assert api_client.get(url).data[0]["seat_class"] == "Premium"
+    with django_capture_on_commit_callbacks(execute=True):
+        Seat.objects.create(
+            airplane_type=seat.airplane_type, row=2, seat="A", seat_class=seat.seat_class
+        )
+    response = api_client.get(url)
+    assert [(s["row"], s["seat"], s["seat_class"]) for s in response.data] == [
+        (1, "B", "Premium"),
+        (2, "A", "Premium"),
+    ]
+
+
+@pytest.mark.django_db
+def test_order_cascade_delete_loads_no_seats(flight, seat, order, ticket):
+    other_seat = Seat.objects.create(
+        airplane_type=seat.airplane_type, row=1, seat="B", seat_class=seat.seat_class
+    )
+    Ticket.objects.create(flight=flight, seat=other_seat, order=order)
+    with CaptureQueriesContext(connection) as queries:
+        Order.objects.get(pk=order.pk).delete()
+    assert not any('FROM "airport_seat"' in query["sql"] for query in queries)
+
+
+@pytest.mark.django_db
+def test_sparse_fieldsets_ignored_by_custom_actions(api_client, flight, seat):
+    url = reverse("v1:airport:flight-available-seats", kwargs={"pk": str(flight.id)})
+    response = api_client.get(url, {"fields": "row"})
+    assert response.status_code == 200
+    assert set(response.data[0]) == {
+        "id", "airplane_type", "row", "seat", "seat_class"
+    }
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url, {"fields": "departure_time"})
+    assert response.status_code == 200
+    assert '"airport_flight"."route_id"' in queries.captured_queries[0]["sql"]
+
+
+@pytest.mark.django_db
+def test_detail_etag_follows_row_commits_older_than_table_writes(api_client, route):
+    url = reverse("v1:airport:route-detail", args=[route.pk])
+    etag = api_client.get(url)["ETag"]
+    # A row stamped before the last write to the tables the detail reads,
+    # but committed after it: no table stamp moves, only updated_at.
+    Route.objects.filter(pk=route.pk).update(
+        distance=route.distance + 1, updated_at=route.updated_at - timedelta(days=1)
+    )
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_conditional_get_off_without_a_shared_cache(api_client, route, monkeypatch):
+    monkeypatch.setattr(ConditionalGetMixin, "conditional_get", False)
+    response = api_client.get(reverse("v1:airport:route-detail", args=[route.pk]))
+    assert response.status_code == 200
+    assert "ETag" not in response
@@ -1,3 +1,6 @@
+from datetime import datetime, time, timedelta
+
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import (
     extend_schema,
     OpenApiResponse,
@@ -8,9 +11,12 @@ from rest_framework import viewsets, status
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.decorators import action
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
 
 from airport.models import (
     Airport,
@@ -22,6 +28,7 @@ from airport.models import (
     Order,
     SeatClass,
     Seat,
+    SeatHold,
     Ticket,
 )
 from airport.serializers import (
@@ -57,12 +64,63 @@ from airport.serializers import (
     TicketDetailSerializer,
     OrderDetailSerializer,
     AirplaneImageUploadSerializer,
+    SeatHoldSerializer,
+    SeatHoldCreateSerializer,
+    SeatHoldReleaseSerializer,
+    SeatMapSerializer,
+    FlightSearchSerializer,
+    ItinerarySearchSerializer,
+    ItinerarySerializer,
+    ShortestRouteSearchSerializer,
+    ShortestRouteSerializer,
+    ReachableAirportsSearchSerializer,
+    ReachableAirportSerializer,
+)
+from accounts.authentication import TokenUserAuthentication
+from airport.filters import FlightFilter, OrderFilter
+from airport.holds import held_seat_ids, hold_seats, release_seats
+from airport.itineraries import get_flight_graph
+from airport.route_graph import get_route_graph
+from airport.seat_index import get_seat_bitmap
+from airport.seat_map import get_seat_layout, get_seat_map
+from base.mixins import (
+    BaseViewSetMixin,
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    ExportMixin,
+    ValuesListMixin,
+)
+from base.pagination import (
+    EstimatedCountPagination,
+    KeysetPagination,
+    NoCountPagination,
 )
-from base.mixins import BaseViewSetMixin
 
 
 FILTER_BACKENDS = [DjangoFilterBackend, SearchFilter, OrderingFilter]
 
+PAGINATION_MODES = {
+    "offset": LimitOffsetPagination,
+    "nocount": NoCountPagination,
+    "estimate": EstimatedCountPagination,
+}
+
+KEYSET_PAGINATION_MODES = {**PAGINATION_MODES, "keyset": KeysetPagination}
+
+EXPORT_PARAMETERS = [
+    OpenApiParameter(
+        name="output",
+        type=str,
+        enum=list(ExportMixin.export_formats),
+        description="Export format, defaults to ndjson (one JSON object per line).",
+    ),
+]
+
+EXPORT_RESPONSES = {
+    (200, media_type): OpenApiTypes.STR
+    for media_type in ExportMixin.export_formats.values()
+}
+
 
 # AirportViewSet
 @extend_schema_view(
@@ -112,7 +170,9 @@ FILTER_BACKENDS = [DjangoFilterBackend, SearchFilter, OrderingFilter]
         responses={204: OpenApiResponse(description="No content, airport deleted")},
     ),
 )
-class AirportViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
+class AirportViewSet(
+    CachedResponseMixin, ValuesListMixin, BaseViewSetMixin, viewsets.ModelViewSet
+):
     queryset = Airport.objects.all()
     serializer_class = BaseAirportSerializer
     action_serializers = {
@@ -120,6 +180,8 @@ class AirportViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         "retrieve": AirportDetailSerializer,
     }
     filter_backends = FILTER_BACKENDS
+    pagination_modes = PAGINATION_MODES
+    query_budgets = {"list": 2, "retrieve": 1}
     filterset_fields = {
         "name": ["exact", "icontains"],
         "closest_big_city": ["exact", "icontains"],
@@ -172,7 +234,9 @@ class AirportViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         responses={204: OpenApiResponse(description="No content, route deleted")},
     ),
 )
-class RouteViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
+class RouteViewSet(
+    CachedResponseMixin, ValuesListMixin, BaseViewSetMixin, viewsets.ModelViewSet
+):
     queryset = Route.objects.select_related("source", "destination").all()
     serializer_class = BaseRouteSerializer
     action_serializers = {
@@ -180,6 +244,8 @@ class RouteViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         "retrieve": RouteDetailSerializer,
     }
     filter_backends = FILTER_BACKENDS
+    pagination_modes = PAGINATION_MODES
+    query_budgets = {"list": 2, "retrieve": 1}
     filterset_fields = {
         "source": ["exact"],
         "destination": ["exact"],
@@ -193,8 +259,66 @@ class RouteViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         "update": [IsAdminUser],
         "partial_update": [IsAdminUser],
         "destroy": [IsAdminUser],
+        "shortest": [AllowAny],
+        "reachable": [AllowAny],
     }
 
+    @staticmethod
+    def _graph_airport(graph, airport_id, **extra):
+        name, city = graph.airports[airport_id]
+        return {"id": airport_id, "name": name, "closest_big_city": city, **extra}
+
+    @extend_schema(
+        summary="Shortest route between airports",
+        description="Returns the shortest chain of routes, by total distance, from source to destination airport.",
+        parameters=[ShortestRouteSearchSerializer],
+        responses={
+            200: ShortestRouteSerializer,
+            404: OpenApiResponse(description="Destination not reachable"),
+        },
+    )
+    @action(detail=False, methods=["get"], url_path="shortest")
+    def shortest(self, request):
+        params = ShortestRouteSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        graph = get_route_graph()
+        result = graph.shortest_path(
+            params.validated_data["source"], params.validated_data["destination"]
+        )
+        if result is None:
+            return Response(
+                {"detail": "Destination is not reachable from source."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        distance, path = result
+        return Response(
+            {
+                "distance": distance,
+                "airports": [self._graph_airport(graph, pk) for pk in path],
+            }
+        )
+
+    @extend_schema(
+        summary="Airports reachable from an airport",
+        description="Returns the airports reachable from source by chaining at most `hops` routes, with the fewest hops needed.",
+        parameters=[ReachableAirportsSearchSerializer],
+        responses={200: ReachableAirportSerializer(many=True)},
+    )
+    @action(detail=False, methods=["get"], url_path="reachable")
+    def reachable(self, request):
+        params = ReachableAirportsSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        graph = get_route_graph()
+        reachable = graph.reachable(
+            params.validated_data["source"], params.validated_data["hops"]
+        )
+        return Response(
+            [
+                self._graph_airport(graph, pk, hops=hops)
+                for pk, hops in sorted(reachable.items(), key=lambda item: item[1])
+            ]
+        )
+
 
 # AirplaneTypeViewSet
 @extend_schema_view(
@@ -234,7 +358,7 @@ class RouteViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         },
     ),
 )
-class AirplaneTypeViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
+class AirplaneTypeViewSet(CachedResponseMixin, BaseViewSetMixin, viewsets.ModelViewSet):
     queryset = AirplaneType.objects.all()
     serializer_class = BaseAirplaneTypeSerializer
     action_serializers = {
@@ -242,6 +366,8 @@ class AirplaneTypeViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         "retrieve": AirplaneTypeDetailSerializer,
     }
     filter_backends = FILTER_BACKENDS
+    pagination_modes = PAGINATION_MODES
+    query_budgets = {"list": 2, "retrieve": 1}
     filterset_fields = {
         "rows": ["gte", "lte"],
         "seats_in_row": ["gte", "lte"],
@@ -294,7 +420,7 @@ class AirplaneTypeViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         responses={204: OpenApiResponse(description="No content, airplane deleted")},
     ),
 )
-class AirplaneViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
+class AirplaneViewSet(CachedResponseMixin, BaseViewSetMixin, viewsets.ModelViewSet):
     queryset = Airplane.objects.select_related("airplane_type").all()
     serializer_class = BaseAirplaneSerializer
     action_serializers = {
@@ -302,6 +428,8 @@ class AirplaneViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         "retrieve": AirplaneDetailSerializer,
     }
     filter_backends = FILTER_BACKENDS
+    pagination_modes = PAGINATION_MODES
+    query_budgets = {"list": 2, "retrieve": 1}
     filterset_fields = {"airplane_type": ["exact"]}
     search_fields = ["name"]
     ordering_fields = ["name"]
@@ -371,7 +499,7 @@ class AirplaneViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         responses={204: OpenApiResponse(description="No content, crew member deleted")},
     ),
 )
-class CrewViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
+class CrewViewSet(CachedResponseMixin, BaseViewSetMixin, viewsets.ModelViewSet):
     queryset = Crew.objects.all()
     serializer_class = BaseCrewSerializer
     action_serializers = {
@@ -379,6 +507,8 @@ class CrewViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         "retrieve": CrewDetailSerializer,
     }
     filter_backends = FILTER_BACKENDS
+    pagination_modes = PAGINATION_MODES
+    query_budgets = {"list": 2, "retrieve": 1}
     search_fields = ["first_name", "last_name"]
     ordering_fields = ["last_name"]
     action_permissions = {
@@ -395,7 +525,7 @@ class CrewViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
 @extend_schema_view(
     list=extend_schema(
         summary="List all flights",
-        description="Returns a list of all flights. Supports filtering by route, airplane, and date range.",
+        description="Returns a list of all flights. Supports filtering by route, airplane, and date range. Pass pagination=keyset for cursor pagination, which stays fast on deep pages, nocount to skip the total count, or estimate for a planner-estimated count.",
         responses={200: FlightListSerializer(many=True)},
     ),
     retrieve=extend_schema(
@@ -426,10 +556,23 @@ class CrewViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         description="Admin only. Delete a flight.",
         responses={204: OpenApiResponse(description="No content, flight deleted")},
     ),
+    export=extend_schema(
+        summary="Export flights (admin only)",
+        description="Admin only. Streams every flight matching the list filters as NDJSON or CSV, without pagination.",
+        parameters=EXPORT_PARAMETERS,
+        filters=True,
+        responses=EXPORT_RESPONSES,
+    ),
 )
-class FlightViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
+class FlightViewSet(
+    ExportMixin,
+    ConditionalGetMixin,
+    ValuesListMixin,
+    BaseViewSetMixin,
+    viewsets.ModelViewSet,
+):
     queryset = (
-        Flight.objects.select_related("route", "airplane")
+        Flight.objects.select_related("route", "airplane__airplane_type")
         .prefetch_related("crew")
         .all()
     )
@@ -437,15 +580,19 @@ class FlightViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
     action_serializers = {
         "list": FlightListSerializer,
         "retrieve": FlightDetailSerializer,
+        "search": FlightListSerializer,
+        "export": FlightListSerializer,
     }
     filter_backends = FILTER_BACKENDS
-    filterset_fields = {
-        "route": ["exact"],
-        "airplane": ["exact"],
-        "departure_time": ["date", "gte", "lte"],
-        "arrival_time": ["date", "gte", "lte"],
-    }
+    pagination_modes = KEYSET_PAGINATION_MODES
+    query_budgets = {"list": 3, "retrieve": 2}
+    # search renders through get_serializer too.
+    sparse_fieldset_actions = ("list", "retrieve", "search")
+    filterset_class = FlightFilter
+    # Read by the capacity and seats_left annotations.
+    etag_models = (Seat, Ticket, SeatHold)
     ordering_fields = ["departure_time", "arrival_time"]
+    keyset_ordering = ["departure_time"]
     action_permissions = {
         "list": [AllowAny],
         "retrieve": [AllowAny],
@@ -453,8 +600,33 @@ class FlightViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         "update": [IsAdminUser],
         "partial_update": [IsAdminUser],
         "destroy": [IsAdminUser],
+        "search": [AllowAny],
+        "itineraries": [AllowAny],
+        "seat_map": [AllowAny],
+        "holds": [IsAuthenticated],
+        "order_holds": [IsAuthenticated],
+        "export": [IsAdminUser],
     }
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("list", "search", "export") and (
+            self.field_requested("capacity") or self.field_requested("seats_left")
+        ):
+            queryset = queryset.with_availability()
+        elif self.action in ("seat_map", "available_seats"):
+            queryset = queryset.prefetch_related(None)
+        return queryset
+
+    def volatile_modified(self):
+        if self.action != "list" or not (
+            self.field_requested("capacity") or self.field_requested("seats_left")
+        ):
+            return None
+        # Holds lapse without a write, handing their seats back to seats_left.
+        lapsed = SeatHold.objects.expired().aggregate(last=Max("expires_at"))["last"]
+        return None if lapsed is None else int(lapsed.timestamp() * 1_000_000)
+
     @extend_schema(
         summary="Get available seats for flight",
         description="Returns list of available seats for the selected flight.",
@@ -463,23 +635,178 @@ class FlightViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
     @action(detail=True, methods=["get"], url_path="seats/available")
     def available_seats(self, request, pk=None):
         flight = self.get_object()
-        booked_ids = Ticket.objects.filter(flight=flight).values_list(
-            "seat_id", flat=True
-        )
-        seats = Seat.objects.filter(
-            airplane_type=flight.airplane.airplane_type
-        ).exclude(pk__in=booked_ids)
-        if not seats.exists():
+        airplane_type = flight.airplane.airplane_type
+        bitmap = get_seat_bitmap(flight.pk, airplane_type)
+        held = held_seat_ids(flight)
+        # The seat layout comes from the cache; only holds are read live.
+        seats = [
+            {
+                "id": str(seat_id),
+                "airplane_type": airplane_type.name,
+                "row": row,
+                "seat": letter,
+                "seat_class": seat_class,
+            }
+            for seat_id, row, letter, seat_class in get_seat_layout(airplane_type.pk)
+            if not bitmap.is_booked(row, letter) and seat_id not in held
+        ]
+        if not seats:
             return Response({"detail": "No seats available"}, status=200)
-        serializer = SeatListSerializer(seats, many=True)
+        return Response(seats)
+
+    @extend_schema(
+        summary="Search flights by city or airport and date",
+        description="Returns direct flights from origin to destination departing on the given local date, earliest first. Origin and destination are airport IDs or city names (matched exactly against closest_big_city).",
+        parameters=[FlightSearchSerializer],
+        responses={200: FlightListSerializer(many=True)},
+    )
+    @action(detail=False, methods=["get"], url_path="search")
+    def search(self, request):
+        params = FlightSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        search = params.validated_data
+        queryset = (
+            self.get_queryset()
+            .between(search["origin"], search["destination"])
+            .departing_on(search["date"])
+            .order_by("departure_time")
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    @extend_schema(
+        summary="Search connecting itineraries",
+        description="Finds itineraries from origin to destination airport whose first flight departs within the date window, with up to max_stops connections of at least min_connection minutes. Earliest arrival first.",
+        parameters=[ItinerarySearchSerializer],
+        responses={200: ItinerarySerializer(many=True)},
+    )
+    @action(detail=False, methods=["get"], url_path="itineraries")
+    def itineraries(self, request):
+        params = ItinerarySearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        search = params.validated_data
+        graph = get_flight_graph()
+        results = graph.search(
+            search["origin"],
+            search["destination"],
+            departure_from=timezone.make_aware(
+                datetime.combine(search["date_from"], time.min)
+            ),
+            departure_to=timezone.make_aware(
+                datetime.combine(search["date_to"], time.max)
+            ),
+            max_stops=search["max_stops"],
+            min_connection=timedelta(minutes=search["min_connection"]),
+            limit=search["limit"],
+        )
+        serializer = ItinerarySerializer(
+            results, many=True, context={"airports": graph.airports}
+        )
+        return Response(serializer.data)
+
+    @extend_schema(
+        summary="Get seat map for flight",
+        description="Returns a compact row-major seat map of the flight: seat-class runs and an occupancy string. The map is cached until a seat of the flight changes state; send its ETag in If-None-Match to get a 304 while it is unchanged.",
+        responses={200: SeatMapSerializer},
+    )
+    @action(detail=True, methods=["get"], url_path="seats/map")
+    def seat_map(self, request, pk=None):
+        flight = self.get_object()
+        seat_map = get_seat_map(flight)
+        return self.conditional_response(
+            request,
+            lambda: Response(seat_map),
+            [seat_map["version"], seat_map["occupancy"]],
+        )
+
+    @extend_schema(
+        methods=["GET"],
+        summary="List own seat holds",
+        description="Returns the current user's active seat holds on the flight.",
+        responses={200: SeatHoldSerializer(many=True)},
+    )
+    @extend_schema(
+        methods=["POST"],
+        summary="Hold seats",
+        description="Hold seats of the flight for the current user for a limited time. Holding seats the user already holds extends their expiry.",
+        request=SeatHoldCreateSerializer,
+        responses={
+            201: SeatHoldSerializer(many=True),
+            409: OpenApiResponse(description="Seats booked or held by another customer"),
+        },
+    )
+    @extend_schema(
+        methods=["DELETE"],
+        summary="Release held seats",
+        description="Release the given seats, or all of the current user's holds on the flight.",
+        request=SeatHoldReleaseSerializer,
+        responses={204: OpenApiResponse(description="No content, holds released")},
+    )
+    @action(detail=True, methods=["get", "post", "delete"], url_path="holds")
+    def holds(self, request, pk=None):
+        flight = self.get_object()
+        if request.method == "POST":
+            serializer = SeatHoldCreateSerializer(
+                data=request.data, context={"flight": flight}
+            )
+            serializer.is_valid(raise_exception=True)
+            holds = hold_seats(
+                request.user, flight, serializer.validated_data["seat_ids"]
+            )
+            return Response(
+                SeatHoldSerializer(holds, many=True).data,
+                status=status.HTTP_201_CREATED,
+            )
+        if request.method == "DELETE":
+            serializer = SeatHoldReleaseSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            release_seats(
+                request.user, flight, serializer.validated_data.get("seat_ids")
+            )
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        holds = SeatHold.objects.active().filter(flight=flight, user=request.user)
+        return Response(SeatHoldSerializer(holds, many=True).data)
+
+    @extend_schema(
+        summary="Order held seats",
+        description="Create an order from all of the current user's active holds on the flight.",
+        request=None,
+        responses={201: OrderDetailSerializer},
+    )
+    @action(detail=True, methods=["post"], url_path="holds/order")
+    def order_holds(self, request, pk=None):
+        flight = self.get_object()
+        seat_ids = list(
+            SeatHold.objects.active()
+            .filter(flight=flight, user=request.user)
+            .values_list("seat_id", flat=True)
+        )
+        if not seat_ids:
+            return Response(
+                {"detail": "No active seat holds on this flight."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = OrderCreateSerializer(
+            data={"flight_id": flight.pk, "seat_ids": seat_ids},
+            context=self.get_serializer_context(),
+        )
+        serializer.is_valid(raise_exception=True)
+        order = serializer.save()
+        return Response(
+            OrderDetailSerializer(order, context=self.get_serializer_context()).data,
+            status=status.HTTP_201_CREATED,
+        )
+
 
 # OrderViewSet
 @extend_schema_view(
     list=extend_schema(
         summary="List all orders (user only)",
-        description="Returns a list of all orders belonging to the current user. Admins see all orders.",
+        description="Returns a list of all orders belonging to the current user. Admins see all orders. Pass pagination=keyset for cursor pagination, which stays fast on deep pages, nocount to skip the total count, or estimate for a planner-estimated count.",
         responses={200: OrderListSerializer(many=True)},
     ),
     retrieve=extend_schema(
@@ -491,7 +818,10 @@ class FlightViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         summary="Create new order",
         description="Create a new order with selected tickets. Only authenticated users.",
         request=OrderCreateSerializer,
-        responses={201: OrderDetailSerializer},
+        responses={
+            201: OrderDetailSerializer,
+            409: OpenApiResponse(description="Seats taken by a concurrent order"),
+        },
     ),
     update=extend_schema(
         summary="Update order (admin only)",
@@ -510,18 +840,31 @@ class FlightViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         description="Delete an order. Users can only delete their own orders.",
         responses={204: OpenApiResponse(description="No content, order deleted")},
     ),
+    export=extend_schema(
+        summary="Export orders (admin only)",
+        description="Admin only. Streams every order matching the list filters (e.g. created_at__gte and created_at__lte for a month) as NDJSON or CSV, without pagination.",
+        parameters=EXPORT_PARAMETERS,
+        filters=True,
+        responses=EXPORT_RESPONSES,
+    ),
 )
-class OrderViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
+class OrderViewSet(
+    ExportMixin, ConditionalGetMixin, BaseViewSetMixin, viewsets.ModelViewSet
+):
     queryset = Order.objects.select_related("user").all()
     serializer_class = BaseOrderSerializer
     action_serializers = {
         "list": OrderListSerializer,
         "retrieve": OrderDetailSerializer,
         "create": OrderCreateSerializer,
+        "export": OrderDetailSerializer,
     }
     filter_backends = FILTER_BACKENDS
-    filterset_fields = {"created_at": ["date", "gte", "lte"]}
+    pagination_modes = KEYSET_PAGINATION_MODES
+    query_budgets = {"list": 2, "retrieve": 2}
+    filterset_class = OrderFilter
     ordering_fields = ["created_at"]
+    keyset_ordering = ["-created_at"]
     action_permissions = {
         "list": [IsAuthenticated],
         "retrieve": [IsAuthenticated],
@@ -529,13 +872,20 @@ class OrderViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         "update": [IsAdminUser],
         "partial_update": [IsAdminUser],
         "destroy": [IsAuthenticated],
+        "export": [IsAdminUser],
+    }
+    action_authentication = {
+        "list": [TokenUserAuthentication],
+        "retrieve": [TokenUserAuthentication],
     }
 
     def get_queryset(self):
         request_user = self.request.user
-        queryset = self.queryset
+        queryset = super().get_queryset()
         if not request_user.is_staff:
-            queryset = queryset.filter(user=request_user)
+            # By id: the user may be a TokenUser, not a model instance. Staff
+            # users never are, so is_staff here comes from the database.
+            queryset = queryset.filter(user_id=request_user.pk)
         return queryset
 
     def create(self, request, *args, **kwargs):
@@ -589,7 +939,7 @@ class OrderViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         responses={204: OpenApiResponse(description="No content, seat class deleted")},
     ),
 )
-class SeatClassViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
+class SeatClassViewSet(CachedResponseMixin, BaseViewSetMixin, viewsets.ModelViewSet):
     queryset = SeatClass.objects.all()
     serializer_class = BaseSeatClassSerializer
     action_serializers = {
@@ -597,6 +947,8 @@ class SeatClassViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         "retrieve": SeatClassDetailSerializer,
     }
     filter_backends = FILTER_BACKENDS
+    pagination_modes = PAGINATION_MODES
+    query_budgets = {"list": 2, "retrieve": 1}
     filterset_fields = {"name": ["exact", "icontains"]}
     search_fields = ["name"]
     ordering_fields = ["name"]
@@ -646,7 +998,9 @@ class SeatClassViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         responses={204: OpenApiResponse(description="No content, seat deleted")},
     ),
 )
-class SeatViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
+class SeatViewSet(
+    CachedResponseMixin, ValuesListMixin, BaseViewSetMixin, viewsets.ModelViewSet
+):
     queryset = Seat.objects.select_related("airplane_type", "seat_class").all()
     serializer_class = BaseSeatSerializer
     action_serializers = {
@@ -654,6 +1008,8 @@ class SeatViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         "retrieve": SeatDetailSerializer,
     }
     filter_backends = FILTER_BACKENDS
+    pagination_modes = PAGINATION_MODES
+    query_budgets = {"list": 2, "retrieve": 1}
     filterset_fields = {
         "airplane_type": ["exact"],
         "seat_class": ["exact"],
@@ -675,7 +1031,7 @@ class SeatViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
 @extend_schema_view(
     list=extend_schema(
         summary="List all tickets (user only)",
-        description="Returns a list of all tickets for the current user. Admins see all tickets.",
+        description="Returns a list of all tickets for the current user. Admins see all tickets. Pass pagination=keyset for cursor pagination, which stays fast on deep pages, nocount to skip the total count, or estimate for a planner-estimated count.",
         responses={200: TicketListSerializer(many=True)},
     ),
     retrieve=extend_schema(
@@ -706,8 +1062,17 @@ class SeatViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         description="Authenticated users can delete their own tickets.",
         responses={204: OpenApiResponse(description="No content, ticket deleted")},
     ),
+    export=extend_schema(
+        summary="Export tickets (admin only)",
+        description="Admin only. Streams every ticket matching the list filters (e.g. flight) as NDJSON or CSV, without pagination.",
+        parameters=EXPORT_PARAMETERS,
+        filters=True,
+        responses=EXPORT_RESPONSES,
+    ),
 )
-class TicketViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
+class TicketViewSet(
+    ExportMixin, ConditionalGetMixin, BaseViewSetMixin, viewsets.ModelViewSet
+):
     queryset = Ticket.objects.select_related(
         "flight",
         "seat",
@@ -721,14 +1086,18 @@ class TicketViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
     action_serializers = {
         "list": TicketListSerializer,
         "retrieve": TicketDetailSerializer,
+        "export": TicketDetailSerializer,
     }
     filter_backends = FILTER_BACKENDS
+    pagination_modes = KEYSET_PAGINATION_MODES
+    query_budgets = {"list": 2, "retrieve": 1}
     filterset_fields = {
         "flight": ["exact"],
         "seat__seat_class": ["exact"],
         "order": ["exact"],
     }
     ordering_fields = ["flight__departure_time", "seat__row", "seat__seat"]
+    keyset_ordering = ["flight__departure_time"]
     action_permissions = {
         "list": [IsAuthenticated],
         "retrieve": [IsAuthenticated],
@@ -736,6 +1105,11 @@ class TicketViewSet(BaseViewSetMixin, viewsets.ModelViewSet):
         "update": [IsAdminUser],
         "partial_update": [IsAdminUser],
         "destroy": [IsAuthenticated],
+        "export": [IsAdminUser],
+    }
+    action_authentication = {
+        "list": [TokenUserAuthentication],
+        "retrieve": [TokenUserAuthentication],
     }
 
     @transaction.atomic
@@ -29,7 +29,15 @@ SECRET_KEY = os.environ.get(
 )
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get("DJANGO_DEBUG", "true").lower() in ("1", "true", "yes")
+
+# Whether the browsable API renderer is offered; rendering its templates is
+# costly, so production deployments serve JSON only.
+BROWSABLE_API = os.environ.get("DJANGO_BROWSABLE_API", str(DEBUG)).lower() in (
+    "1",
+    "true",
+    "yes",
+)
 
 INTERNAL_IPS = ["127.0.0.1"]
 
@@ -134,6 +142,35 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Django's default hashers, with PBKDF2 (the one new hashes use) swapped for
+# a drop-in that derives keys in a process pool instead of on the request
+# thread.
+PASSWORD_HASHERS = [
+    "accounts.hashers.OffloadedPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+# Request threads per gunicorn worker; gunicorn.conf.py reads it too.
+WEB_THREADS = int(os.environ.get("WEB_THREADS", 8))
+
+# Processes hashing passwords per web worker (0 hashes on the request thread,
+# as under tests), how many more hashes may wait for them, and how many
+# seconds a request waits for a place before a 503. A request thread is busy
+# until its hash is done, so the hashes in flight are capped below
+# WEB_THREADS: a quarter of the threads (at least one) stay free to serve
+# everything else during a login storm. With the defaults, 6 of 8 threads.
+# A thread waiting for a place is just as busy, so by default none waits.
+PASSWORD_HASHING_WORKERS = int(os.environ.get("PASSWORD_HASHING_WORKERS", 2))
+PASSWORD_HASHING_QUEUE_SIZE = max(
+    WEB_THREADS - max(WEB_THREADS // 4, 1) - PASSWORD_HASHING_WORKERS, 0
+)
+PASSWORD_HASHING_QUEUE_TIMEOUT = 0
+if "test" in sys.argv or "pytest" in sys.argv[0]:
+    PASSWORD_HASHING_WORKERS = 0
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -161,17 +198,22 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
-        "rest_framework.renderers.BrowsableAPIRenderer",
+        "base.renderers.FastJSONRenderer",
+        *(["rest_framework.renderers.BrowsableAPIRenderer"] if BROWSABLE_API else []),
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "base.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
     "DEFAULT_VERSIONING_CLASS": "rest_framework.versioning.NamespaceVersioning",
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
         # "rest_framework.authentication.SessionAuthentication",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    "DEFAULT_PAGINATION_CLASS": "base.pagination.SelectablePagination",
     "PAGE_SIZE": 10,
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_SCHEMA_CLASS": "base.schema.AutoSchema",
     "DEFAULT_THROTTLE_RATES": {
         "signup": "5/hour",
         "token_obtain": "10/minute",
@@ -184,13 +226,77 @@ if "test" in sys.argv or "pytest" in sys.argv[0]:
         "token_obtain": None,
     }
 
+# SQLite file the throttles count requests in when the cache is not Redis,
+# shared by every worker process on the host.
+RATE_LIMIT_SQLITE_PATH = BASE_DIR / "rate_limit.sqlite3"
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
+    "TOKEN_REFRESH_SERIALIZER": "accounts.serializers.RevocableTokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "accounts.serializers.RevocableTokenVerifySerializer",
 }
 
+# Seconds each process trusts its Bloom filter of revoked token ids before
+# rebuilding it; a token revoked by another process may pass verification
+# for up to this long, though a rotated refresh token never refreshes twice.
+REVOKED_TOKEN_BLOOM_TIMEOUT = 10
+
+# Seconds a per-flight seat availability bitmap lives in the cache before it
+# is rebuilt from the database.
+SEAT_INDEX_TIMEOUT = 60 * 60
+
+# Seconds a seat claim taken during order creation survives if its owner
+# never releases it (e.g. the worker dies mid-request).
+SEAT_CLAIM_TIMEOUT = 30
+
+# Seconds a seat stays held for a customer before it is released.
+SEAT_HOLD_TIMEOUT = 10 * 60
+
+# Seconds after a hold was first taken past which re-holding the seat no
+# longer extends it, so a hold cannot be refreshed forever.
+SEAT_HOLD_MAX_AGE = 30 * 60
+
+# Most seats of one flight a customer may hold at once.
+SEAT_HOLD_MAX_SEATS = 9
+
+# Upper bound, in seconds, on how long a built seat map is cached; it is
+# dropped earlier whenever the flight's seats change.
+SEAT_MAP_TIMEOUT = 60 * 60
+
+# Seconds the seat layout of an airplane type (ids, positions and classes)
+# is cached; it is dropped earlier whenever the type or its seats change.
+SEAT_LAYOUT_TIMEOUT = 24 * 60 * 60
+
+# Whether list/detail responses carry ETag and Last-Modified and answer
+# conditional GETs with 304. Their validators come from table write stamps
+# kept in the cache, so this needs the cache shared by every worker (Redis,
+# under Docker); per-process LocMem would let the workers that did not see a
+# write keep validating stale ETags. Tests run in one process.
+CONDITIONAL_GET = bool(os.environ.get("IN_DOCKER", False))
+if "test" in sys.argv or "pytest" in sys.argv[0]:
+    CONDITIONAL_GET = True
+
+# Seconds a cached response of a public catalog endpoint is kept; writes to
+# the tables it reads move readers to a new key well before that. 0 turns the
+# cache off, as under tests, whose writes never commit.
+RESPONSE_CACHE_TIMEOUT = 10 * 60
+if "test" in sys.argv or "pytest" in sys.argv[0]:
+    RESPONSE_CACHE_TIMEOUT = 0
+
+# Seconds an authenticated user stays in the shared cache, and in each
+# process's local LRU (which other processes cannot invalidate, so keep it
+# short), plus the number of users that LRU holds.
+AUTH_USER_CACHE_TIMEOUT = 60
+AUTH_USER_LOCAL_CACHE_TIMEOUT = 5
+AUTH_USER_LOCAL_CACHE_SIZE = 1024
+
+# Tables with more rows than this must not be read by a sequential scan in
+# the query-plan tests of hot endpoints.
+QUERY_PLAN_SEQ_SCAN_MAX_ROWS = 1000
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Airport Service API",
     "DESCRIPTION": "Airport tickets reservation",
@@ -0,0 +1,59 @@
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+
+class BenchmarkCommand(BaseCommand):
+    """
+    Base for benchmark commands. ``benchmark()`` runs against a throwaway
+    test database, so the configured one is never touched. On SQLite the test
+    database is a temporary file so that worker threads share it.
+    Benchmarks that never query set ``uses_database = False``.
+    """
+
+    uses_database = True
+
+    def handle(self, *args, **options):
+        if not self.uses_database:
+            self.benchmark(**options)
+            return
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            if connection.vendor == "sqlite":
+                test_settings = connection.settings_dict.setdefault("TEST", {})
+                test_settings["NAME"] = str(Path(tmp_dir) / "benchmark.sqlite3")
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            try:
+                self.benchmark(**options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def benchmark(self, **options):
+        raise NotImplementedError
+
+    def report(self, label, seconds, count, unit="ops"):
+        rate = count / seconds if seconds else float("inf")
+        self.stdout.write(
+            f"{label:<40} {count:>8} {unit} in {seconds:8.3f}s "
+            f"({rate:,.0f} {unit}/s)"
+        )
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Timer:
+    """Context manager measuring wall-clock seconds into ``elapsed``."""
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self.started
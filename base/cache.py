@@ -0,0 +1,63 @@
+import time
+
+from django.core.cache import cache
+
+GENERATION_KEY = "generation:{name}"
+COUNTER_KEY = "counter:{name}"
+
+
+def _generation_key(name):
+    return GENERATION_KEY.format(name=name)
+
+
+def _seed():
+    # A missing counter restarts from the clock rather than from 1, so that
+    # entries keyed by an evicted generation can never be served again.
+    return time.time_ns() // 1000
+
+
+def get_generation(name):
+    """Current value of the generation counter ``name``."""
+    key = _generation_key(name)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, _seed(), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+def get_generations(names):
+    """Current values of several generation counters, in one cache round trip."""
+    keys = {name: _generation_key(name) for name in names}
+    values = cache.get_many(keys.values())
+    return {
+        name: values[key] if key in values else get_generation(name)
+        for name, key in keys.items()
+    }
+
+
+def bump_generation(name):
+    """Advance ``name`` so every entry keyed by its old value goes stale."""
+    key = _generation_key(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, _seed(), timeout=None)
+        return cache.incr(key)
+
+
+def increment_counter(name):
+    """Add one to the counter ``name``, creating it at zero."""
+    key = COUNTER_KEY.format(name=name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        return cache.incr(key)
+
+
+def get_counters(names):
+    """Current values of the counters ``names`` (0 if never incremented)."""
+    keys = {name: COUNTER_KEY.format(name=name) for name in names}
+    values = cache.get_many(keys.values())
+    return {name: values.get(key, 0) for name, key in keys.items()}
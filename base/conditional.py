@@ -0,0 +1,82 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+TABLE_MODIFIED_KEY = "table-modified:{label}"
+
+
+def _table_modified_key(model):
+    return TABLE_MODIFIED_KEY.format(label=model._meta.label_lower)
+
+
+def _now_us():
+    return time.time_ns() // 1000
+
+
+def get_tables_modified(models):
+    """
+    When each of ``models`` last had a write, as microsecond timestamps, in
+    one cache round trip. A table never touched (or evicted) counts as
+    modified now, so validators built on it can only go stale, never wrong.
+    """
+    keys = {model: _table_modified_key(model) for model in models}
+    values = cache.get_many(keys.values())
+    modified = {}
+    for model, key in keys.items():
+        if key not in values:
+            cache.add(key, _now_us(), timeout=None)
+            values[key] = cache.get(key)
+        modified[model] = values[key]
+    return modified
+
+
+def touch_tables(*models):
+    """Record a write to ``models`` once the transaction commits."""
+
+    def touch():
+        now = _now_us()
+        cache.set_many({_table_modified_key(model): now for model in models}, None)
+
+    transaction.on_commit(touch)
+
+
+def _model_saved(sender, **kwargs):
+    touch_tables(sender)
+
+
+def _relation_changed(sender, instance, model, **kwargs):
+    if kwargs["action"].startswith("post_"):
+        touch_tables(type(instance), model)
+
+
+def watch_tables(*models):
+    """
+    Touch ``models`` on every save and delete, and both ends of their
+    many-to-many relations when those change. Bulk writes send no signals
+    and must call ``touch_tables`` themselves.
+    """
+    for model in models:
+        post_save.connect(_model_saved, sender=model, weak=False)
+        post_delete.connect(_model_saved, sender=model, weak=False)
+        for field in model._meta.local_many_to_many:
+            m2m_changed.connect(
+                _relation_changed, sender=field.remote_field.through, weak=False
+            )
+
+
+def to_datetime(timestamp_us):
+    return datetime.fromtimestamp(timestamp_us / 1_000_000, timezone.utc)
+
+
+def digest(*parts):
+    """Hex digest of the string forms of ``parts``."""
+    return hashlib.sha1("\x1f".join(map(str, parts)).encode()).hexdigest()
+
+
+def make_etag(*parts):
+    """Strong ETag over the string forms of ``parts``."""
+    return f'"{digest(*parts)}"'
@@ -0,0 +1,28 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django_filters import rest_framework as filters
+from django_filters.constants import EMPTY_VALUES
+
+
+def local_day_range(date):
+    """Aware [start, end) bounds of a calendar day in the current time zone."""
+    start = timezone.make_aware(datetime.combine(date, time.min))
+    end = timezone.make_aware(datetime.combine(date + timedelta(days=1), time.min))
+    return start, end
+
+
+class LocalDateFilter(filters.DateFilter):
+    """
+    ``<field>__date`` as a half-open range on the datetime column instead of a
+    cast of it, so an index on the column can serve the filter.
+    """
+
+    def filter(self, queryset, value):
+        if value in EMPTY_VALUES:
+            return queryset
+        start, end = local_day_range(value)
+        queryset = queryset.filter(
+            **{f"{self.field_name}__gte": start, f"{self.field_name}__lt": end}
+        )
+        return queryset.distinct() if self.distinct else queryset
@@ -1,8 +1,45 @@
+import csv
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.serializers import ListSerializer
+
+from base.cache import increment_counter
+from base.conditional import digest, get_tables_modified, make_etag
+from base.planner import QueryPlan, also_load, plan_queryset
+from base.renderers import FastJSONRenderer
+from base.values import values_serializer
+
+
 class BaseViewSetMixin:
     """
-    Mixin for mapping actions with serializers and permissions
+    Mixin for mapping actions with serializers, permissions and (through
+    ``action_authentication``) authentication classes.
+
+    Actions with an entry in ``action_serializers`` get their queryset's
+    select_related/prefetch_related/only() derived from that serializer
+    (see ``base.planner``); set ``auto_plan_queryset = False`` to opt out.
+
+    Reads by the ``sparse_fieldset_actions`` accept sparse fieldsets:
+    ``?fields=a,b`` keeps only those fields of the response and ``?omit=a,b``
+    drops them. The planned queryset follows the pruned serializer, so
+    left-out columns and joins are not fetched. Other actions ignore both
+    parameters, as their responses need not come from ``get_serializer``.
     """
 
+    auto_plan_queryset = True
+    fields_query_param = "fields"
+    omit_query_param = "omit"
+    sparse_fieldset_actions = ("list", "retrieve")
+
     def get_serializer_class(self):
         if (
             hasattr(self, "action_serializers")
@@ -20,3 +57,412 @@ class BaseViewSetMixin:
             return [permission() for permission in self.action_permissions[self.action]]
 
         return super().get_permissions()
+
+    def get_authenticators(self):
+        # Called before ``self.action`` is set, so map the method directly.
+        request = getattr(self, "request", None)
+        action_map = getattr(self, "action_map", None) or {}
+        action = action_map.get(request.method.lower()) if request else None
+        if (
+            hasattr(self, "action_authentication")
+            and action in self.action_authentication
+        ):
+            return [
+                authentication()
+                for authentication in self.action_authentication[action]
+            ]
+
+        return super().get_authenticators()
+
+    def get_serializer(self, *args, **kwargs):
+        return self.prune_fields(super().get_serializer(*args, **kwargs))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.auto_plan_queryset and (
+            self.action in getattr(self, "action_serializers", {})
+            or self.sparse_fieldset_requested()
+        ):
+            serializer = self.prune_fields(
+                self.get_serializer_class()(context=self.get_serializer_context())
+            )
+            meta = getattr(serializer, "Meta", None)
+            if getattr(meta, "model", None) is queryset.model:
+                queryset = plan_queryset(
+                    queryset,
+                    serializer,
+                    # Deferred fields would be left out of a later save().
+                    defer=getattr(self.request, "method", "GET") in SAFE_METHODS,
+                )
+        return queryset
+
+    def sparse_fieldset_requested(self):
+        request = getattr(self, "request", None)
+        return (
+            request is not None
+            and request.method in SAFE_METHODS
+            and getattr(self, "action", None) in self.sparse_fieldset_actions
+            and any(
+                request.query_params.get(param)
+                for param in (self.fields_query_param, self.omit_query_param)
+            )
+        )
+
+    def _field_names(self, param):
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
+        return {name.strip() for name in value.split(",") if name.strip()}
+
+    def _requested_fields(self, param, fields):
+        names = self._field_names(param)
+        unknown = (names or set()) - set(fields)
+        if unknown:
+            raise ValidationError(
+                {
+                    param: [
+                        f"Unknown fields: {', '.join(sorted(unknown))}. "
+                        f"Choose from: {', '.join(fields)}."
+                    ]
+                }
+            )
+        return names
+
+    def field_requested(self, name):
+        """Whether the sparse fieldset of a read keeps the field ``name``."""
+        if not self.sparse_fieldset_requested():
+            return True
+        keep = self._field_names(self.fields_query_param)
+        omit = self._field_names(self.omit_query_param) or set()
+        return (keep is None or name in keep) and name not in omit
+
+    def prune_fields(self, serializer):
+        """Drop the fields a read left out with ``?fields=`` or ``?omit=``."""
+        if not self.sparse_fieldset_requested():
+            return serializer
+        if isinstance(serializer, ListSerializer):
+            fields = serializer.child.fields
+        else:
+            fields = serializer.fields
+        self._requested_fields(self.fields_query_param, fields)
+        self._requested_fields(self.omit_query_param, fields)
+        for name in list(fields):
+            if not self.field_requested(name):
+                del fields[name]
+        return serializer
+
+
+class ValuesListMixin:
+    """
+    Opt-in fast path for ``list``: rows are read with ``values()`` and turned
+    into the list serializer's exact output without building model instances
+    (see ``base.values``). Serializers it cannot handle use the normal path.
+    """
+
+    use_values_list = True
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_values_list:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        row_serializer = values_serializer(self.get_serializer(), queryset)
+        if row_serializer is None:
+            return super().list(request, *args, **kwargs)
+        queryset = queryset.prefetch_related(None).values(*row_serializer.lookups)
+        page = self.paginate_queryset(queryset)
+        rows = queryset if page is None else page
+        data = [row_serializer.to_representation(row) for row in rows]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class _Echo:
+    """File-like object for ``csv.writer`` that hands back each line."""
+
+    def write(self, value):
+        return value
+
+
+def _buffered(chunks, size=64 * 1024):
+    """Join small byte ``chunks`` into writes of about ``size`` bytes."""
+    buffer, length = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield b"".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+class ExportMixin:
+    """
+    ``export`` action streaming the whole filtered queryset as NDJSON or CSV
+    (``?output=``). Rows are read with ``iterator()`` in chunks of
+    ``export_chunk_size``, from ``values()`` when the serializer allows it
+    (see ``base.values``), so memory stays flat however many rows match.
+    Rows are serialized with ``action_serializers["export"]``.
+    """
+
+    export_chunk_size = 2000
+    export_query_param = "output"
+    export_formats = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+    def perform_content_negotiation(self, request, force=False):
+        # Exports bypass the renderers, so any Accept header will do.
+        force = force or self.action == "export"
+        return super().perform_content_negotiation(request, force)
+
+    def export_rows(self, queryset, serializer):
+        row_serializer = values_serializer(serializer, queryset)
+        if row_serializer is None:
+            rows, represent = queryset, serializer.to_representation
+        else:
+            rows = queryset.prefetch_related(None).values(*row_serializer.lookups)
+            represent = row_serializer.to_representation
+        for row in rows.iterator(chunk_size=self.export_chunk_size):
+            yield represent(row)
+
+    @staticmethod
+    def _ndjson(rows):
+        renderer = FastJSONRenderer()
+        for row in rows:
+            yield renderer.render(row) + b"\n"
+
+    @staticmethod
+    def _csv_cell(value):
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return value
+
+    def _csv(self, rows, fields):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(fields).encode()
+        for row in rows:
+            cells = [self._csv_cell(row[field]) for field in fields]
+            yield writer.writerow(cells).encode()
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        output = request.query_params.get(self.export_query_param, "ndjson")
+        if output not in self.export_formats:
+            raise ValidationError(
+                {
+                    self.export_query_param: [
+                        f"Choose one of: {', '.join(self.export_formats)}."
+                    ]
+                }
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
+        rows = self.export_rows(queryset, serializer)
+        if output == "csv":
+            fields = [
+                name
+                for name, field in serializer.fields.items()
+                if not field.write_only
+            ]
+            chunks = self._csv(rows, fields)
+        else:
+            chunks = self._ndjson(rows)
+        response = StreamingHttpResponse(
+            _buffered(chunks), content_type=self.export_formats[output]
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{self.basename}.{output}"'
+        )
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Conditional GETs for ``list`` and ``retrieve``: responses carry a strong
+    ETag and Last-Modified, and a request whose If-None-Match (or
+    If-Modified-Since) still matches gets a 304 before anything is
+    serialized. Validators come from when the tables the action's serializer
+    reads last had a write (see ``base.conditional``) and, for a detail,
+    from the row's ``updated_at``. ``etag_models`` adds tables read outside
+    the serializer, e.g. by annotations.
+
+    Off unless ``CONDITIONAL_GET`` is set: the write stamps live in the
+    cache, and one that is not shared between processes would leave other
+    workers validating stale ETags.
+    """
+
+    etag_models = ()
+    conditional_actions = ("list", "retrieve")
+    conditional_get = settings.CONDITIONAL_GET
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "retrieve" and hasattr(queryset.model, "updated_at"):
+            queryset = also_load(queryset, "updated_at")
+        return queryset
+
+    def get_etag_models(self):
+        plan = QueryPlan(self.queryset.model)
+        plan.add_serializer(self.get_serializer())
+        return plan.models() | set(self.etag_models)
+
+    def volatile_modified(self):
+        """
+        Latest time, in microseconds, the response changed without a write
+        to its tables (e.g. something lapsing), or None.
+        """
+        return None
+
+    def conditional_response(self, request, respond, parts, modified=None):
+        """
+        A 304 (or 412) if the request preconditions match the validators
+        built from ``parts`` and the ``modified`` microsecond timestamp, else
+        ``respond()`` with the validators attached.
+        """
+        if not self.conditional_get:
+            return respond()
+        etag = make_etag(
+            request.get_full_path(), request.accepted_media_type, *parts, modified
+        )
+        last_modified = None if modified is None else modified // 1_000_000
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = respond()
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+            patch_vary_headers(response, ["Authorization"])
+        return response
+
+    @staticmethod
+    def _table_parts(tables):
+        return sorted((model._meta.label_lower, time) for model, time in tables.items())
+
+    @staticmethod
+    def _modified(*times):
+        return max(time for time in times if time is not None)
+
+    def list(self, request, *args, **kwargs):
+        respond = super().list
+        if not self.conditional_get or "list" not in self.conditional_actions:
+            return respond(request, *args, **kwargs)
+        tables = get_tables_modified(self.get_etag_models())
+        volatile = self.volatile_modified()
+        return self.conditional_response(
+            request,
+            lambda: respond(request, *args, **kwargs),
+            [request.user.pk, volatile, *self._table_parts(tables)],
+            self._modified(volatile, *tables.values()),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.conditional_get or "retrieve" not in self.conditional_actions:
+            return super().retrieve(request, *args, **kwargs)
+        instance = self.get_object()
+        models = self.get_etag_models()
+        updated_at = getattr(instance, "updated_at", None)
+        row_modified = None
+        if updated_at is not None:
+            # The row's own writes are told by its updated_at.
+            models.discard(type(instance))
+            row_modified = int(updated_at.timestamp() * 1_000_000)
+        tables = get_tables_modified(models)
+        volatile = self.volatile_modified()
+        return self.conditional_response(
+            request,
+            lambda: Response(self.get_serializer(instance).data),
+            # row_modified on its own too: a row committed after a later
+            # write to a joined table would not move the max.
+            [instance.pk, row_modified, volatile, *self._table_parts(tables)],
+            self._modified(row_modified, volatile, *tables.values()),
+        )
+
+
+RESPONSE_CACHE_KEY = "response:{basename}:{digest}"
+
+
+def response_cache_counter(basename, hit):
+    return f"response-cache:{basename}:{'hits' if hit else 'misses'}"
+
+
+class CachedResponseMixin(ConditionalGetMixin):
+    """
+    Serves ``cached_actions`` from the cache for ``response_cache_timeout``
+    seconds (0 turns it off). Only for public endpoints whose responses are
+    the same for every user: object permissions are not checked on a hit.
+    Needs ``CONDITIONAL_GET``, as entries keep the ETag they were served with.
+    Entries are keyed by API version, host, media type, action arguments and
+    normalized query parameters, plus the last-modified stamps of the tables
+    the response reads, so a write to any of them (see
+    ``base.conditional.watch_tables``) moves readers to a new key. Responses
+    say ``X-Cache: HIT`` or ``MISS``; hits and misses are counted per viewset.
+    """
+
+    cached_actions = ("list", "retrieve")
+    response_cache_timeout = settings.RESPONSE_CACHE_TIMEOUT
+
+    def get_response_cache_key(self, request, kwargs):
+        tables = get_tables_modified(self.get_etag_models())
+        params = sorted(request.query_params.lists())
+        return RESPONSE_CACHE_KEY.format(
+            basename=self.basename,
+            digest=digest(
+                request.version,
+                request.get_host(),
+                request.accepted_media_type,
+                self.action,
+                sorted(kwargs.items()),
+                params,
+                *self._table_parts(tables),
+            ),
+        )
+
+    def cached_response(self, request, respond, kwargs):
+        key = self.get_response_cache_key(request, kwargs)
+        entry = cache.get(key)
+        increment_counter(response_cache_counter(self.basename, entry is not None))
+        if entry is None:
+            response = respond()
+            if response.status_code == 200:
+                entry = (response.data, response["ETag"], response["Last-Modified"])
+                cache.set(key, entry, self.response_cache_timeout)
+            response["X-Cache"] = "MISS"
+            return response
+        data, etag, last_modified = entry
+        response = get_conditional_response(
+            request, etag=etag, last_modified=parse_http_date_safe(last_modified)
+        )
+        if response is None:
+            response = Response(data)
+        response["ETag"] = etag
+        response["Last-Modified"] = last_modified
+        patch_vary_headers(response, ["Authorization"])
+        response["X-Cache"] = "HIT"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        respond = super().list
+        if (
+            "list" not in self.cached_actions
+            or not self.response_cache_timeout
+            or not self.conditional_get
+        ):
+            return respond(request, *args, **kwargs)
+        return self.cached_response(
+            request, lambda: respond(request, *args, **kwargs), kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        respond = super().retrieve
+        if (
+            "retrieve" not in self.cached_actions
+            or not self.response_cache_timeout
+            or not self.conditional_get
+        ):
+            return respond(request, *args, **kwargs)
+        return self.cached_response(
+            request, lambda: respond(request, *args, **kwargs), kwargs
+        )
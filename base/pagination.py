@@ -0,0 +1,402 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+KEY_ALIAS = "keyset_{}"
+
+
+def _name(field):
+    return field.lstrip("-")
+
+
+def _descending(field):
+    return field.startswith("-")
+
+
+def _flip(field):
+    return _name(field) if _descending(field) else f"-{field}"
+
+
+def _json_default(value):
+    # Full precision: DjangoJSONEncoder cuts datetimes to milliseconds.
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on a composite key: the queryset ordering (from the
+    ordering filter, or the view's ``keyset_ordering``) with the primary key
+    as tiebreaker. A page is a range read after the key of the last row seen,
+    so its cost does not grow with depth and no COUNT is run.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    page_size_query_param = "limit"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor."
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_ordering(self, queryset, view):
+        ordering = list(queryset.query.order_by)
+        if not ordering and queryset.query.default_ordering:
+            ordering = list(queryset.model._meta.ordering)
+        if not ordering:
+            ordering = list(getattr(view, "keyset_ordering", ()))
+        if not all(isinstance(field, str) and field != "?" for field in ordering):
+            raise ImproperlyConfigured(
+                "Keyset pagination needs an ordering of field names."
+            )
+        if not any(_name(field) in ("pk", "id") for field in ordering):
+            ordering.append("pk")
+        return ordering
+
+    def encode_cursor(self, values, backwards):
+        payload = json.dumps(
+            {"k": values, "b": backwards, "o": self.ordering},
+            default=_json_default,
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded))
+            values, backwards = payload["k"], bool(payload["b"])
+            valid = payload["o"] == self.ordering
+            valid = valid and len(values) == len(self.ordering)
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            valid = False
+        if not valid:
+            raise NotFound(self.invalid_cursor_message)
+        return values, backwards
+
+    def convert_cursor(self, queryset, values):
+        """
+        Cursor values as the Python types of the keys they stand for, so a
+        tampered cursor fails here rather than in the database.
+        """
+        annotations = queryset.query.annotations
+        try:
+            values = [
+                annotations[KEY_ALIAS.format(index)].output_field.to_python(value)
+                for index, value in enumerate(values)
+            ]
+        except (DjangoValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in values:
+            # Nothing sorts after NULL in a range filter.
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    @staticmethod
+    def _after(ordering, values):
+        """Rows strictly after ``values`` in ``ordering``, as one Q."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, values):
+            lookup = "lt" if _descending(field) else "gt"
+            condition |= equal & Q(**{f"{_name(field)}__{lookup}": value})
+            equal &= Q(**{_name(field): value})
+        return condition
+
+    def _key(self, row):
+        aliases = (KEY_ALIAS.format(index) for index in range(len(self.ordering)))
+        if isinstance(row, dict):
+            return [row[alias] for alias in aliases]
+        return [getattr(row, alias) for alias in aliases]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+        cursor = self.decode_cursor(request)
+        backwards = cursor is not None and cursor[1]
+        ordering = self.ordering
+        if backwards:
+            ordering = [_flip(field) for field in ordering]
+        queryset = queryset.annotate(
+            **{
+                KEY_ALIAS.format(index): F(_name(field))
+                for index, field in enumerate(self.ordering)
+            }
+        ).order_by(*ordering)
+        if cursor is not None:
+            cursor = self.convert_cursor(queryset, cursor[0]), backwards
+            queryset = queryset.filter(self._after(ordering, cursor[0]))
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if backwards:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.first_key = self._key(rows[0]) if rows else None
+        self.last_key = self._key(rows[-1]) if rows else None
+        if not rows and cursor is not None:
+            # Past either end: link back to where the cursor came from.
+            self.first_key = self.last_key = cursor[0]
+            self.has_next, self.has_previous = backwards, not backwards
+        return rows
+
+    def _link(self, key, backwards):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(key, backwards)
+        )
+
+    def get_next_link(self):
+        return self._link(self.last_key, False) if self.has_next else None
+
+    def get_previous_link(self):
+        return self._link(self.first_key, True) if self.has_previous else None
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque cursor from a next or previous link.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class NoCountPagination(LimitOffsetPagination):
+    """
+    Limit/offset pages without the COUNT query: one extra row is read to
+    tell whether a next page exists, returned as ``has_next``.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        rows = list(queryset[self.offset : self.offset + self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        return rows[: self.limit]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "has_next": self.has_next,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        properties = response_schema["properties"]
+        del properties["count"]
+        response_schema["required"] = ["has_next", "results"]
+        response_schema["properties"] = {
+            "has_next": {"type": "boolean", "example": True},
+            **properties,
+        }
+        return response_schema
+
+
+class EstimatedCountPagination(NoCountPagination):
+    """
+    Limit/offset pages with a planner estimate instead of an exact COUNT.
+    On PostgreSQL an unfiltered queryset reads ``reltuples`` of its table and
+    a filtered one the row estimate of its EXPLAIN; other databases count.
+    ``count_is_estimate`` tells which one the response carries.
+    """
+
+    def get_count(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql":
+            if not queryset.query.where:
+                estimate = self._table_estimate(connection, queryset.model)
+            else:
+                estimate = self._plan_estimate(queryset)
+            if estimate is not None:
+                return estimate, True
+        return queryset.count(), False
+
+    @staticmethod
+    def _table_estimate(connection, model):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # -1 (or nothing) until the table is first vacuumed or analyzed.
+        if row is None or row[0] < 0:
+            return None
+        return int(row[0])
+
+    @staticmethod
+    def _plan_estimate(queryset):
+        plan = json.loads(queryset.order_by().explain(format="json"))
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def paginate_queryset(self, queryset, request, view=None):
+        rows = super().paginate_queryset(queryset, request, view)
+        if rows is not None:
+            self.count, self.count_is_estimate = self.get_count(queryset)
+            # Never estimate fewer rows than this page has shown to exist.
+            seen = self.offset + len(rows) + self.has_next
+            self.count = max(self.count, seen)
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "count_is_estimate": self.count_is_estimate,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = LimitOffsetPagination.get_paginated_response_schema(
+            self, schema
+        )
+        properties = response_schema["properties"]
+        response_schema["properties"] = {
+            "count": properties.pop("count"),
+            "count_is_estimate": {"type": "boolean", "example": True},
+            **properties,
+        }
+        return response_schema
+
+
+class SelectablePagination(BasePagination):
+    """
+    Delegates to one of the view's ``pagination_modes`` (name -> pagination
+    class), chosen with the ``pagination`` query parameter. The first mode is
+    the default.
+    """
+
+    mode_query_param = "pagination"
+    default_modes = {"offset": LimitOffsetPagination}
+
+    def get_modes(self, view):
+        return getattr(view, "pagination_modes", None) or self.default_modes
+
+    def get_paginator(self, request, view):
+        modes = self.get_modes(view)
+        mode = request.query_params.get(self.mode_query_param) or next(iter(modes))
+        if mode not in modes:
+            raise ValidationError(
+                {self.mode_query_param: [f"Choose one of: {', '.join(modes)}."]}
+            )
+        return modes[mode]()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request, view)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    @property
+    def display_page_controls(self):
+        paginator = getattr(self, "paginator", None)
+        return getattr(paginator, "display_page_controls", False)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_paginated_response_schema(self, schema):
+        # The view's default mode, plus the fields its other modes add; only
+        # fields every mode returns are required. The view is set by
+        # base.schema.AutoSchema.
+        modes = self.get_modes(getattr(self, "view", None)).values()
+        default, *others = [
+            pagination_class().get_paginated_response_schema(schema)
+            for pagination_class in modes
+        ]
+        for other in others:
+            for name, field in other["properties"].items():
+                default["properties"].setdefault(name, field)
+            default["required"] = [
+                name for name in default["required"] if name in other["required"]
+            ]
+        return default
+
+    def get_schema_operation_parameters(self, view):
+        modes = self.get_modes(view)
+        parameters = {
+            self.mode_query_param: {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Pagination mode, defaults to {next(iter(modes))}.",
+                "schema": {"type": "string", "enum": list(modes)},
+            }
+        }
+        for pagination_class in modes.values():
+            for parameter in pagination_class().get_schema_operation_parameters(view):
+                parameters.setdefault(parameter["name"], parameter)
+        return list(parameters.values())
@@ -0,0 +1,179 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+class QueryPlan:
+    """
+    What a serializer reads from one model: its fields (``None`` when they
+    cannot be known, so all are loaded), the single-valued relations to
+    join and the multi-valued ones to prefetch, each with its own plan.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.fields = set()
+        self.joins = {}
+        self.prefetches = {}
+
+    def load_all(self):
+        self.fields = None
+
+    def add_field(self, name):
+        if self.fields is not None:
+            self.fields.add(name)
+
+    def add_path(self, path):
+        """
+        Read a dotted attribute path (``"route.source.name"``). A path ending
+        on a relation loads the whole related object.
+        """
+        plan = self
+        for name in path:
+            plan = plan.follow(name)
+            if plan is None:
+                return
+        plan.load_all()
+
+    def follow(self, name, join=True):
+        """
+        Record a read of attribute ``name``; return the plan of the related
+        model for a relation, else ``None``. With ``join`` unset, a forward
+        relation only loads its key.
+        """
+        opts = self.model._meta
+        try:
+            field = opts.pk if name == "pk" else opts.get_field(name)
+        except FieldDoesNotExist:
+            # Model properties and methods may read anything; other names are
+            # annotations of the queryset.
+            if hasattr(self.model, name):
+                self.load_all()
+            return None
+        if not field.is_relation:
+            self.add_field(field.name)
+            return None
+        related_model = field.related_model
+        if field.many_to_many or field.one_to_many:
+            plan = self.prefetches.get(name)
+            if plan is None:
+                plan = self.prefetches[name] = QueryPlan(related_model)
+                if field.one_to_many:
+                    # Prefetched rows are matched to their parent by this FK.
+                    plan.add_field(field.field.name)
+            return plan
+        if field.concrete:
+            self.add_field(field.name)
+            if not join:
+                return None
+        plan = self.joins.get(name)
+        if plan is None:
+            plan = self.joins[name] = QueryPlan(related_model)
+        return plan
+
+    def add_serializer(self, serializer):
+        meta = getattr(serializer, "Meta", None)
+        method_sources = getattr(meta, "method_sources", {})
+        for field_name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                if field_name not in method_sources:
+                    self.load_all()
+                for source in method_sources.get(field_name, ()):
+                    self.add_path(source.split("."))
+                continue
+            self.add_field_source(field)
+
+    def add_field_source(self, field):
+        if field.source == "*":
+            if isinstance(field, serializers.BaseSerializer):
+                self.add_serializer(field)
+            else:
+                self.load_all()
+            return
+        plan = self
+        for name in field.source_attrs[:-1]:
+            plan = plan.follow(name)
+            if plan is None:
+                return
+        # A primary key of a forward relation is read from the FK column.
+        join = not isinstance(field, serializers.PrimaryKeyRelatedField)
+        related = plan.follow(field.source_attrs[-1], join)
+        if related is None:
+            return
+        if isinstance(field, serializers.ListSerializer):
+            field = field.child
+        elif isinstance(field, serializers.ManyRelatedField):
+            field = field.child_relation
+        if isinstance(field, serializers.BaseSerializer):
+            related.add_serializer(field)
+        elif isinstance(field, serializers.SlugRelatedField):
+            related.add_path(field.slug_field.split("__"))
+        elif not isinstance(field, serializers.PrimaryKeyRelatedField):
+            related.load_all()
+
+    def models(self):
+        """Every model this plan reads, its own included."""
+        models = {self.model}
+        for plan in (*self.joins.values(), *self.prefetches.values()):
+            models |= plan.models()
+        return models
+
+    def _field_names(self):
+        if self.fields is None:
+            return [field.name for field in self.model._meta.concrete_fields]
+        return [self.model._meta.pk.name, *sorted(self.fields)]
+
+    def _walk(self, defer, prefix=""):
+        """(select_related paths, only() paths, Prefetch objects)."""
+        select_related = []
+        only = [f"{prefix}{name}" for name in self._field_names()]
+        prefetches = [
+            Prefetch(
+                f"{prefix}{name}",
+                queryset=plan.apply(plan.model._default_manager.all(), defer),
+            )
+            for name, plan in sorted(self.prefetches.items())
+        ]
+        for name, plan in sorted(self.joins.items()):
+            select_related.append(f"{prefix}{name}")
+            nested = plan._walk(defer, f"{prefix}{name}__")
+            select_related += nested[0]
+            only += nested[1]
+            prefetches += nested[2]
+        return select_related, only, prefetches
+
+    def apply(self, queryset, defer=True):
+        """
+        Replace the joins and prefetches of ``queryset`` with this plan and,
+        if ``defer`` is set, load only the planned fields.
+        """
+        select_related, only, prefetches = self._walk(defer)
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        if defer and not queryset.query.deferred_loading[0]:
+            queryset = queryset.only(*only)
+        return queryset
+
+
+def plan_queryset(queryset, serializer, defer=True):
+    """Join, prefetch and load what ``serializer`` reads of ``queryset``."""
+    plan = QueryPlan(queryset.model)
+    plan.add_serializer(serializer)
+    return plan.apply(queryset, defer)
+
+
+def also_load(queryset, *names):
+    """``queryset`` loading the fields ``names`` even if only()/defer() left them."""
+    loaded, defer = queryset.query.deferred_loading
+    if not defer:
+        return queryset.only(*loaded, *names) if loaded else queryset
+    if not loaded & set(names):
+        return queryset
+    queryset = queryset.all()
+    queryset.query.deferred_loading = (loaded.difference(names), True)
+    return queryset
@@ -0,0 +1,14 @@
+from django.conf import settings
+
+
+def redis_available(alias="default"):
+    """Whether the cache ``alias`` is served by django-redis."""
+    backend = settings.CACHES.get(alias, {}).get("BACKEND", "")
+    return backend.startswith("django_redis.")
+
+
+def get_redis(alias="default"):
+    """Raw redis-py client behind the django-redis cache ``alias``."""
+    from django_redis import get_redis_connection
+
+    return get_redis_connection(alias)
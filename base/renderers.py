@@ -0,0 +1,34 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - the stdlib renderer is used instead
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson when it is installed, which writes UUIDs
+    and datetimes natively; anything else it cannot encode goes through DRF's
+    encoder. Without orjson this is the stock ``JSONRenderer``.
+    """
+
+    options = (
+        (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        options = self.options
+        if self.get_indent(accepted_media_type or "", renderer_context or {}):
+            # orjson only indents by two spaces.
+            options |= orjson.OPT_INDENT_2
+        ret = orjson.dumps(data, default=JSONEncoder().default, option=options)
+        # Escaped like the stock renderer so the output is safe in <script>.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
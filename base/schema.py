@@ -0,0 +1,11 @@
+from drf_spectacular import openapi
+
+
+class AutoSchema(openapi.AutoSchema):
+    """Spectacular's AutoSchema, handing paginators the view they document."""
+
+    def _get_paginator(self):
+        paginator = super()._get_paginator()
+        if paginator is not None:
+            paginator.view = self.view
+        return paginator
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+from django.conf import settings
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+requires_postgres = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="query plans are checked on PostgreSQL"
+)
+
+
+def _disable_seqscan():
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+
+
+def explain(queryset, seqscan=False):
+    """
+    EXPLAIN output of ``queryset``. Test tables are tiny, so sequential scans
+    are disabled unless ``seqscan`` is set: an index that can serve the query
+    then shows up in the plan.
+    """
+    with transaction.atomic():
+        if not seqscan:
+            _disable_seqscan()
+        return queryset.explain()
+
+
+def _plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from _plan_nodes(child)
+
+
+def seq_scanned_tables(sql):
+    """
+    Tables read by a sequential scan in the plan of ``sql``. Sequential scans
+    are disabled, so one only remains where no index can serve the query.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        _disable_seqscan()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return {
+        node["Relation Name"]
+        for node in _plan_nodes(plan[0]["Plan"])
+        if node["Node Type"] == "Seq Scan"
+    }
+
+
+def _table_rows(table):
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM {connection.ops.quote_name(table)}")
+        return cursor.fetchone()[0]
+
+
+def assert_no_seq_scans(queries, max_rows=None):
+    """
+    Fail if a SELECT of ``queries`` (as captured by CaptureQueriesContext)
+    sequentially scans a table of more than ``max_rows`` rows, by default
+    ``settings.QUERY_PLAN_SEQ_SCAN_MAX_ROWS``.
+    """
+    if max_rows is None:
+        max_rows = settings.QUERY_PLAN_SEQ_SCAN_MAX_ROWS
+    failures = []
+    for query in queries:
+        sql = query["sql"]
+        if not sql.lstrip().upper().startswith("SELECT"):
+            continue
+        tables = sorted(
+            table
+            for table in seq_scanned_tables(sql)
+            if _table_rows(table) > max_rows
+        )
+        if tables:
+            failures.append(f"{', '.join(tables)}: {sql}")
+    assert not failures, "Sequential scans of large tables:\n" + "\n".join(failures)
+
+
+QUERY_BUDGET_PAGE_SIZES = (1, 10, 100)
+
+
+def count_queries(client, url, params=None):
+    """Number of queries run by a successful GET of ``url``."""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params)
+    assert response.status_code == 200, (url, response.status_code)
+    return len(queries)
+
+
+def assert_query_budget(viewset, action, counts):
+    """
+    Fail if the query counts of ``action`` (page size -> count) differ
+    between page sizes, or exceed ``viewset.query_budgets[action]``.
+    """
+    name = f"{viewset.__name__}.{action}"
+    budget = getattr(viewset, "query_budgets", {}).get(action)
+    assert budget is not None, f"{name} declares no query_budgets[{action!r}]"
+    assert len(set(counts.values())) == 1, f"{name} queries grow: {counts}"
+    assert max(counts.values()) <= budget, f"{name} over budget {budget}: {counts}"
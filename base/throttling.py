@@ -0,0 +1,186 @@
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from base.redis import get_redis, redis_available
+
+RATE_LIMIT_KEY = "rate-limit:{key}"
+
+# Slack for float rounding when comparing a TAT against the tolerance.
+EPSILON = 1e-6
+
+# GCRA on one key, against the server clock so every worker agrees: returns
+# "0" and advances the key's theoretical arrival time if the request fits,
+# else the seconds until it would (as a string, since Lua numbers returned to
+# Redis are truncated to integers). ARGV: interval, tolerance, epsilon.
+HIT_SCRIPT = """
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = math.max(tonumber(redis.call("GET", KEYS[1]) or now), now)
+local wait = tat - now - tolerance
+if wait > tonumber(ARGV[3]) then
+    return tostring(wait)
+end
+local new_tat = tat + interval
+redis.call("SET", KEYS[1], tostring(new_tat), "PX", math.ceil((new_tat - now) * 1000))
+return "0"
+"""
+
+
+class RateLimitStore:
+    """
+    Counts requests per key with the generic cell rate algorithm: each key
+    holds one number, its theoretical arrival time (TAT), which every allowed
+    request pushes ``interval`` seconds further. A request is allowed while
+    the TAT is at most ``tolerance`` seconds ahead of now.
+
+    ``parameters`` picks both so that ``burst`` requests fit at once and no
+    more than ``limit`` fit in any window of ``period`` seconds: after the
+    burst, requests are spaced ``interval`` apart, a steady rate of
+    ``limit - burst + 1`` per period.
+    """
+
+    def hit(self, key, interval, tolerance):
+        """Count a request on ``key`` if allowed: 0, else seconds to wait."""
+        raise NotImplementedError
+
+    @staticmethod
+    def parameters(limit, period, burst):
+        """GCRA ``interval`` and ``tolerance`` capping ``period`` at ``limit``."""
+        burst = min(max(burst, 1), limit)
+        # A window of ``period`` then holds at most
+        # (period + tolerance) / interval = limit requests.
+        interval = period / (limit - burst + 1)
+        return interval, (burst - 1) * interval
+
+    @staticmethod
+    def gcra(tat, now, interval, tolerance):
+        """New TAT (None if denied) and the wait, from the stored ``tat``."""
+        tat = max(tat or now, now)
+        wait = tat - now - tolerance
+        if wait > EPSILON:
+            return None, wait
+        return tat + interval, 0
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """Updates each key atomically with a Lua script on the django-redis cache."""
+
+    def __init__(self, client=None):
+        self.client = client or get_redis()
+        self.hit_script = self.client.register_script(HIT_SCRIPT)
+
+    def hit(self, key, interval, tolerance):
+        wait = self.hit_script(
+            keys=[RATE_LIMIT_KEY.format(key=key)], args=[interval, tolerance, EPSILON]
+        )
+        return float(wait)
+
+
+class SQLiteRateLimitStore(RateLimitStore):
+    """
+    Keeps TATs in a SQLite file, so that the worker processes of one host
+    share their limits without Redis. ``BEGIN IMMEDIATE`` takes the write
+    lock before reading, which makes each hit atomic across processes.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.local = threading.local()
+
+    def get_connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit "
+                "(key TEXT PRIMARY KEY, tat REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS rate_limit_tat ON rate_limit (tat)"
+            )
+            self.local.connection = connection
+        return connection
+
+    def hit(self, key, interval, tolerance):
+        connection = self.get_connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = connection.execute(
+                "SELECT tat FROM rate_limit WHERE key = ?", (key,)
+            ).fetchone()
+            new_tat, wait = self.gcra(row and row[0], now, interval, tolerance)
+            if new_tat is not None:
+                connection.execute(
+                    "INSERT INTO rate_limit (key, tat) VALUES (?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET tat = excluded.tat",
+                    (key, new_tat),
+                )
+                # A TAT in the past means a fresh start; its row can go.
+                connection.execute("DELETE FROM rate_limit WHERE tat < ?", (now,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return wait
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_rate_limit_store():
+    """Redis store when the cache is django-redis, the SQLite one otherwise."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if redis_available():
+                    _store = RedisRateLimitStore()
+                else:
+                    _store = SQLiteRateLimitStore(settings.RATE_LIMIT_SQLITE_PATH)
+    return _store
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    ``SimpleRateThrottle`` over a ``RateLimitStore``: one number per client
+    and scope, updated atomically, instead of a cached list of timestamps
+    rewritten on every request. Subclasses set ``scope`` and implement
+    ``get_cache_key`` as usual.
+
+    The rate caps every sliding window: "10/minute" never lets more than 10
+    requests through in any 60 seconds. ``burst`` of them may come at once
+    (half, rounded up, by default); the rest are spread over the period.
+    """
+
+    burst = None
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        burst = self.burst or -(-self.num_requests // 2)
+        interval, tolerance = RateLimitStore.parameters(
+            self.num_requests, self.duration, burst
+        )
+        self.wait_seconds = get_rate_limit_store().hit(
+            f"{self.scope}:{self.key}", interval, tolerance
+        )
+        return self.wait_seconds == 0
+
+    def wait(self):
+        return self.wait_seconds
@@ -0,0 +1,131 @@
+from types import SimpleNamespace
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+class Unsupported(Exception):
+    """The serializer reads something a values() row cannot provide."""
+
+
+def _lookup(model, attrs, annotations):
+    """
+    ORM lookup for a chain of attributes, following only non-null forward
+    relations (a null one would make DRF drop or null the field instead).
+    """
+    for index, attr in enumerate(attrs):
+        if model is None:
+            raise Unsupported(attrs)
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            if index == 0 and attr in annotations:
+                return attr
+            raise Unsupported(attrs)
+        if field.many_to_many or field.one_to_many or not field.concrete:
+            raise Unsupported(attrs)
+        if field.is_relation and field.null:
+            raise Unsupported(attrs)
+        model = field.related_model
+    return "__".join(attrs)
+
+
+def _namespace(row, paths):
+    """Nested attribute objects for the dotted ``paths`` of ``row``."""
+    root = {}
+    for path, lookup in paths:
+        node = root
+        *parents, leaf = path
+        for name in parents:
+            node = node.setdefault(name, {})
+        node[leaf] = row[lookup]
+
+    def build(node):
+        return SimpleNamespace(
+            **{
+                name: build(value) if isinstance(value, dict) else value
+                for name, value in node.items()
+            }
+        )
+
+    return build(root)
+
+
+class ValuesRowSerializer:
+    """
+    Builds the representation of a flat ModelSerializer from ``values()``
+    rows, calling the same field ``to_representation`` (and the same
+    ``get_<field>`` methods, on objects rebuilt from ``Meta.method_sources``),
+    so the output is identical without instantiating models.
+    """
+
+    def __init__(self, serializer, queryset):
+        model = queryset.model
+        annotations = queryset.query.annotations
+        meta = getattr(serializer, "Meta", None)
+        method_sources = getattr(meta, "method_sources", {})
+        self.lookups = []
+        self.builders = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                if name not in method_sources:
+                    raise Unsupported(name)
+                paths = [
+                    (path, _lookup(model, path, annotations))
+                    for path in (
+                        tuple(source.split(".")) for source in method_sources[name]
+                    )
+                ]
+                self.lookups += [lookup for _, lookup in paths]
+                method = getattr(serializer, field.method_name)
+                self.builders.append((name, self._method(method, paths)))
+                continue
+            if field.source == "*" or isinstance(
+                field, (serializers.BaseSerializer, serializers.ManyRelatedField)
+            ):
+                raise Unsupported(name)
+            if isinstance(field, serializers.SlugRelatedField):
+                attrs = (*field.source_attrs, *field.slug_field.split("__"))
+                convert = None
+            elif isinstance(field, serializers.PrimaryKeyRelatedField):
+                if field.pk_field is not None:
+                    raise Unsupported(name)
+                attrs, convert = field.source_attrs, None
+            elif isinstance(field, serializers.RelatedField) or isinstance(
+                field, serializers.FileField
+            ):
+                raise Unsupported(name)
+            else:
+                attrs, convert = field.source_attrs, field.to_representation
+            lookup = _lookup(model, attrs, annotations)
+            self.lookups.append(lookup)
+            self.builders.append((name, self._value(lookup, convert)))
+        self.lookups = list(dict.fromkeys(self.lookups))
+
+    @staticmethod
+    def _value(lookup, convert):
+        if convert is None:
+            return lambda row: row[lookup]
+
+        def build(row):
+            value = row[lookup]
+            return None if value is None else convert(value)
+
+        return build
+
+    @staticmethod
+    def _method(method, paths):
+        return lambda row: method(_namespace(row, paths))
+
+    def to_representation(self, row):
+        return {name: build(row) for name, build in self.builders}
+
+
+def values_serializer(serializer, queryset):
+    """A ValuesRowSerializer for ``serializer``, or None if it cannot be used."""
+    try:
+        return ValuesRowSerializer(serializer, queryset)
+    except Unsupported:
+        return None
@@ -0,0 +1,5 @@
+import os
+
+# Read by settings.WEB_THREADS as well, which sizes the password hashing
+# queue to leave some of these threads free.
+threads = int(os.environ.get("WEB_THREADS", 8))